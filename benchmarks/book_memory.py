@@ -0,0 +1,97 @@
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from typing import Callable
+
+from classes import Book, BookTable
+from constants import STATUS_AVAILABLE, STATUS_ISSUED
+
+
+class DictBook:
+    """Прежнее представление книги: обычный класс с __dict__."""
+
+    def __init__(self, id, title, author, year, status):
+        self.id = id
+        self.title = title
+        self.author = author
+        self.year = year
+        self.status = status
+
+    @staticmethod
+    def from_dict(data):
+        return DictBook(
+            data["id"], data["title"], data["author"], data["year"],
+            data["status"],
+        )
+
+
+def catalog_text(count: int, seed: int = 0) -> str:
+    """
+    Генерирует JSON каталог из count книг.
+
+    Args:
+        count (int): Количество книг.
+        seed (int): Зерно генератора случайных чисел.
+
+    Returns:
+        str: Текст JSON файла каталога.
+    """
+    generator = random.Random(seed)
+    authors = [f"Автор {number}" for number in range(max(count // 20, 1))]
+    return json.dumps([
+        {
+            "id": number,
+            "title": f"Книга номер {number}",
+            "author": generator.choice(authors),
+            "year": str(generator.randint(1800, 2024)),
+            "status": generator.choice((STATUS_AVAILABLE, STATUS_ISSUED)),
+        }
+        for number in range(1, count + 1)
+    ], ensure_ascii=False)
+
+
+def measure(text: str, build: Callable[[list], object]) -> int:
+    """
+    Измеряет память, занятую каталогом после разбора JSON.
+
+    Args:
+        text (str): Текст JSON файла каталога.
+        build (Callable): Функция, строящая каталог из списка словарей.
+
+    Returns:
+        int: Количество байт, занятых построенным каталогом.
+    """
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(text)
+    catalog = build(data)
+    del data
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalog
+    return size
+
+
+def main() -> None:
+    """Печатает расход памяти на одну книгу для разных представлений."""
+    parser = argparse.ArgumentParser(
+        description="Память на одну книгу для разных представлений."
+    )
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+    text = catalog_text(args.count)
+    variants = {
+        "dict": lambda data: [DictBook.from_dict(book) for book in data],
+        "slots": lambda data: [Book.from_dict(book) for book in data],
+        "table": BookTable.from_dicts,
+    }
+    for name, build in variants.items():
+        size = measure(text, build)
+        print(f"{name:>6}: {size / args.count:8.1f} байт на книгу")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterable, Optional
+
+from classes import Book
+from constants import STATUS_AVAILABLE, STATUS_ISSUED
+from repository import BookRepository
+from storage import write_books
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SIZES = (1_000, 100_000, 1_000_000)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZE_SCRIPT = """
+import json
+import sys
+
+from benchmarks.operations import bench_size, peak_rss
+
+count, seed, repeat, trace_memory = json.loads(sys.argv[1])
+results = bench_size(count, seed, repeat, sys.argv[2], trace_memory)
+results["peak_rss"] = peak_rss()
+print(json.dumps(results))
+"""
+WORDS = (
+    "война", "мир", "преступление", "наказание", "мастер", "маргарита",
+    "идиот", "бесы", "отцы", "дети", "мертвые", "души", "тихий", "дон",
+    "белая", "гвардия", "собачье", "сердце", "герой", "нашего", "времени",
+    "капитанская", "дочка", "горе", "от", "ума", "вишневый", "сад",
+)
+FIRST_NAMES = (
+    "Лев", "Фёдор", "Михаил", "Антон", "Иван", "Александр", "Николай",
+    "Анна", "Марина", "Борис", "Сергей", "Владимир",
+)
+LAST_NAMES = (
+    "Толстой", "Достоевский", "Булгаков", "Чехов", "Тургенев", "Пушкин",
+    "Гоголь", "Ахматова", "Цветаева", "Пастернак", "Есенин", "Набоков",
+)
+
+
+def generate_books(count: int, seed: int = 0) -> list[Book]:
+    """
+    Генерирует воспроизводимый каталог из count книг.
+
+    Названия собираются из словаря слов, авторы берутся из конечного
+    набора, поэтому поиск по ним находит много книг, как в настоящем
+    каталоге.
+
+    Args:
+        count (int): Количество книг.
+        seed (int): Зерно генератора случайных чисел.
+
+    Returns:
+        list: Список объектов класса Book.
+    """
+    generator = random.Random(seed)
+    authors = [
+        f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES
+    ]
+    return [
+        Book(
+            number,
+            " ".join(generator.sample(WORDS, generator.randint(1, 4)))
+            .capitalize(),
+            generator.choice(authors),
+            generator.randint(1800, 2024),
+            generator.choice((STATUS_AVAILABLE, STATUS_ISSUED)),
+        )
+        for number in range(1, count + 1)
+    ]
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Возвращает пиковый объем памяти процесса в байтах.
+
+    Это пик за всю жизнь процесса, поэтому каждый размер каталога
+    замеряется в отдельном процессе.
+
+    Returns:
+        int | None: Пиковый RSS или None, если модуль resource
+            недоступен.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def timed(
+    operation: Callable[[], int], trace_memory: bool = False
+) -> dict:
+    """
+    Выполняет операцию и замеряет ее время и пиковую память.
+
+    Args:
+        operation (Callable): Операция, возвращающая число обработанных
+            элементов.
+        trace_memory (bool): Замерять ли через tracemalloc пик памяти,
+            выделенной во время операции. Трассировка замедляет
+            операцию.
+
+    Returns:
+        dict: Время, число элементов, пропускная способность и пик
+            выделенной памяти (None без trace_memory).
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        items = operation()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "items": items,
+        "items_per_second": items / seconds if seconds else None,
+        "peak_memory": peak,
+    }
+
+
+def drain(books: Iterable[Book]) -> int:
+    """Перебирает результаты поиска и возвращает их количество."""
+    return sum(1 for _ in books)
+
+
+def bench_size(
+    count: int, seed: int, repeat: int, directory: str,
+    trace_memory: bool = False
+) -> dict:
+    """
+    Замеряет операции над каталогом из count книг.
+
+    Args:
+        count (int): Количество книг.
+        seed (int): Зерно генератора.
+        repeat (int): Сколько раз повторять короткие операции.
+        directory (str): Каталог для временных файлов.
+        trace_memory (bool): Замерять ли пик памяти каждой операции.
+
+    Returns:
+        dict: Результаты замеров по операциям.
+    """
+    path = os.path.join(directory, f"book_{count}.json")
+    write_books(path, generate_books(count, seed))
+    repository = BookRepository(path)
+    results = {}
+
+    def search(field: str, value: str) -> Callable[[], int]:
+        def operation() -> int:
+            found = 0
+            for _ in range(repeat):
+                repository.query_cache.bump()
+                found += drain(repository.search(field, value))
+            return found
+        return operation
+
+    def prefix(field: str, value: str) -> Callable[[], int]:
+        def operation() -> int:
+            found = 0
+            for _ in range(repeat):
+                repository.query_cache.bump()
+                found += drain(repository.search_prefix(field, value))
+            return found
+        return operation
+
+    def next_ids() -> int:
+        for _ in range(repeat):
+            repository.next_id()
+        return repeat
+
+    def toggle_status() -> int:
+        for number in range(repeat):
+            book = repository.get(number % count + 1)
+            status = (
+                STATUS_ISSUED if book.status == STATUS_AVAILABLE
+                else STATUS_AVAILABLE
+            )
+            repository.set_status(book.id, status)
+        return repeat
+
+    def save() -> int:
+        repository.save()
+        return count
+
+    def load() -> int:
+        repository.load()
+        return count
+
+    def build_index() -> int:
+        repository.search_index().build()
+        return count
+
+    def measure(operation: Callable[[], int]) -> dict:
+        return timed(operation, trace_memory)
+
+    results["load"] = measure(load)
+    results["save"] = measure(save)
+    results["index_build"] = measure(build_index)
+    results["search_title"] = measure(search("title", "мастер"))
+    results["search_author"] = measure(search("author", "толстой"))
+    results["search_year"] = measure(search("year", "1900"))
+    results["search_year_range"] = measure(search("year_range", "1900-1950"))
+    results["search_status"] = measure(search("status", STATUS_ISSUED))
+    results["search_prefix"] = measure(prefix("title", "сер"))
+    results["search_fuzzy"] = measure(search("fuzzy", "дастоевский"))
+    results["next_id"] = measure(next_ids)
+    results["toggle_status"] = measure(toggle_status)
+    results["file_size"] = os.path.getsize(path)
+    return results
+
+
+def launch_size(
+    count: int, seed: int, repeat: int, directory: str, trace_memory: bool
+) -> dict:
+    """
+    Замеряет операции над каталогом из count книг в отдельном процессе.
+
+    Args:
+        count (int): Количество книг.
+        seed (int): Зерно генератора.
+        repeat (int): Сколько раз повторять короткие операции.
+        directory (str): Каталог для временных файлов.
+        trace_memory (bool): Замерять ли пик памяти каждой операции.
+
+    Returns:
+        dict: Результаты замеров по операциям и пиковый RSS процесса.
+    """
+    environment = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run(
+        [
+            sys.executable, "-c", SIZE_SCRIPT,
+            json.dumps([count, seed, repeat, trace_memory]), directory,
+        ],
+        cwd=ROOT, env=environment, capture_output=True, text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def revision() -> Optional[str]:
+    """Возвращает хеш текущего коммита или None вне git."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    """Замеряет операции каталога и сохраняет результаты в JSON."""
+    parser = argparse.ArgumentParser(
+        description="Замеры операций каталога на синтетических данных."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="JSON файл для результатов")
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="замерять пик памяти каждой операции через tracemalloc"
+    )
+    args = parser.parse_args()
+    report = {
+        "revision": revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "trace_memory": args.trace_memory,
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            results = launch_size(
+                count, args.seed, args.repeat, directory, args.trace_memory
+            )
+            report["sizes"][str(count)] = results
+            for name, result in results.items():
+                if isinstance(result, dict):
+                    print(
+                        f"{count:>9} {name:<18} {result['seconds']:10.4f} с"
+                        f" {result['items']:>9} шт."
+                    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
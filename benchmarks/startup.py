@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.operations import generate_books, revision
+from catalog_cache import remove_cache
+from constants import DATABASE
+from storage import write_books
+
+SIZES = (1_000, 100_000)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MENU_SCRIPT = "import bible_book"
+CATALOG_SCRIPT = """
+import json
+import time
+
+start = time.perf_counter()
+import engine_logic
+from repository import BookRepository
+imported = time.perf_counter()
+repository = BookRepository(engine_logic.DATABASE, use_cache=True)
+repository.load()
+loaded = time.perf_counter()
+repository.store_cache()
+stored = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "load": loaded - imported,
+    "store": stored - loaded,
+}))
+"""
+
+
+def launch(script: str, directory: str) -> dict:
+    """
+    Запускает отдельный процесс Python и замеряет его время.
+
+    Args:
+        script (str): Код для выполнения в процессе.
+        directory (str): Рабочий каталог процесса с базой данных.
+
+    Returns:
+        dict: Полное время процесса и замеры, напечатанные скриптом.
+    """
+    environment = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=directory, env=environment,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    result = {"process": time.perf_counter() - start}
+    if output.strip():
+        result.update(json.loads(output))
+    return result
+
+
+def median(runs: list[dict]) -> dict:
+    """Возвращает медиану каждого замера по нескольким запускам."""
+    return {name: statistics.median(run[name] for run in runs)
+            for name in runs[0]}
+
+
+def bench_size(count: int, seed: int, repeat: int, directory: str) -> dict:
+    """
+    Замеряет холодный и теплый запуск с каталогом из count книг.
+
+    Холодный запуск читает JSON, а затем сохраняет кэш, как при
+    выходе из программы. Теплый запуск загружает каталог из кэша.
+
+    Args:
+        count (int): Количество книг.
+        seed (int): Зерно генератора.
+        repeat (int): Сколько раз повторять каждый запуск.
+        directory (str): Каталог для временных файлов.
+
+    Returns:
+        dict: Медианы замеров для меню, холодного и теплого запуска.
+    """
+    path = os.path.join(directory, DATABASE)
+    write_books(path, generate_books(count, seed))
+    cold = []
+    for _ in range(repeat):
+        remove_cache(path)
+        cold.append(launch(CATALOG_SCRIPT, directory))
+    warm = [launch(CATALOG_SCRIPT, directory) for _ in range(repeat)]
+    menu = [launch(MENU_SCRIPT, directory) for _ in range(repeat)]
+    return {
+        "menu": median(menu),
+        "cold": median(cold),
+        "warm": median(warm),
+        "file_size": os.path.getsize(path),
+    }
+
+
+def main() -> None:
+    """Замеряет время запуска программы и сохраняет результаты в JSON."""
+    parser = argparse.ArgumentParser(
+        description="Замеры холодного и теплого запуска программы."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="JSON файл для результатов")
+    args = parser.parse_args()
+    report = {
+        "revision": revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            results = bench_size(count, args.seed, args.repeat, directory)
+        report["sizes"][str(count)] = results
+        print(f"{count:>9} меню {results['menu']['process']:10.4f} с")
+        for launch_kind in ("cold", "warm"):
+            result = results[launch_kind]
+            print(
+                f"{count:>9} {launch_kind:<4} {result['process']:10.4f} с"
+                f" (импорт {result['import']:.4f} с,"
+                f" загрузка {result['load']:.4f} с,"
+                f" запись кэша {result['store']:.4f} с)"
+            )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,50 @@
-from constants import RESET, YELLOW
-from engine_logic import (add_book, all_books, change_status, delete_book,
-                          search, to_main_menu)
+import sys
+import threading
+from types import ModuleType
+from typing import Optional
+
+import metrics  # noqa: F401 -- ставит обработчик SIGUSR1
+from constants import MENU_ACTIONS, RESET, YELLOW
+
+_warm_up: Optional[threading.Thread] = None
+
+
+def warm_up() -> None:
+    """Импортирует логику библиотеки и загружает каталог."""
+    from engine_logic import warm_up_catalog
+    warm_up_catalog()
+
+
+def start_warm_up() -> None:
+    """
+    Запускает загрузку каталога в фоновом потоке.
+
+    Пока пользователь читает главное меню, поток импортирует модули
+    библиотеки и загружает каталог (из кэша, если он включен
+    и актуален). Модуль metrics уже импортирован в главном потоке:
+    обработчик SIGUSR1 можно поставить только из него.
+    """
+    global _warm_up
+    _warm_up = threading.Thread(target=warm_up, daemon=True)
+    _warm_up.start()
+
+
+def load_engine() -> ModuleType:
+    """
+    Возвращает модуль логики библиотеки.
+
+    Модуль импортируется при первом действии пользователя, а не при
+    запуске программы. Если идет фоновая загрузка каталога, функция
+    дожидается ее окончания, чтобы действие не читало каталог
+    одновременно с ней.
+
+    Returns:
+        ModuleType: Модуль engine_logic.
+    """
+    if _warm_up is not None:
+        _warm_up.join()
+    import engine_logic
+    return engine_logic
 
 
 def main():
@@ -21,30 +65,24 @@ def main():
         print(f"{YELLOW}5. Изменить статус книги{RESET}")
         print(f"{YELLOW}6. Выйти{RESET}")
         choice = input()
-        if choice == "1":
-            add_book()
-            to_main_menu(add_book)
-        if choice == "2":
-            delete_book()
-            to_main_menu(delete_book)
-        if choice == "3":
-            search()
-            to_main_menu(search)
-        if choice == "4":
-            all_books()
-            to_main_menu(all_books)
-        if choice == "5":
-            change_status()
-            to_main_menu(change_status)
+        if choice in MENU_ACTIONS:
+            engine = load_engine()
+            action = getattr(engine, MENU_ACTIONS[choice])
+            action()
+            engine.to_main_menu(action)
         if choice == "6":
             print(f"{YELLOW}До свидания!{RESET}")
             break
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        import cli
+        sys.exit(cli.main(sys.argv[1:]))
+    start_warm_up()
     while True:
         try:
             main()
         except KeyboardInterrupt:
             print(f"\n{YELLOW}Программа приостановлена. Возврат в главное меню...{RESET}")
-            to_main_menu()
+            load_engine().to_main_menu()
@@ -0,0 +1,303 @@
+import argparse
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional
+
+from classes import Book
+from storage import atomic_file, iter_books, write_books
+
+MAGIC = b"BBK\x00"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")
+STATUS_ENTRY = struct.Struct("<II")
+RECORD = struct.Struct("<qhBxIIII")
+STATUS_OFFSET = struct.calcsize("<qh")
+
+
+class CatalogFormatError(ValueError):
+    """Файл не является двоичным каталогом поддерживаемой версии."""
+
+
+def write_catalog(
+    path: str, books: Iterable[Book], generation: int = 0
+) -> None:
+    """
+    Атомарно сохраняет книги в двоичный каталог.
+
+    Файл состоит из заголовка (сигнатура, версия, число статусов,
+    число книг, поколение), таблицы статусов, записей фиксированной
+    длины в порядке ID и кучи строк. Запись книги хранит ID, год,
+    номер статуса и смещения названия и автора в куче.
+
+    Args:
+        path (str): Путь к файлу каталога.
+        books (Iterable): Книги каталога.
+        generation (int): Номер поколения каталога.
+    """
+    heap = bytearray()
+    statuses: dict[str, int] = {}
+    records = bytearray()
+
+    def store(text: str) -> tuple[int, int]:
+        data = text.encode("utf-8")
+        offset = len(heap)
+        heap.extend(data)
+        return offset, len(data)
+
+    ordered = sorted(books, key=lambda book: int(book.id))
+    for book in ordered:
+        if book.status not in statuses:
+            if len(statuses) > 255:
+                raise ValueError(f"Слишком много статусов: {book.status}")
+            statuses[book.status] = len(statuses)
+        records.extend(RECORD.pack(
+            int(book.id), int(book.year), statuses[book.status],
+            *store(book.title), *store(book.author),
+        ))
+    table = b"".join(
+        STATUS_ENTRY.pack(*store(status)) for status in statuses
+    )
+    with atomic_file(path, binary=True) as file:
+        file.write(HEADER.pack(
+            MAGIC, VERSION, len(statuses), len(ordered), generation
+        ))
+        file.write(table)
+        file.write(records)
+        file.write(heap)
+
+
+class BinaryCatalog:
+    """
+    Двоичный каталог книг, открытый через mmap.
+
+    Открытие читает только заголовок и таблицу статусов, книги
+    разбираются по одной при обращении. Поиск по ID — двоичный поиск
+    по записям, смена статуса меняет один байт записи на месте.
+
+    Args:
+        path (str): Путь к файлу каталога.
+        writable (bool): Открыть каталог для изменения статусов.
+    """
+
+    def __init__(self, path: str, writable: bool = False) -> None:
+        self.path: str = path
+        mode = "r+b" if writable else "rb"
+        with open(path, mode) as file:
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self.map = mmap.mmap(file.fileno(), 0, access=access)
+        magic, version, status_count, count, generation = (
+            HEADER.unpack_from(self.map)
+        )
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise CatalogFormatError(f"Неизвестный формат каталога: {path}")
+        self.count: int = count
+        self.generation: int = generation
+        self.records_offset: int = (
+            HEADER.size + status_count * STATUS_ENTRY.size
+        )
+        self.heap_offset: int = self.records_offset + count * RECORD.size
+        self.statuses: list[str] = [
+            self._text(*STATUS_ENTRY.unpack_from(
+                self.map, HEADER.size + number * STATUS_ENTRY.size
+            ))
+            for number in range(status_count)
+        ]
+
+    def close(self) -> None:
+        """Закрывает отображение файла."""
+        self.map.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Book]:
+        return (self.book(index) for index in range(self.count))
+
+    def _text(self, offset: int, length: int) -> str:
+        start = self.heap_offset + offset
+        return self.map[start:start + length].decode("utf-8")
+
+    def _record_offset(self, index: int) -> int:
+        return self.records_offset + index * RECORD.size
+
+    def book_id(self, index: int) -> int:
+        """
+        Возвращает ID книги по номеру записи.
+
+        Args:
+            index (int): Номер записи.
+
+        Returns:
+            int: ID книги.
+        """
+        return struct.unpack_from(
+            "<q", self.map, self._record_offset(index)
+        )[0]
+
+    def book(self, index: int) -> Book:
+        """
+        Разбирает книгу по номеру записи.
+
+        Args:
+            index (int): Номер записи.
+
+        Returns:
+            Book: Книга.
+        """
+        (book_id, year, status, title_offset, title_length, author_offset,
+         author_length) = RECORD.unpack_from(
+            self.map, self._record_offset(index)
+        )
+        return Book(
+            book_id,
+            self._text(title_offset, title_length),
+            self._text(author_offset, author_length),
+            year,
+            self.statuses[status],
+        )
+
+    def books(self, start: int, stop: int) -> list[Book]:
+        """
+        Разбирает книги записей с start по stop, не включая stop.
+
+        Args:
+            start (int): Номер первой записи.
+            stop (int): Номер записи после последней.
+
+        Returns:
+            list: Книги.
+        """
+        return [
+            self.book(index)
+            for index in range(max(start, 0), min(stop, self.count))
+        ]
+
+    def find(self, book_id: int) -> Optional[int]:
+        """
+        Находит номер записи книги двоичным поиском по ID.
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            int | None: Номер записи или None, если книги нет.
+        """
+        index = bisect_left(range(self.count), book_id, key=self.book_id)
+        if index < self.count and self.book_id(index) == book_id:
+            return index
+        return None
+
+    def get(self, book_id: int) -> Optional[Book]:
+        """
+        Находит книгу по ID.
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            Book | None: Книга или None, если ее нет.
+        """
+        index = self.find(int(book_id))
+        return None if index is None else self.book(index)
+
+    def max_id(self) -> int:
+        """Возвращает наибольший ID каталога или 0 для пустого."""
+        return self.book_id(self.count - 1) if self.count else 0
+
+    def set_status(self, book_id: int, status: str) -> Optional[bool]:
+        """
+        Меняет статус книги, перезаписывая один байт записи.
+
+        Args:
+            book_id (int): ID книги.
+            status (str): Новый статус.
+
+        Returns:
+            bool | None: None, если книги нет; False, если статуса нет
+                в таблице статусов файла и нужна полная перезапись.
+        """
+        index = self.find(int(book_id))
+        if index is None:
+            return None
+        if status not in self.statuses:
+            return False
+        self.map[self._record_offset(index) + STATUS_OFFSET] = (
+            self.statuses.index(status)
+        )
+        return True
+
+    def set_generation(self, generation: int) -> None:
+        """
+        Записывает номер поколения в заголовок и сбрасывает файл на диск.
+
+        Args:
+            generation (int): Номер поколения каталога.
+        """
+        self.generation = generation
+        struct.pack_into("<Q", self.map, HEADER.size - 8, generation)
+        self.map.flush()
+
+
+def json_to_binary(json_path: str, binary_path: str) -> int:
+    """
+    Переводит JSON каталог в двоичный формат.
+
+    Args:
+        json_path (str): Путь к JSON файлу базы данных.
+        binary_path (str): Путь к двоичному каталогу.
+
+    Returns:
+        int: Количество перенесенных книг.
+    """
+    books = list(iter_books(json_path))
+    write_catalog(binary_path, books)
+    return len(books)
+
+
+def binary_to_json(binary_path: str, json_path: str) -> int:
+    """
+    Переводит двоичный каталог в JSON.
+
+    Args:
+        binary_path (str): Путь к двоичному каталогу.
+        json_path (str): Путь к JSON файлу базы данных.
+
+    Returns:
+        int: Количество перенесенных книг.
+    """
+    catalog = BinaryCatalog(binary_path)
+    try:
+        books = list(catalog)
+    finally:
+        catalog.close()
+    write_books(json_path, books)
+    return len(books)
+
+
+def main() -> None:
+    """Переводит каталог между JSON и двоичным форматом."""
+    parser = argparse.ArgumentParser(
+        description="Перевод каталога между JSON и двоичным форматом."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (
+        ("to-binary", "JSON -> двоичный каталог"),
+        ("to-json", "двоичный каталог -> JSON"),
+    ):
+        command_parser = commands.add_parser(command, help=help_text)
+        command_parser.add_argument("source")
+        command_parser.add_argument("target")
+    args = parser.parse_args()
+    if args.command == "to-binary":
+        count = json_to_binary(args.source, args.target)
+    else:
+        count = binary_to_json(args.source, args.target)
+    print(f"Перенесено книг: {count}")
+    print(f"Размер: {os.path.getsize(args.target)} байт")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import argparse
+import csv
+import json
+import os
+import time
+from itertools import islice
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from classes import Book
+from constants import BULK_BATCH_SIZE, DATABASE, STATUS_AVAILABLE
+from repository import Repository, get_repository
+from validators import book_errors, is_valid_status
+
+FIELDS = ("id", "title", "author", "year", "status")
+
+
+class BulkReport(NamedTuple):
+    """
+    Итог массового импорта или экспорта.
+
+    Args:
+        processed (int): Количество записанных книг.
+        rejected (list): Пары (номер строки, ошибка) для отклоненных строк.
+        seconds (float): Время выполнения в секундах.
+    """
+
+    processed: int
+    rejected: list[tuple[int, str]]
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        """Скорость обработки в строках в секунду."""
+        rows = self.processed + len(self.rejected)
+        return rows / self.seconds if self.seconds else float(rows)
+
+
+def file_format(path: str) -> str:
+    """
+    Определяет формат файла каталога по расширению.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        str: 'csv' или 'jsonl'.
+
+    Raises:
+        ValueError: Если формат файла не поддерживается.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Неподдерживаемый формат файла: {path}")
+
+
+def read_rows(path: str) -> Iterator[tuple[int, dict]]:
+    """
+    Потоково читает строки файла CSV или JSONL.
+
+    Строки JSONL отдаются неразобранными: их разбирает validate_rows(),
+    чтобы одна испорченная строка была отклонена, а не прерывала
+    весь импорт.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Yields:
+        tuple: Номер строки в файле и словарь с полями книги (CSV)
+            или строка JSON (JSONL).
+    """
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        if file_format(path) == "csv":
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for number, line in enumerate(file, start=1):
+            if line.strip():
+                yield number, line
+
+
+def row_to_book(row: dict, book_id: Optional[int] = None) -> Book:
+    """
+    Создает книгу из строки импорта.
+
+    Args:
+        row (dict): Поля книги из файла.
+        book_id (Optional[int]): ID книги, если он уже назначен.
+
+    Returns:
+        Book: Новая книга. Если статус не указан, книга в наличии.
+
+    Raises:
+        ValueError: Если статус не из известных статусов.
+    """
+    status = str(row.get("status") or STATUS_AVAILABLE)
+    if not is_valid_status(status):
+        raise ValueError(f"неизвестный статус '{status}'")
+    return Book(
+        book_id,
+        str(row.get("title") or ""),
+        str(row.get("author") or ""),
+        str(row.get("year") or ""),
+        status,
+    )
+
+
+def validate_rows(
+    rows: Iterable[tuple[int, dict]]
+) -> tuple[list[Book], list[tuple[int, str]]]:
+    """
+    Проверяет строки импорта по правилам ручного добавления книги.
+
+    Args:
+        rows (Iterable): Пары (номер строки, поля книги или строка JSON).
+
+    Returns:
+        tuple: Корректные книги без назначенных ID и пары
+            (номер строки, ошибка) для отклоненных строк.
+    """
+    books = []
+    rejected = []
+    for number, row in rows:
+        try:
+            if isinstance(row, str):
+                row = json.loads(row)
+            book = row_to_book(row)
+        except (AttributeError, TypeError, ValueError) as e:
+            rejected.append((number, f"Некорректные данные: {e}"))
+            continue
+        error = book_errors(book.title, book.author, book.year)
+        if error:
+            rejected.append((number, error))
+            continue
+        books.append(book)
+    return books, rejected
+
+
+def assign_ids(repository: Repository, books: list[Book]) -> None:
+    """
+    Назначает книгам новые ID одним резервированием диапазона.
+
+    Args:
+        repository (Repository): Репозиторий, выдающий ID.
+        books (list): Книги без ID.
+    """
+    if books:
+        for book, book_id in zip(books, repository.reserve_ids(len(books))):
+            book.id = book_id
+
+
+def import_catalog(
+    path: str, repository: Repository, batch_size: int = BULK_BATCH_SIZE
+) -> BulkReport:
+    """
+    Импортирует книги из файла CSV или JSONL.
+
+    Строки проверяются пачками по тем же правилам, что и при
+    ручном добавлении, корректные книги получают диапазон новых ID
+    и сохраняются одной записью на пачку.
+
+    Args:
+        path (str): Путь к файлу CSV или JSONL.
+        repository (Repository): Репозиторий, в который добавляются книги.
+        batch_size (int): Количество строк в одной пачке.
+
+    Returns:
+        BulkReport: Количество импортированных книг, отклоненные строки
+            и время выполнения.
+    """
+    started = time.perf_counter()
+    imported = 0
+    rejected: list[tuple[int, str]] = []
+    rows = read_rows(path)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        books, batch_rejected = validate_rows(batch)
+        rejected.extend(batch_rejected)
+        assign_ids(repository, books)
+        imported += repository.add_many(books)
+    return BulkReport(imported, rejected, time.perf_counter() - started)
+
+
+def export_catalog(path: str, books: Iterable[Book]) -> BulkReport:
+    """
+    Потоково выгружает книги в файл CSV или JSONL.
+
+    Args:
+        path (str): Путь к файлу CSV или JSONL.
+        books (Iterable): Выгружаемые книги.
+
+    Returns:
+        BulkReport: Количество выгруженных книг и время выполнения.
+    """
+    started = time.perf_counter()
+    exported = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if file_format(path) == "csv":
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            for book in books:
+                writer.writerow(book.to_dict())
+                exported += 1
+        else:
+            for book in books:
+                file.write(json.dumps(book.to_dict(), ensure_ascii=False))
+                file.write("\n")
+                exported += 1
+    return BulkReport(exported, [], time.perf_counter() - started)
+
+
+def main() -> None:
+    """Запускает массовый импорт или экспорт из командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Массовый импорт и экспорт каталога в CSV и JSONL."
+    )
+    parser.add_argument(
+        "--database", default=DATABASE, help="файл базы данных"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="импорт книг")
+    import_parser.add_argument("path", help="файл CSV или JSONL")
+    import_parser.add_argument(
+        "--batch-size", type=int, default=BULK_BATCH_SIZE
+    )
+    export_parser = commands.add_parser("export", help="экспорт книг")
+    export_parser.add_argument("path", help="файл CSV или JSONL")
+    args = parser.parse_args()
+    repository = get_repository(args.database)
+    if args.command == "import":
+        report = import_catalog(args.path, repository, args.batch_size)
+        for number, error in report.rejected:
+            print(f"Строка {number}: {error}")
+        print(
+            f"Импортировано книг: {report.processed}, "
+            f"отклонено: {len(report.rejected)}, "
+            f"{report.rows_per_second:.0f} строк/с"
+        )
+    else:
+        report = export_catalog(args.path, repository.iter_books())
+        print(
+            f"Выгружено книг: {report.processed}, "
+            f"{report.rows_per_second:.0f} строк/с"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import hashlib
+import marshal
+import os
+import struct
+from typing import Optional
+
+from classes import Book
+from constants import CACHE_SUFFIX, STREAM_CHUNK_SIZE
+from storage import atomic_file, file_signature
+
+MAGIC = b"BKC\x00"
+VERSION = 1
+HEADER = struct.Struct("<4sHQqQ32s")
+
+
+def cache_path(path: str) -> str:
+    """
+    Возвращает путь к кэшу разобранного каталога.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+
+    Returns:
+        str: Путь к файлу кэша рядом с базой данных.
+    """
+    return path + CACHE_SUFFIX
+
+
+def file_hash(path: str) -> bytes:
+    """
+    Считает хэш содержимого файла.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        bytes: 32 байта хэша BLAKE2b.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as file:
+        while chunk := file.read(STREAM_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def is_valid(path: str, header: bytes) -> bool:
+    """
+    Проверяет по заголовку кэша, что он построен по текущей базе.
+
+    Размер файла должен совпадать. Если совпадают и время изменения
+    с inode, файл считается прежним без чтения. Иначе (файл тронули,
+    скопировали или восстановили из копии) сравнивается хэш
+    содержимого.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        header (bytes): Заголовок файла кэша.
+
+    Returns:
+        bool: True, если кэшем можно пользоваться.
+    """
+    signature = file_signature(path)
+    if signature is None or len(header) != HEADER.size:
+        return False
+    magic, version, size, mtime, inode, digest = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or size != signature[1]:
+        return False
+    if (mtime, inode) == (signature[0], signature[2]):
+        return True
+    return file_hash(path) == digest
+
+
+def load_cache(path: str) -> Optional[dict[int, Book]]:
+    """
+    Читает разобранный каталог из кэша.
+
+    Сначала читается и проверяется заголовок фиксированной длины,
+    тело устаревшего кэша не читается вовсе. Тело — колонки книг,
+    сохраненные marshal как кортеж списков строк и чисел: такой
+    формат не исполняет кода при чтении и разбирается быстрее JSON.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+
+    Returns:
+        dict | None: Книги по ID или None, если кэша нет, он поврежден
+            или устарел.
+    """
+    try:
+        with open(cache_path(path), "rb") as file:
+            if not is_valid(path, file.read(HEADER.size)):
+                return None
+            body = file.read()
+        ids, titles, authors, years, statuses = marshal.loads(body)
+        return {
+            book_id: Book(book_id, title, author, year, status)
+            for book_id, title, author, year, status in zip(
+                ids, titles, authors, years, statuses, strict=True
+            )
+        }
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def write_cache(path: str, books: dict[int, Book]) -> bool:
+    """
+    Атомарно сохраняет разобранный каталог в кэш.
+
+    Кэш не пишется, если базы нет.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        books (dict): Книги снимка по ID.
+
+    Returns:
+        bool: True, если кэш записан.
+    """
+    signature = file_signature(path)
+    if signature is None:
+        return False
+    mtime, size, inode = signature
+    header = HEADER.pack(MAGIC, VERSION, size, mtime, inode, file_hash(path))
+    values = books.values()
+    body = (
+        [int(book.id) for book in values],
+        [book.title for book in values],
+        [book.author for book in values],
+        [int(book.year) for book in values],
+        [book.status for book in values],
+    )
+    with atomic_file(cache_path(path), binary=True) as file:
+        file.write(header)
+        marshal.dump(body, file)
+    return True
+
+
+def remove_cache(path: str) -> None:
+    """
+    Удаляет кэш каталога, если он есть.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+    """
+    try:
+        os.remove(cache_path(path))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,165 @@
+from itertools import groupby
+from typing import Iterable, Iterator
+
+import journal
+from classes import Book
+from constants import CHANGES_SUFFIX
+from sequence import read_meta, update_meta
+
+
+def changes_path(path: str) -> str:
+    """
+    Возвращает путь к ленте изменений каталога.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+
+    Returns:
+        str: Путь к файлу ленты рядом с базой данных.
+    """
+    return path + CHANGES_SUFFIX
+
+
+def append_changes(path: str, records: list[dict]) -> int:
+    """
+    Нумерует записи об изменениях и дописывает их в ленту.
+
+    Номера выдаются из счетчика в файле метаданных каталога
+    и растут на единицу с каждой записью. Вызывается под блокировкой
+    записи каталога, поэтому порядок номеров совпадает с порядком
+    изменений.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        records (list): Записи об изменениях в формате журнала.
+
+    Returns:
+        int: Номер последней записи.
+    """
+    def advance(meta: dict) -> int:
+        start = meta.get("change_seq", 0) + 1
+        meta["change_seq"] = start + len(records) - 1
+        return start
+
+    start = update_meta(path, advance)
+    journal.append_records(changes_path(path), [
+        dict(record, seq=seq) for seq, record in enumerate(records, start)
+    ])
+    return start + len(records) - 1
+
+
+def read_changes(path: str, since: int = 0) -> Iterator[dict]:
+    """
+    Читает изменения каталога с номерами больше since.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        since (int): Номер последнего уже полученного изменения.
+
+    Yields:
+        dict: Очередная запись ленты с полем 'seq'.
+    """
+    for record in journal.read_records(changes_path(path)):
+        if record["seq"] > since:
+            yield record
+
+
+def replica_seq(path: str) -> int:
+    """
+    Возвращает номер последнего изменения, примененного к реплике.
+
+    Args:
+        path (str): Путь к файлу базы данных реплики.
+
+    Returns:
+        int: Номер изменения или 0 для новой реплики.
+    """
+    return read_meta(path).get("replica_seq", 0)
+
+
+def apply_change(repository, change: dict) -> None:
+    """
+    Применяет одно изменение ленты к репозиторию.
+
+    Args:
+        repository (Repository): Репозиторий реплики.
+        change (dict): Запись ленты.
+
+    Raises:
+        ValueError: Если операция неизвестна.
+    """
+    operation = change["op"]
+    if operation == "add":
+        repository.add(Book.from_dict(change["book"]))
+    elif operation == "delete":
+        repository.delete(change["id"])
+    elif operation == "status":
+        repository.set_status(change["id"], change["status"])
+    elif operation == "replace":
+        repository.replace([Book.from_dict(book) for book in change["books"]])
+    else:
+        raise ValueError(f"Неизвестная операция ленты: {operation}")
+
+
+def apply_changes(repository, changes: Iterable[dict]) -> tuple[int, int]:
+    """
+    Применяет изменения ленты к реплике каталога.
+
+    Уже примененные изменения пропускаются по номеру, сохраненному
+    в метаданных реплики, поэтому одну и ту же порцию можно применять
+    повторно. Подряд идущие изменения сохраняются одной записью.
+    Номера новых изменений должны идти подряд сразу за последним
+    примененным: пропуск означает потерянное изменение, и реплика
+    разошлась бы с источником, поэтому порция тогда не применяется.
+
+    Args:
+        repository (Repository): Репозиторий реплики.
+        changes (Iterable): Записи ленты по возрастанию номеров.
+
+    Returns:
+        tuple: Количество примененных изменений и номер последнего.
+
+    Raises:
+        ValueError: Если в номерах изменений есть пропуск.
+    """
+    last = replica_seq(repository.path)
+    pending = [change for change in changes if change["seq"] > last]
+    for expected, change in enumerate(pending, start=last + 1):
+        if change["seq"] != expected:
+            raise ValueError(
+                f"Пропуск в ленте изменений: ожидался номер {expected}, "
+                f"получен {change['seq']}"
+            )
+    for replace, group in groupby(
+        pending, key=lambda change: change["op"] == "replace"
+    ):
+        if replace:
+            for change in group:
+                apply_change(repository, change)
+            continue
+        with repository.batch():
+            for change in group:
+                apply_change(repository, change)
+    if pending:
+        last = pending[-1]["seq"]
+
+        def store(meta: dict) -> None:
+            meta["replica_seq"] = last
+
+        update_meta(repository.path, store)
+    return len(pending), last
+
+
+def replicate(path: str, repository) -> tuple[int, int]:
+    """
+    Переносит в реплику изменения каталога, которых в ней еще нет.
+
+    Args:
+        path (str): Путь к файлу базы данных источника.
+        repository (Repository): Репозиторий реплики.
+
+    Returns:
+        tuple: Количество примененных изменений и номер последнего.
+    """
+    since = replica_seq(repository.path)
+    return apply_changes(repository, read_changes(path, since))
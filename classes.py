@@ -1,7 +1,40 @@
+import sys
+from array import array
+from typing import Iterable, Iterator
+
+from constants import STATUS_AVAILABLE, STATUS_ISSUED
+
+STATUSES = [STATUS_AVAILABLE, STATUS_ISSUED]
+
+
+def status_code(status: str) -> int:
+    """
+    Возвращает однобайтовый код статуса книги.
+
+    Незнакомые статусы добавляются в общий список статусов.
+
+    Args:
+        status (str): Статус книги.
+
+    Returns:
+        int: Код статуса.
+    """
+    try:
+        return STATUSES.index(status)
+    except ValueError:
+        if len(STATUSES) > 255:
+            raise ValueError(f"Слишком много статусов: {status}")
+        STATUSES.append(sys.intern(status))
+        return len(STATUSES) - 1
+
+
 class Book:
     """
     Инициализирует объект книги.
 
+    Поля хранятся в __slots__, год — целым числом, а статус —
+    ссылкой на общий интернированный экземпляр строки.
+
     Args:
         id (str): Уникальный идентификатор книги.
         title (str): Название книги.
@@ -10,14 +43,34 @@ class Book:
         status (str): Статус книги (например, 'В наличии', 'Выдана').
     """
 
+    __slots__ = ("id", "title", "author", "_year", "_status")
+
     def __init__(
         self, id: str, title: str, author: str, year: str, status: str
     ) -> None:
         self.id: str = id
         self.title: str = title
         self.author: str = author
-        self.year: str = year
-        self.status: str = status
+        self.year = year
+        self.status = status
+
+    @property
+    def year(self) -> str:
+        """Год издания книги в виде строки."""
+        return str(self._year)
+
+    @year.setter
+    def year(self, value: str) -> None:
+        self._year: int = int(value)
+
+    @property
+    def status(self) -> str:
+        """Статус книги."""
+        return self._status
+
+    @status.setter
+    def status(self, value: str) -> None:
+        self._status: str = STATUSES[status_code(value)]
 
     def to_dict(self) -> dict[str, str]:
         """
@@ -54,3 +107,78 @@ class Book:
             year=data["year"],
             status=data["status"],
         )
+
+
+class BookTable:
+    """
+    Колоночное представление каталога книг.
+
+    ID, годы и коды статусов хранятся в компактных массивах,
+    а названия и авторы — в списках строк, где одинаковые
+    имена авторов ссылаются на один объект из общего пула.
+
+    Args:
+        books (Iterable): Книги для начального заполнения таблицы.
+    """
+
+    def __init__(self, books: Iterable[Book] = ()) -> None:
+        self.ids = array("q")
+        self.years = array("h")
+        self.statuses = bytearray()
+        self.titles: list[str] = []
+        self.authors: list[str] = []
+        self._author_pool: dict[str, str] = {}
+        for book in books:
+            self.append(book)
+
+    def append(self, book: Book) -> None:
+        """
+        Добавляет книгу в конец таблицы.
+
+        Args:
+            book (Book): Книга.
+        """
+        self.ids.append(int(book.id))
+        self.years.append(int(book.year))
+        self.statuses.append(status_code(book.status))
+        self.titles.append(book.title)
+        self.authors.append(
+            self._author_pool.setdefault(book.author, book.author)
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, position: int) -> Book:
+        return Book(
+            self.ids[position],
+            self.titles[position],
+            self.authors[position],
+            self.years[position],
+            STATUSES[self.statuses[position]],
+        )
+
+    def __iter__(self) -> Iterator[Book]:
+        return (self[position] for position in range(len(self)))
+
+    def to_dicts(self) -> list[dict[str, str]]:
+        """
+        Преобразует таблицу в список словарей для хранения в JSON.
+
+        Returns:
+            list: Словари книг в порядке таблицы.
+        """
+        return [book.to_dict() for book in self]
+
+    @staticmethod
+    def from_dicts(data: Iterable[dict[str, str]]) -> "BookTable":
+        """
+        Создает таблицу из словарей книг.
+
+        Args:
+            data (Iterable): Словари с полями книги.
+
+        Returns:
+            BookTable: Заполненная таблица.
+        """
+        return BookTable(Book.from_dict(book) for book in data)
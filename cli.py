@@ -0,0 +1,295 @@
+import argparse
+import json
+import sys
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from bulk import assign_ids, export_catalog, import_catalog, validate_rows
+from changefeed import apply_changes, read_changes, replicate
+from classes import Book
+from constants import DATABASE
+from engine_logic import opposite_status, parse_ids
+from query import SORT_KEYS, search_books
+from repository import Repository, get_repository
+
+
+def print_json(data: dict) -> None:
+    """
+    Печатает результат команды в формате JSON.
+
+    Args:
+        data (dict): Результат команды.
+    """
+    json.dump(data, sys.stdout, ensure_ascii=False)
+    sys.stdout.write("\n")
+
+
+def read_records(records: list[str]) -> Iterator[dict]:
+    """
+    Разбирает записи книг из аргументов или из стандартного ввода.
+
+    Args:
+        records (list): JSON объекты книг из аргументов командной строки.
+            Если список пуст, записи читаются построчно из stdin.
+
+    Yields:
+        dict: Поля очередной книги.
+    """
+    lines: Iterable[str] = records or sys.stdin
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_changes_file(path: str) -> list[dict]:
+    """
+    Читает изменения из JSON вывода команды changes.
+
+    Args:
+        path (str): Путь к файлу или '-' для стандартного ввода.
+
+    Returns:
+        list: Записи ленты изменений.
+    """
+    if path == "-":
+        return json.load(sys.stdin)["changes"]
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)["changes"]
+
+
+def add_books(repository: Repository, records: Iterable[dict]) -> dict:
+    """
+    Добавляет книги из записей с проверкой полей.
+
+    Args:
+        repository (Repository): Репозиторий книг.
+        records (Iterable): Поля добавляемых книг.
+
+    Returns:
+        dict: Добавленные книги и номера отклоненных записей с ошибками.
+    """
+    books, rejected = validate_rows(enumerate(records, start=1))
+    assign_ids(repository, books)
+    repository.add_many(books)
+    return {
+        "added": [book.to_dict() for book in books],
+        "rejected": [
+            {"record": number, "error": error} for number, error in rejected
+        ],
+    }
+
+
+def delete_books(repository: Repository, book_ids: list[int]) -> dict:
+    """
+    Удаляет книги по списку ID одним сохранением.
+
+    Args:
+        repository (Repository): Репозиторий книг.
+        book_ids (list): ID удаляемых книг.
+
+    Returns:
+        dict: Удаленные и ненайденные ID.
+    """
+    deleted, missing = repository.delete_many(book_ids)
+    return {"deleted": [int(book.id) for book in deleted], "missing": missing}
+
+
+def toggle_statuses(repository: Repository, book_ids: list[int]) -> dict:
+    """
+    Меняет статус книг по списку ID одним сохранением.
+
+    Args:
+        repository (Repository): Репозиторий книг.
+        book_ids (list): ID книг.
+
+    Returns:
+        dict: Новые статусы книг и ненайденные ID.
+    """
+    books = {book_id: repository.get(book_id) for book_id in book_ids}
+    changed, missing = repository.set_status_many({
+        book_id: opposite_status(book.status)
+        for book_id, book in books.items() if book is not None
+    })
+    missing += [book_id for book_id, book in books.items() if book is None]
+    return {
+        "changed": [
+            {"id": int(book.id), "status": book.status} for book in changed
+        ],
+        "missing": missing,
+    }
+
+
+def page(
+    books: Iterable[Book], offset: int = 0, limit: Optional[int] = None
+) -> dict:
+    """
+    Выбирает страницу книг.
+
+    Args:
+        books (Iterable): Книги.
+        offset (int): Сколько книг пропустить.
+        limit (Optional[int]): Сколько книг вернуть, None — все.
+
+    Returns:
+        dict: Книги страницы.
+    """
+    stop = None if limit is None else offset + limit
+    return {
+        "books": [book.to_dict() for book in islice(books, offset, stop)]
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Создает разборщик аргументов командной строки.
+
+    Returns:
+        argparse.ArgumentParser: Разборщик с подкомандами.
+    """
+    parser = argparse.ArgumentParser(
+        prog="bible_book.py",
+        description="Неинтерактивное управление библиотекой.",
+    )
+    parser.add_argument(
+        "--database", default=DATABASE, help="файл базы данных"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    add_parser = commands.add_parser(
+        "add", help="добавить книги из JSON объектов или строк stdin"
+    )
+    add_parser.add_argument("records", nargs="*", help="JSON объекты книг")
+    delete_parser = commands.add_parser("delete", help="удалить книги")
+    delete_parser.add_argument(
+        "ids", nargs="+", help="ID или диапазоны вида 4 6 10-40"
+    )
+    toggle_parser = commands.add_parser(
+        "toggle-status", help="изменить статус книг"
+    )
+    toggle_parser.add_argument(
+        "ids", nargs="+", help="ID или диапазоны вида 4 6 10-40"
+    )
+    search_parser = commands.add_parser("search", help="искать книги")
+    search_parser.add_argument(
+        "field",
+        choices=(
+            "title", "author", "year", "year_range", "status", "fuzzy"
+        ),
+    )
+    search_parser.add_argument("value")
+    search_parser.add_argument(
+        "--prefix", action="store_true",
+        help="искать по началу слова в названии или авторе",
+    )
+    search_parser.add_argument(
+        "--order-by", choices=tuple(SORT_KEYS), help="поле сортировки"
+    )
+    search_parser.add_argument(
+        "--desc", action="store_true", help="сортировать по убыванию"
+    )
+    for command_parser in (search_parser, commands.add_parser(
+        "list", help="показать книги"
+    )):
+        command_parser.add_argument("--offset", type=int, default=0)
+        command_parser.add_argument("--limit", type=int)
+    changes_parser = commands.add_parser(
+        "changes", help="изменения каталога после номера --since"
+    )
+    changes_parser.add_argument("--since", type=int, default=0)
+    changes_parser.add_argument("--limit", type=int)
+    replicate_parser = commands.add_parser(
+        "replicate", help="применить изменения каталога к реплике"
+    )
+    replicate_parser.add_argument("replica", help="файл базы реплики")
+    replicate_parser.add_argument(
+        "--input",
+        help="JSON вывод команды changes ('-' — stdin) вместо чтения ленты",
+    )
+    import_parser = commands.add_parser("import", help="импорт CSV/JSONL")
+    import_parser.add_argument("path")
+    export_parser = commands.add_parser("export", help="экспорт CSV/JSONL")
+    export_parser.add_argument("path")
+    return parser
+
+
+def run(args: argparse.Namespace, repository: Repository) -> dict:
+    """
+    Выполняет подкоманду над репозиторием.
+
+    Args:
+        args (argparse.Namespace): Разобранные аргументы.
+        repository (Repository): Репозиторий книг.
+
+    Returns:
+        dict: Результат команды для вывода в JSON.
+    """
+    if args.command == "add":
+        return add_books(repository, read_records(args.records))
+    if args.command == "delete":
+        return delete_books(repository, parse_ids(",".join(args.ids)))
+    if args.command == "toggle-status":
+        return toggle_statuses(repository, parse_ids(",".join(args.ids)))
+    if args.command == "search":
+        books = search_books(
+            repository, args.field, args.value, order_by=args.order_by,
+            limit=args.limit, offset=args.offset, descending=args.desc,
+            prefix=args.prefix,
+        )
+        return {"books": [book.to_dict() for book in books]}
+    if args.command == "list":
+        return page(repository.iter_books(), args.offset, args.limit)
+    if args.command == "changes":
+        changes = list(islice(
+            read_changes(repository.path, args.since), args.limit
+        ))
+        last = changes[-1]["seq"] if changes else args.since
+        return {"changes": changes, "last": last}
+    if args.command == "replicate":
+        replica = get_repository(args.replica)
+        if args.input is None:
+            applied, last = replicate(repository.path, replica)
+        else:
+            changes = read_changes_file(args.input)
+            applied, last = apply_changes(replica, changes)
+        return {"applied": applied, "last": last}
+    if args.command == "import":
+        report = import_catalog(args.path, repository)
+        return {
+            "imported": report.processed,
+            "rejected": [
+                {"line": number, "error": error}
+                for number, error in report.rejected
+            ],
+            "rows_per_second": round(report.rows_per_second),
+        }
+    report = export_catalog(args.path, repository.iter_books())
+    return {
+        "exported": report.processed,
+        "rows_per_second": round(report.rows_per_second),
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Точка входа неинтерактивного режима.
+
+    Каталог загружается один раз на вызов, все ID и записи
+    команды применяются к нему и сохраняются одной записью.
+
+    Args:
+        argv (Optional[list]): Аргументы командной строки.
+
+    Returns:
+        int: Код завершения: 0 при успехе, 1 при ошибке.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        repository = get_repository(args.database)
+        print_json(run(args, repository))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print_json({"error": str(e)})
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
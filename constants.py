@@ -8,3 +8,45 @@ DATABASE = "book.json"
 STATUS_AVAILABLE = "В наличии"
 STATUS_ISSUED = "Выдана"
 MIN_YEAR = 1000
+JOURNAL_ENABLED = False
+JOURNAL_SUFFIX = ".journal"
+CHANGE_FEED_ENABLED = False
+CHANGES_SUFFIX = ".changes"
+CATALOG_CACHE_ENABLED = False
+CACHE_SUFFIX = ".cache"
+JOURNAL_COMPACT_SIZE = 1024 * 1024
+SNAPSHOT_BACKUPS = 0
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAMING_MIN_SIZE = 256 * 1024 * 1024
+SQLITE_SUFFIXES = (".sqlite3", ".sqlite", ".db")
+BINARY_SUFFIXES = (".bbk",)
+SEARCH_FIELDS = {
+    "1": "title",
+    "2": "author",
+    "3": "year",
+    "4": "year_range",
+    "5": "status",
+    "6": "fuzzy",
+}
+MENU_ACTIONS = {
+    "1": "add_book",
+    "2": "delete_book",
+    "3": "search",
+    "4": "all_books",
+    "5": "change_status",
+}
+STATUS_CHOICES = {"1": STATUS_AVAILABLE, "2": STATUS_ISSUED}
+TITLE_MIN_LENGTH = 2
+TITLE_MAX_LENGTH = 250
+AUTHOR_MAX_LENGTH = 250
+BULK_BATCH_SIZE = 10_000
+META_SUFFIX = ".meta"
+LOCK_SUFFIX = ".lock"
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+SERVER_PAGE_SIZE = 50
+PAGE_SIZE = 10
+MAX_IDS = 10_000
+QUERY_CACHE_SIZE = 256
+METRICS_ENV = "BIBLE_METRICS"
+FUZZY_THRESHOLD = 0.3
@@ -1,10 +1,103 @@
+import atexit
 import json
-import os
-from datetime import datetime
+import sys
+from typing import Callable, Iterable, Iterator, Optional
 
+import metrics
 from classes import Book
-from constants import (BLUE, DATABASE, GREEN, MIN_YEAR, RED, RESET, SEPARATOR,
-                       STATUS_AVAILABLE, STATUS_ISSUED)
+from constants import (AUTHOR_MAX_LENGTH, BINARY_SUFFIXES, BLUE, DATABASE,
+                       GREEN, MAX_IDS, MIN_YEAR, PAGE_SIZE, RED, RESET,
+                       SEARCH_FIELDS, SEPARATOR, SQLITE_SUFFIXES,
+                       STATUS_AVAILABLE, STATUS_CHOICES, STATUS_ISSUED,
+                       TITLE_MAX_LENGTH, TITLE_MIN_LENGTH)
+from repository import Repository, get_repository
+from search_index import parse_year_range
+from validators import is_valid_author, is_valid_title, is_valid_year
+
+
+def report_load_error(error: Exception) -> None:
+    """
+    Сообщает пользователю об ошибке загрузки базы данных.
+
+    Args:
+        error (Exception): Исключение, возникшее при чтении базы.
+    """
+    if isinstance(error, FileNotFoundError):
+        print(
+            f"{RED}Ошибка: Файл {RESET}'{DATABASE}' "
+            f"{RED}не найден. {RESET}{error}"
+        )
+    elif isinstance(error, json.JSONDecodeError):
+        print(f"{RED}Ошибка: Невозможно разобрать файл JSON. {RESET}{error}")
+    elif isinstance(error, (TypeError, KeyError, ValueError)):
+        print(f"{RED}Ошибка: Некорректные данные в JSON. {RESET}{error}")
+    else:
+        print(f"{RED}Неизвестная ошибка: {RESET}{error}")
+    to_main_menu()
+
+
+def load_repository() -> Optional[Repository]:
+    """
+    Возвращает репозиторий книг для текущей базы данных.
+
+    Каталог загружается один раз за процесс и перечитывается
+    только при изменении файла.
+    Returns:
+        Repository | None: Репозиторий или None, если базу
+            не удалось загрузить.
+    """
+    try:
+        return get_repository(DATABASE)
+    except Exception as e:
+        report_load_error(e)
+
+
+def warm_up_catalog() -> None:
+    """
+    Заранее загружает JSON каталог.
+
+    Вызывается в фоновом потоке, пока на экране главное меню.
+    Базы SQLite и двоичные каталоги не загружаются: соединение
+    SQLite можно использовать только в создавшем его потоке,
+    а двоичный каталог и так открывается мгновенно. Каталоги,
+    которые читаются потоково, тоже не загружаются.
+    Ошибки загрузки здесь не выводятся: о них сообщит первое
+    действие пользователя. При выходе из программы каталог
+    сохраняется в кэш для следующего запуска, если кэш включен.
+    """
+    if DATABASE.lower().endswith(SQLITE_SUFFIXES + BINARY_SUFFIXES):
+        return
+    try:
+        repository = get_repository(DATABASE, refresh=False)
+        repository.warm_up()
+    except Exception:
+        return
+    atexit.register(repository.store_cache)
+
+
+def iter_catalog(
+    field: Optional[str] = None, value: Optional[str] = None
+) -> Iterator[Book]:
+    """
+    Перебирает книги базы данных для однократного прохода.
+
+    Большие каталоги читаются из файла потоково, без загрузки
+    в память целиком.
+    Args:
+        field (Optional[str]): Поле поиска: 'title', 'author' или 'year'.
+            Если не указано, перебираются все книги.
+        value (Optional[str]): Значение поиска.
+    Yields:
+        Book: Очередная книга каталога.
+    """
+    try:
+        repository = get_repository(DATABASE, refresh=False)
+        if field is None:
+            yield from repository.iter_books()
+        else:
+            yield from repository.search(field, value)
+    except Exception as e:
+        report_load_error(e)
 
 
 def json_to_data() -> list[Book]:
@@ -15,45 +108,25 @@ def json_to_data() -> list[Book]:
     Returns:
         list: Список объектов класса Book.
     """
-    try:
-        if not os.path.exists(DATABASE):
-            with open(DATABASE, "w", encoding="utf-8") as file:
-                json.dump([], file, indent=4)
-        with open(DATABASE, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            return [Book.from_dict(book) for book in data]
-    except FileNotFoundError as e:
-        print(
-            f"{RED}Ошибка: Файл {RESET}'{DATABASE}' {RED}не найден. {RESET}{e}"
-        )
-        to_main_menu()
-    except json.JSONDecodeError as e:
-        print(f"{RED}Ошибка: Невозможно разобрать файл JSON. {RESET}{e}")
-        to_main_menu()
-    except TypeError as e:
-        print(f"{RED}Ошибка: Некорректные данные в JSON. {RESET}{e}")
-        to_main_menu()
-    except Exception as e:
-        print(f"{RED}Неизвестная ошибка: {RESET}{e}")
-        to_main_menu()
+    repository = load_repository()
+    if repository is None:
+        return []
+    return repository.all()
 
 
-def data_to_json(books: list[Book]) -> None:
+def save_changes(action: Callable[[], None]) -> bool:
     """
-    Сохраняет список объектов Book в JSON файл.
+    Выполняет изменение каталога с сохранением в JSON файл.
 
     Args:
-        books (list): Список объектов класса Book.
+        action (Callable): Функция, изменяющая репозиторий.
+
+    Returns:
+        bool: True, если изменения успешно сохранены.
     """
     try:
-        with open(DATABASE, "w", encoding="utf-8") as file:
-            json.dump(
-                [
-                    book.to_dict() for book in books
-                ],
-                file, indent=4,
-                ensure_ascii=False
-            )
+        action()
+        return True
     except FileNotFoundError:
         print(
             f"{RED}Ошибка: Директория для файла {RESET}"
@@ -77,29 +150,33 @@ def data_to_json(books: list[Book]) -> None:
     except Exception as e:
         print(f"{RED}Произошла непредвиденная ошибка: {RESET}{e}")
         to_main_menu()
+    return False
+
+
+def data_to_json(books: list[Book]) -> None:
+    """
+    Сохраняет список объектов Book в JSON файл.
+
+    Args:
+        books (list): Список объектов класса Book.
+    """
+    save_changes(
+        lambda: get_repository(DATABASE, refresh=False).replace(books)
+    )
 
 
-def id_generator() -> str:
+def id_generator() -> int:
     """
-    Генерирует уникальный ID для новой книги на основе последнего ID в списке.
+    Генерирует уникальный ID для новой книги.
 
     Returns:
-        str: Новый уникальный ID.
+        int: Новый уникальный ID.
     """
-    try:
-        books = json_to_data()
-        if books:
-            return int(books[-1].id) + 1
+    repository = load_repository()
+    if repository is None:
         return 1
-    except FileNotFoundError:
-        print(f"{RED}Файл базы данных не найден.{RESET}")
-        to_main_menu()
-    except json.JSONDecodeError:
-        print(
-            f"{RED}Ошибка в формате JSON файла. {RESET}"
-            f"{RED}Проверьте целостность базы.{RESET}"
-        )
-        to_main_menu()
+    try:
+        return repository.next_id()
     except (ValueError, IndexError):
         print(
             f"О{RED}шибка при генерации ID. {RESET}"
@@ -108,6 +185,71 @@ def id_generator() -> str:
         to_main_menu()
 
 
+def opposite_status(status: str) -> str:
+    """
+    Возвращает статус, на который меняется текущий.
+
+    Args:
+        status (str): Текущий статус книги.
+
+    Returns:
+        str: 'Выдана' для книги в наличии, иначе 'В наличии'.
+    """
+    return STATUS_ISSUED if status == STATUS_AVAILABLE else STATUS_AVAILABLE
+
+
+def parse_ids(text: str) -> list[int]:
+    """
+    Разбирает список ID вида '4,6,10-40'.
+
+    Размер диапазона проверяется до его разворачивания, поэтому
+    опечатка вроде '1-100000000' не занимает память.
+
+    Args:
+        text (str): ID через запятую, диапазоны через дефис.
+
+    Returns:
+        list: ID без повторов в порядке ввода.
+
+    Raises:
+        ValueError: Если ID не число, меньше 1, диапазон убывает
+            или всего ID больше MAX_IDS.
+    """
+    book_ids: dict[int, None] = {}
+    for part in text.split(","):
+        start, separator, end = part.strip().partition("-")
+        first = int(start)
+        last = int(end) if separator else first
+        if first < 1 or first > last:
+            raise ValueError(f"Некорректный ID: {part}")
+        if len(book_ids) + last - first + 1 > MAX_IDS:
+            raise ValueError(f"Можно указать не больше {MAX_IDS} ID")
+        book_ids.update(dict.fromkeys(range(first, last + 1)))
+    return list(book_ids)
+
+
+def format_ids(book_ids: list[int]) -> str:
+    """
+    Записывает список ID кратко, сворачивая подряд идущие в диапазоны.
+
+    Args:
+        book_ids (list): ID книг.
+
+    Returns:
+        str: Строка вида '4, 6, 10-40'.
+    """
+    parts = []
+    for book_id in sorted(book_ids):
+        if parts and parts[-1][1] == book_id - 1:
+            parts[-1][1] = book_id
+        else:
+            parts.append([book_id, book_id])
+    return ", ".join(
+        str(first) if first == last else f"{first}-{last}"
+        for first, last in parts
+    )
+
+
 def to_main_menu(func=None):
     """Меню выбора действий.
 
@@ -146,33 +288,30 @@ def add_book() -> None:
 
     Сохраняет изменения в JSON файл.
     """
-    try:
-        books = json_to_data()
-    except Exception as e:
-        print(f"{RED}Ошибка при загрузке базы данных: {RESET}{e}")
-        to_main_menu()
+    repository = load_repository()
+    if repository is None:
         return
-    book_id = id_generator()
     while True:
         title = input(f"{BLUE}Введите название книги:{RESET}")
-        if 2 <= len(title) <= 250:
+        if is_valid_title(title):
             break
         print(
-            f"{RED}Название книги должно быть от 2 до 250 символов.{RESET}"
+            f"{RED}Название книги должно быть от {TITLE_MIN_LENGTH} "
+            f"до {TITLE_MAX_LENGTH} символов.{RESET}"
             f"{RED}Попробуйте снова.{RESET}"
         )
     while True:
         author = input(f"{BLUE}Введите имя автора:{RESET}")
-        if len(author) <= 250:
+        if is_valid_author(author):
             break
         print(
-            f"{RED}Имя не может превышать 250 символов. {RESET}"
-            f"{RED}Попробуйте снова.{RESET}"
+            f"{RED}Имя не может превышать {AUTHOR_MAX_LENGTH} "
+            f"символов. {RESET}{RED}Попробуйте снова.{RESET}"
         )
     while True:
         year = input(f"{BLUE}Введите год издания:{RESET}")
         try:
-            if MIN_YEAR <= int(year) <= datetime.now().year:
+            if is_valid_year(int(year)):
                 break
             print(
                 f"{RED}Год не может быть больше {RESET}"
@@ -182,9 +321,9 @@ def add_book() -> None:
         except ValueError:
             print(f"{RED}Введите корректное число.{RESET}")
     status = STATUS_AVAILABLE
-    new_book = Book(book_id, title, author, year, status)
-    books.append(new_book)
-    data_to_json(books)
+    new_book = Book(repository.next_id(), title, author, year, status)
+    if not save_changes(lambda: repository.add(new_book)):
+        return
     print(
         f"{GREEN}Книга {RESET}'{new_book.title}'"
         f"{GREEN} добавлена с ID {new_book.id}!{RESET}"
@@ -193,37 +332,55 @@ def add_book() -> None:
 
 def delete_book() -> None:
     """
-    Удаляет книгу из базы данных по ID.
+    Удаляет книги из базы данных по списку ID.
 
-    Сохраняет изменения в JSON файл.
+    ID вводятся через запятую, диапазоны — через дефис, например
+    '4,6,10-40'. Все книги удаляются с одним сохранением,
+    о ненайденных ID сообщается отдельно.
     """
-    try:
-        books = json_to_data()
-    except Exception as e:
-        print(f"{RED}Ошибка при загрузке базы данных: {RESET}{e}")
-        to_main_menu()
+    repository = load_repository()
+    if repository is None:
         return
-    if not books:
+    if not len(repository):
         print(f"{RED}База данных пуста. Удаление невозможно.{RESET}")
         return
-    delete_id = input(f"{BLUE}Введите ID книги для удаления: {RESET}")
-    initial_count = len(books)
-    books = [book for book in books if book.id != int(delete_id)]
-    if len(books) == initial_count:
-        print(f"{RED}Книга с ID {RESET}{delete_id}{RED} не найдена.{RESET}")
+    delete_ids = input(f"{BLUE}Введите ID книги для удаления: {RESET}")
+    try:
+        book_ids = parse_ids(delete_ids)
+    except ValueError:
+        print(f"{RED}Введите ID через запятую или диапазон, "
+              f"например 4,6,10-40.{RESET}")
+        return
+    found = [
+        book_id for book_id in book_ids
+        if repository.get(book_id) is not None
+    ]
+    missing = sorted(set(book_ids) - set(found))
+    if not found:
+        print(f"{RED}Книга с ID {RESET}{delete_ids}{RED} не найдена.{RESET}")
         return
+    if missing:
+        print(f"{RED}Книги с ID {RESET}{format_ids(missing)}"
+              f"{RED} не найдены.{RESET}")
     confirm = input(
         f"{BLUE}Вы уверены, что хотите удалить книгу с ID {RESET}"
-        f"{RED}{delete_id}? {RED}(y/n):{RESET} "
+        f"{RED}{format_ids(found)}? {RED}(y/n):{RESET} "
     )
     if confirm.lower() != 'y':
         print(f"{GREEN}Удаление отменено.{RESET}")
         return
-    data_to_json(books)
-    print(
-        f"{GREEN}Книга с ID {RESET}{delete_id}"
-        f"{GREEN} успешно удалена.{RESET}"
-    )
+    if not save_changes(lambda: repository.delete_many(found)):
+        return
+    if len(found) == 1:
+        print(
+            f"{GREEN}Книга с ID {RESET}{found[0]}"
+            f"{GREEN} успешно удалена.{RESET}"
+        )
+    else:
+        print(
+            f"{GREEN}Удалено книг: {RESET}{len(found)} "
+            f"{GREEN}(ID {RESET}{format_ids(found)}{GREEN}).{RESET}"
+        )
 
 
 def search() -> None:
@@ -231,35 +388,50 @@ def search() -> None:
     Осуществляет поиск книги в базе данных.
 
     Поиск осуществляется по выбранному параметру:
-    названию, автору или году издания.
+    названию, автору, году издания, диапазону лет, статусу
+    или нечетко по названию и автору с учетом опечаток.
     Выводит результаты поиска в консоль.
     """
-    try:
-        books = json_to_data()
-    except Exception as e:
-        print(f"{RED}Ошибка при загрузке базы данных: {RESET}{e}")
-        to_main_menu()
-        return
-    if not books:
+    books = iter_catalog()
+    first_book = next(books, None)
+    books.close()
+    if first_book is None:
         print(f"{RED}База данных пуста. Поиск невозможен.{RESET}")
         return
     print(f"{BLUE}По какому параметру будем осуществлять поиск?{RESET}")
     print(f"{BLUE}1. По названию{RESET}")
     print(f"{BLUE}2. По автору{RESET}")
     print(f"{BLUE}3. По году{RESET}")
+    print(f"{BLUE}4. По диапазону лет{RESET}")
+    print(f"{BLUE}5. По статусу{RESET}")
+    print(f"{BLUE}6. По названию или автору с опечатками{RESET}")
     while True:
         search_parameter: str = input(
             f"{BLUE}Введите номер параметра поиска: {RESET}"
         )
-        if search_parameter in {"1", "2", "3"}:
+        if search_parameter in SEARCH_FIELDS:
             break
         print(f"{RED}Некорректный выбор параметра. Попробуйте снова.{RESET}")
+    if search_parameter == "4":
+        print(f"{BLUE}Введите годы через дефис, например 1990-2000.{RESET}")
+    if search_parameter == "5":
+        for number, status in STATUS_CHOICES.items():
+            print(f"{BLUE}{number}. {status}{RESET}")
     while True:
         search_value: str = input(f"{BLUE}Введите занчение поиска: {RESET}")
-        if search_parameter in {"1", "2"} and search_value:
+        if search_parameter in {"1", "2", "6"} and search_value:
             break
+        if search_parameter == "5":
+            if search_value in STATUS_CHOICES:
+                search_value = STATUS_CHOICES[search_value]
+                break
+            print(f"{RED}Выберите один из предложенных статусов.{RESET}")
+            continue
         try:
-            if MIN_YEAR <= int(search_value) <= datetime.now().year:
+            start_year, end_year = parse_year_range(search_value)
+            if search_parameter == "3" and start_year != end_year:
+                raise ValueError(search_value)
+            if is_valid_year(start_year) and is_valid_year(end_year):
                 break
             print(
                 f"{RED}Год не может быть больше {RESET}"
@@ -271,96 +443,141 @@ def search() -> None:
                 f"{RED}Введите корректный год:"
                 f"(от {MIN_YEAR} до текущего).{RESET}"
             )
-    if search_parameter == "1":
-        filtred_books = [
-            book for book in books
-            if search_value.lower() in book.title.lower()
-        ]
-    elif search_parameter == "2":
-        filtred_books = [
-            book for book in books
-            if search_value.lower() in book.author.lower()
-        ]
-    elif search_parameter == "3":
-        filtred_books = [
-            book for book in books
-            if book.year == search_value
-        ]
-    if filtred_books:
-        print(f"\n{SEPARATOR}")
-        print(f"{BLUE}Результаты поиска: {RESET}")
-        for book in filtred_books:
-            print(f"{GREEN}ID: {book.id}{RESET}")
-            print(f"{BLUE}Название:{RESET} {book.title}")
-            print(f"{BLUE}Автор:{RESET} {book.author}")
-            print(f"{BLUE}Год издания:{RESET} {book.year}")
-            print(f"{BLUE}Наличие:{RESET} {book.status}")
-            print(f"{SEPARATOR}")
-    else:
-        print("Совпадений не найдено.")
-
-
-def all_books() -> None:
-    """Выводит в консоль список всех книг и параметров из базы данных."""
-    try:
-        books = json_to_data()
-    except Exception as e:
-        print(f"Ошибка при загрузке базы данных: {e}")
-        to_main_menu()
-        return
-    for book in books:
-        print(f"\n{SEPARATOR}")
+    filtred_books = iter_catalog(
+        SEARCH_FIELDS[search_parameter], search_value
+    )
+    found = False
+    for book in filtred_books:
+        if not found:
+            print(f"\n{SEPARATOR}")
+            print(f"{BLUE}Результаты поиска: {RESET}")
+            found = True
         print(f"{GREEN}ID: {book.id}{RESET}")
         print(f"{BLUE}Название:{RESET} {book.title}")
         print(f"{BLUE}Автор:{RESET} {book.author}")
         print(f"{BLUE}Год издания:{RESET} {book.year}")
         print(f"{BLUE}Наличие:{RESET} {book.status}")
-        print(f"{SEPARATOR}\n")
+        print(f"{SEPARATOR}")
+    if not found:
+        print("Совпадений не найдено.")
+
+
+def render_books(books: Iterable[Book]) -> str:
+    """
+    Форматирует карточки книг в одну строку для единой записи в консоль.
+
+    Args:
+        books (Iterable): Книги для вывода.
+
+    Returns:
+        str: Текст карточек книг.
+    """
+    return "".join(
+        f"\n{SEPARATOR}\n"
+        f"{GREEN}ID: {book.id}{RESET}\n"
+        f"{BLUE}Название:{RESET} {book.title}\n"
+        f"{BLUE}Автор:{RESET} {book.author}\n"
+        f"{BLUE}Год издания:{RESET} {book.year}\n"
+        f"{BLUE}Наличие:{RESET} {book.status}\n"
+        f"{SEPARATOR}\n\n"
+        for book in books
+    )
+
+
+def all_books() -> None:
+    """
+    Выводит в консоль список всех книг и параметров из базы данных.
+
+    Книги показываются страницами по PAGE_SIZE: форматируется только
+    видимая страница, и она выводится одной записью. Между страницами
+    можно перемещаться вперед и назад или перейти к книге по ID.
+    """
+    offset = 0
+    while True:
+        try:
+            repository = get_repository(DATABASE, refresh=False)
+            books = repository.page(offset, PAGE_SIZE + 1)
+        except Exception as e:
+            report_load_error(e)
+            return
+        if not books and offset == 0:
+            print(f"{RED}База данных пуста. Книг пока нет.{RESET}")
+            return
+        has_next = len(books) > PAGE_SIZE
+        with metrics.timed("render.page"):
+            sys.stdout.write(render_books(books[:PAGE_SIZE]))
+        if offset == 0 and not has_next:
+            sys.stdout.flush()
+            return
+        print(f"{BLUE}Страница {offset // PAGE_SIZE + 1}{RESET}")
+        command = input(
+            f"{BLUE}n — следующая, p — предыдущая, "
+            f"ID книги — перейти к ней, q — выход: {RESET}"
+        ).strip().lower()
+        if command == "n":
+            if has_next:
+                offset += PAGE_SIZE
+            else:
+                print(f"{RED}Это последняя страница.{RESET}")
+        elif command == "p":
+            offset = max(offset - PAGE_SIZE, 0)
+        elif command.isdigit():
+            position = repository.position(int(command))
+            if position is None:
+                print(
+                    f"{RED}Книга с ID {RESET}{command}{RED} не найдена.{RESET}"
+                )
+            else:
+                offset = position - position % PAGE_SIZE
+        elif command in ("q", ""):
+            return
+        else:
+            print(
+                f"{RED}Неверный ввод. {RESET}"
+                f"{RED}Выберите один из предложенных вариантов.{RESET}"
+            )
 
 
 def change_status() -> None:
     """
-    Изменяет статус книги по её ID.
+    Изменяет статус книг по списку ID.
 
     Если статус был 'В наличии', меняется на 'Выдана' и наоборот.
-    Сохраняет изменения в JSON файл.
+    ID вводятся через запятую, диапазоны — через дефис, например
+    '4,6,10-40'. Все изменения сохраняются одной записью.
     """
-    try:
-        books = json_to_data()
-    except Exception as e:
-        print(f"{RED}Ошибка при загрузке базы данных: {RESET}{e}")
-        to_main_menu()
+    repository = load_repository()
+    if repository is None:
         return
     while True:
-        change_id = input(f"{BLUE}Введите ID книги:{RESET}")
+        change_ids = input(f"{BLUE}Введите ID книги:{RESET}")
         try:
-            if 1 <= int(change_id):
-                break
+            book_ids = parse_ids(change_ids)
+            break
+        except ValueError:
             print(
-                f"{RED}Id не может быть больше меньше 1.{RESET}"
-                f"{RED}Попробуйте снова:{RESET}"
+                f"{RED}Введите ID не меньше 1 через запятую или диапазон, "
+                f"например 4,6,10-40.{RESET}"
             )
-        except ValueError:
-            print(f'{RED}Введите корректное число.{RESET}')
-    try:
-        book = next(book for book in books if book.id == int(change_id))
-    except StopIteration:
+    books = {book_id: repository.get(book_id) for book_id in book_ids}
+    statuses = {
+        book_id: opposite_status(book.status)
+        for book_id, book in books.items() if book is not None
+    }
+    missing = [book_id for book_id, book in books.items() if book is None]
+    if missing:
         print(f"\n{SEPARATOR}")
-        print(f"{RED}Книга с ID {RESET}{change_id} {RED}не найдена.{RESET}")
+        print(f"{RED}Книга с ID {RESET}{format_ids(missing)} "
+              f"{RED}не найдена.{RESET}")
         print(f"\n{SEPARATOR}")
+    if not statuses:
         return
-    if book.status == STATUS_AVAILABLE:
-        book.status = STATUS_ISSUED
-        print(f"\n{SEPARATOR}")
-        print(
-            f"{GREEN}Статус книги с ID{RESET} {change_id} "
-            f"{GREEN}изменен на {RESET}'{book.status}'.")
-        print(f"\n{SEPARATOR}")
-    else:
-        book.status = STATUS_AVAILABLE
-        print(f"\n{SEPARATOR}")
-        print(
-            f"{GREEN}Статус книги с ID{RESET} {change_id} "
-            f"{GREEN}изменен на {RESET}'{book.status}'.")
-        print(f"\n{SEPARATOR}")
-    data_to_json(books)
+    if not save_changes(lambda: repository.set_status_many(statuses)):
+        return
+    print(f"\n{SEPARATOR}")
+    sys.stdout.write("".join(
+        f"{GREEN}Статус книги с ID{RESET} {book_id} "
+        f"{GREEN}изменен на {RESET}'{status}'.\n"
+        for book_id, status in statuses.items()
+    ))
+    print(f"\n{SEPARATOR}")
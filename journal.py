@@ -0,0 +1,103 @@
+import json
+import os
+from typing import Iterator
+
+import metrics
+from classes import Book
+from constants import JOURNAL_SUFFIX
+
+
+def journal_path(path: str) -> str:
+    """
+    Возвращает путь к журналу изменений для файла базы данных.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+
+    Returns:
+        str: Путь к файлу журнала рядом с базой данных.
+    """
+    return path + JOURNAL_SUFFIX
+
+
+def append_records(path: str, records: list[dict]) -> None:
+    """
+    Дописывает записи об изменениях в конец журнала.
+
+    Записи сбрасываются на диск сразу, поэтому стоимость изменения
+    не зависит от размера каталога.
+
+    Args:
+        path (str): Путь к файлу журнала.
+        records (list): Записи об изменениях.
+    """
+    lines = "".join(
+        json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for record in records
+    )
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(lines)
+        file.flush()
+        os.fsync(file.fileno())
+    metrics.count("journal.records", len(records))
+    metrics.count("journal.bytes_written", len(lines.encode("utf-8")))
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """
+    Читает записи журнала по порядку.
+
+    Недописанная последняя строка (например, после сбоя во время
+    записи) пропускается.
+
+    Args:
+        path (str): Путь к файлу журнала.
+
+    Yields:
+        dict: Очередная запись об изменении.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.endswith("\n"):
+                return
+            yield json.loads(line)
+
+
+def apply_record(books: dict[int, Book], record: dict) -> None:
+    """
+    Применяет запись журнала к каталогу.
+
+    Записи идемпотентны: повторное применение не меняет результат,
+    поэтому журнал можно проигрывать поверх уже сжатого снимка.
+
+    Args:
+        books (dict): Каталог книг, индексированный по ID.
+        record (dict): Запись об изменении.
+    """
+    operation = record["op"]
+    if operation == "add":
+        book = Book.from_dict(record["book"])
+        books[int(book.id)] = book
+    elif operation == "delete":
+        books.pop(int(record["id"]), None)
+    elif operation == "status":
+        book = books.get(int(record["id"]))
+        if book is not None:
+            book.status = record["status"]
+    else:
+        raise ValueError(f"Неизвестная операция журнала: {operation}")
+
+
+def clear(path: str) -> None:
+    """
+    Удаляет журнал после того, как он свернут в снимок.
+
+    Args:
+        path (str): Путь к файлу журнала.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,35 @@
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False) -> Iterator[int]:
+    """
+    Захватывает блокировку файла на время блока.
+
+    Используется fcntl.flock: разделяемая блокировка для читателей,
+    исключительная — для писателей. На системах без fcntl блок
+    выполняется без блокировки.
+
+    Args:
+        path (str): Путь к файлу блокировки, создается при отсутствии.
+        shared (bool): Захватить разделяемую блокировку.
+
+    Yields:
+        int: Дескриптор открытого файла блокировки.
+    """
+    descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(
+                descriptor, fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+            )
+        yield descriptor
+    finally:
+        os.close(descriptor)
@@ -0,0 +1,149 @@
+import atexit
+import json
+import os
+import signal
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterator, Optional, TextIO
+
+from constants import METRICS_ENV
+
+LATENCY_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)
+ENABLED: bool = bool(os.environ.get(METRICS_ENV))
+
+_counters: dict[str, int] = {}
+_histograms: dict[str, dict] = {}
+_DISABLED = nullcontext()
+
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    Увеличивает счетчик.
+
+    Args:
+        name (str): Имя счетчика.
+        amount (int): На сколько увеличить.
+    """
+    if not ENABLED:
+        return
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def observe(name: str, seconds: float) -> None:
+    """
+    Добавляет длительность операции в гистограмму.
+
+    Args:
+        name (str): Имя операции.
+        seconds (float): Длительность в секундах.
+    """
+    if not ENABLED:
+        return
+    histogram = _histograms.get(name)
+    if histogram is None:
+        histogram = _histograms[name] = {
+            "count": 0,
+            "total": 0.0,
+            "min": seconds,
+            "max": seconds,
+            "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+        }
+    histogram["count"] += 1
+    histogram["total"] += seconds
+    histogram["min"] = min(histogram["min"], seconds)
+    histogram["max"] = max(histogram["max"], seconds)
+    histogram["buckets"][bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+
+@contextmanager
+def _timer(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def timed(name: str) -> ContextManager[None]:
+    """
+    Замеряет длительность блока.
+
+    Когда замеры выключены, возвращается общий пустой контекст,
+    и блок выполняется без лишних вызовов.
+
+    Args:
+        name (str): Имя операции.
+
+    Returns:
+        ContextManager: Контекст замера.
+    """
+    if not ENABLED:
+        return _DISABLED
+    return _timer(name)
+
+
+def snapshot() -> dict:
+    """
+    Возвращает текущие значения счетчиков и гистограмм.
+
+    Returns:
+        dict: Счетчики и гистограммы с границами корзин в секундах.
+    """
+    return {
+        "counters": dict(_counters),
+        "latency": {
+            name: dict(histogram, buckets=list(histogram["buckets"]))
+            for name, histogram in _histograms.items()
+        },
+        "buckets": list(LATENCY_BUCKETS),
+    }
+
+
+def reset() -> None:
+    """Сбрасывает все счетчики и гистограммы."""
+    _counters.clear()
+    _histograms.clear()
+
+
+def dump(file: Optional[TextIO] = None) -> None:
+    """
+    Выводит замеры в формате JSON.
+
+    По умолчанию замеры пишутся в файл, заданный переменной окружения,
+    или в stderr, если переменная равна '1'.
+
+    Args:
+        file (Optional[TextIO]): Куда писать замеры.
+    """
+    target = os.environ.get(METRICS_ENV, "1")
+    if file is None and target != "1":
+        with open(target, "w", encoding="utf-8") as output:
+            json.dump(snapshot(), output, ensure_ascii=False, indent=4)
+        return
+    json.dump(snapshot(), file or sys.stderr, ensure_ascii=False, indent=4)
+    (file or sys.stderr).write("\n")
+
+
+def enable() -> None:
+    """Включает замеры в текущем процессе."""
+    global ENABLED
+    ENABLED = True
+
+
+def disable() -> None:
+    """Выключает замеры в текущем процессе."""
+    global ENABLED
+    ENABLED = False
+
+
+if ENABLED:
+    atexit.register(dump)
+    if hasattr(signal, "SIGUSR1"):
+        try:
+            signal.signal(signal.SIGUSR1, lambda signum, frame: dump())
+        except ValueError:
+            pass
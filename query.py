@@ -0,0 +1,198 @@
+import heapq
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional
+
+from classes import Book
+from constants import QUERY_CACHE_SIZE
+from search_index import fuzzy_normalize, normalize, parse_year_range
+
+SORT_KEYS: dict[str, Callable[[Book], tuple]] = {
+    "id": lambda book: (int(book.id),),
+    "year": lambda book: (int(book.year), int(book.id)),
+    "title": lambda book: (book.title.casefold(), int(book.id)),
+}
+
+
+def query_books(
+    books: Iterable[Book],
+    order_by: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    descending: bool = False,
+) -> Iterator[Book]:
+    """
+    Применяет к результатам поиска сортировку, смещение и ограничение.
+
+    Без сортировки результаты отдаются лениво, по мере нахождения,
+    и перебор останавливается, как только набрано limit книг.
+    С сортировкой и ограничением лучшие offset + limit книг выбираются
+    кучей, без сортировки всего набора результатов.
+
+    Args:
+        books (Iterable): Найденные книги.
+        order_by (Optional[str]): Поле сортировки: 'id', 'year' или
+            'title'. None — порядок поиска.
+        limit (Optional[int]): Сколько книг вернуть, None — все.
+        offset (int): Сколько книг пропустить.
+        descending (bool): Сортировать по убыванию.
+
+    Returns:
+        Iterator: Итератор по книгам страницы результатов.
+
+    Raises:
+        ValueError: Если поле сортировки неизвестно.
+    """
+    stop = None if limit is None else offset + limit
+    if order_by is None:
+        return islice(books, offset, stop)
+    if order_by not in SORT_KEYS:
+        raise ValueError(f"Неизвестное поле сортировки: {order_by}")
+    key = SORT_KEYS[order_by]
+    if stop is None:
+        ordered = sorted(books, key=key, reverse=descending)
+    elif descending:
+        ordered = heapq.nlargest(stop, books, key=key)
+    else:
+        ordered = heapq.nsmallest(stop, books, key=key)
+    return iter(ordered[offset:])
+
+
+def search_books(
+    repository,
+    field: str,
+    value: str,
+    order_by: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    descending: bool = False,
+    prefix: bool = False,
+) -> Iterator[Book]:
+    """
+    Ищет книги в репозитории и возвращает ленивый итератор результатов.
+
+    Args:
+        repository (Repository): Репозиторий книг.
+        field (str): Поле поиска: 'title', 'author', 'year',
+            'year_range', 'status' или 'fuzzy'.
+        value (str): Значение поиска.
+        order_by (Optional[str]): Поле сортировки: 'id', 'year' или
+            'title'.
+        limit (Optional[int]): Сколько книг вернуть, None — все.
+        offset (int): Сколько книг пропустить.
+        descending (bool): Сортировать по убыванию.
+        prefix (bool): Искать по началу слова в названии или авторе.
+
+    Returns:
+        Iterator: Итератор по найденным книгам.
+    """
+    if prefix:
+        books = repository.search_prefix(field, value)
+    else:
+        books = repository.search(field, value)
+    return query_books(books, order_by, limit, offset, descending)
+
+
+def query_key(field: str, value: str, prefix: bool = False) -> tuple:
+    """
+    Приводит поисковый запрос к ключу кэша.
+
+    Название и автор сравниваются без учета регистра, год и диапазон
+    лет сводятся к паре годов, поэтому '2000' и '2000-2000' — один
+    и тот же запрос.
+
+    Args:
+        field (str): Поле поиска.
+        value (str): Значение поиска.
+        prefix (bool): Поиск по началу слова.
+
+    Returns:
+        tuple: Ключ запроса.
+
+    Raises:
+        ValueError: Если диапазон лет некорректен.
+    """
+    if field in ("year", "year_range"):
+        return ("year_range", *parse_year_range(value))
+    if field == "status":
+        return (field, value)
+    if field == "fuzzy":
+        return (field, fuzzy_normalize(value))
+    return ("prefix" if prefix else "substring", field, normalize(value))
+
+
+class QueryCache:
+    """
+    LRU кэш результатов поиска: ключ запроса -> список ID книг.
+
+    Кэш привязан к поколению каталога. Любое изменение каталога
+    увеличивает поколение через bump(), и все сохраненные результаты
+    перестают действовать. Счетчики попаданий и промахов позволяют
+    подобрать размер кэша.
+
+    Args:
+        maxsize (int): Сколько запросов хранить.
+    """
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE) -> None:
+        self.maxsize: int = maxsize
+        self.generation: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._results: OrderedDict[tuple, list[int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, key: tuple) -> Optional[list[int]]:
+        """
+        Возвращает сохраненный результат запроса.
+
+        Args:
+            key (tuple): Ключ запроса.
+
+        Returns:
+            list | None: Список ID книг или None при промахе.
+        """
+        book_ids = self._results.get(key)
+        if book_ids is None:
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return book_ids
+
+    def put(self, key: tuple, book_ids: list[int]) -> None:
+        """
+        Сохраняет результат запроса, вытесняя самый старый.
+
+        Args:
+            key (tuple): Ключ запроса.
+            book_ids (list): ID найденных книг.
+        """
+        if self.maxsize <= 0:
+            return
+        self._results[key] = book_ids
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def bump(self) -> None:
+        """Увеличивает поколение каталога и сбрасывает результаты."""
+        self.generation += 1
+        self._results.clear()
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики кэша.
+
+        Returns:
+            dict: Попадания, промахи, число запросов и размер кэша.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._results),
+            "maxsize": self.maxsize,
+            "generation": self.generation,
+        }
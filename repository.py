@@ -0,0 +1,1053 @@
+import os
+from contextlib import contextmanager
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Mapping, Optional
+
+import catalog_cache
+import changefeed
+import journal
+import metrics
+from binary_catalog import BinaryCatalog, write_catalog
+from classes import Book
+from constants import (BINARY_SUFFIXES, CATALOG_CACHE_ENABLED,
+                       CHANGE_FEED_ENABLED, JOURNAL_COMPACT_SIZE,
+                       JOURNAL_ENABLED, LOCK_SUFFIX, SQLITE_SUFFIXES,
+                       STREAMING_MIN_SIZE)
+from locking import file_lock
+from query import QueryCache, query_key
+from search_index import SearchIndex, parse_year_range
+from sequence import IdSequence, bump_generation, read_generation
+from sqlite_repository import SqliteBookRepository
+from storage import file_signature, iter_books, read_books, write_books
+
+
+class BookRepository:
+    """
+    Хранилище книг в памяти с индексом по ID.
+
+    Каталог читается из файла один раз и перечитывается только тогда,
+    когда у файла меняется время изменения или размер. Чтение и запись
+    защищены блокировками файла, а номер поколения каталога в файле
+    метаданных позволяет заметить изменения других процессов.
+    Поиск по названию и автору идет через поисковый индекс, который
+    строится в фоне после первого поиска и дальше обновляется
+    при изменениях; до этого книги перебираются.
+    Результаты повторяющихся запросов берутся из LRU кэша, который
+    сбрасывается при каждом изменении каталога.
+    В режиме журнала каждое изменение дописывается отдельной строкой
+    в журнал рядом с базой, а снимок перезаписывается только при
+    сжатии журнала. С лентой изменений каждое сохраненное изменение
+    получает номер и дописывается в ленту для реплик.
+    Разобранный снимок можно сохранить в кэш, тогда следующий
+    процесс загрузит каталог из кэша, а не из JSON.
+
+    Args:
+        path (str): Путь к JSON файлу базы данных.
+        use_journal (bool): Сохранять изменения в журнал.
+        change_feed (bool): Дописывать изменения в ленту изменений.
+        use_cache (bool): Загружать каталог из кэша, если он актуален.
+    """
+
+    def __init__(
+        self, path: str, use_journal: bool = JOURNAL_ENABLED,
+        change_feed: bool = CHANGE_FEED_ENABLED,
+        use_cache: bool = CATALOG_CACHE_ENABLED,
+    ) -> None:
+        self.path: str = path
+        self.use_journal: bool = use_journal
+        self.change_feed: bool = change_feed
+        self.use_cache: bool = use_cache
+        self.journal_path: str = journal.journal_path(path)
+        self.lock_path: str = path + LOCK_SUFFIX
+        self._books: dict[int, Book] = {}
+        self._max_id: int = 0
+        self._sequence = IdSequence(path)
+        self._signature: Optional[tuple] = None
+        self._cached_signature: Optional[tuple] = None
+        self._loaded: bool = False
+        self._generation: int = 0
+        self._index: Optional[SearchIndex] = None
+        self.query_cache = QueryCache()
+        self._batch_depth: int = 0
+        self._pending: list[dict] = []
+
+    def _current_signature(self) -> tuple:
+        return (
+            file_signature(self.path),
+            file_signature(self.journal_path),
+        )
+
+    @property
+    def generation(self) -> int:
+        """Номер поколения каталога, с которого начаты изменения."""
+        return self._generation
+
+    def refresh(self) -> None:
+        """Перечитывает каталог, если файл изменился с момента загрузки."""
+        if not self._loaded or self._current_signature() != self._signature:
+            self.load()
+
+    def load(self) -> None:
+        """
+        Загружает каталог из файла и перестраивает индекс по ID.
+
+        Если кэш каталога построен по текущему снимку, книги берутся
+        из него. Записи журнала, если он есть, проигрываются поверх
+        снимка. Чтение идет под разделяемой блокировкой, поэтому
+        писатели других процессов не меняют файлы во время загрузки.
+        """
+        with file_lock(self.lock_path, shared=True):
+            self._load_unlocked()
+
+    def _load_unlocked(self) -> None:
+        with metrics.timed("catalog.load"):
+            cached = (
+                catalog_cache.load_cache(self.path) if self.use_cache
+                else None
+            )
+            if cached is None:
+                books = read_books(self.path)
+                self._books = {int(book.id): book for book in books}
+                self._cached_signature = None
+            else:
+                metrics.count("catalog.cache_hits")
+                self._books = cached
+                self._cached_signature = file_signature(self.path)
+            for record in journal.read_records(self.journal_path):
+                journal.apply_record(self._books, record)
+        self._max_id = max(self._books, default=0)
+        self._generation = read_generation(self.path)
+        self._signature = self._current_signature()
+        self._loaded = True
+        self._index = None
+        self.query_cache.bump()
+
+    def warm_up(self) -> None:
+        """
+        Заранее загружает каталог, если он не читается потоково.
+
+        Поисковый индекс по-прежнему строится при первом поиске.
+        """
+        if self._should_stream():
+            return
+        with metrics.timed("catalog.warm_up"):
+            self.refresh()
+
+    def store_cache(self) -> bool:
+        """
+        Сохраняет разобранный снимок каталога в кэш.
+
+        Кэш пишется, только если каталог в памяти совпадает со снимком
+        в файле: журнал пуст и другие процессы каталог не меняли.
+        Кэш необязателен, поэтому ошибка записи не считается ошибкой.
+
+        Returns:
+            bool: True, если кэш записан.
+        """
+        if not self.use_cache or not self._loaded:
+            return False
+        try:
+            with file_lock(self.lock_path, shared=True):
+                snapshot, journal_signature = self._signature
+                if (
+                    journal_signature is not None
+                    or snapshot == self._cached_signature
+                    or self._is_stale()
+                ):
+                    return False
+                written = catalog_cache.write_cache(self.path, self._books)
+        except OSError:
+            return False
+        if written:
+            self._cached_signature = snapshot
+        return written
+
+    def _is_stale(self) -> bool:
+        return (
+            read_generation(self.path) != self._generation
+            or self._current_signature() != self._signature
+        )
+
+    def save(self) -> None:
+        """
+        Сохраняет полный снимок каталога в файл.
+
+        Снимок записывается под исключительной блокировкой,
+        после записи журнал больше не нужен и удаляется.
+        """
+        with file_lock(self.lock_path):
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        write_books(self.path, list(self._books.values()))
+        journal.clear(self.journal_path)
+        self._generation = bump_generation(self.path)
+        self._signature = self._current_signature()
+
+    def compact(self) -> None:
+        """
+        Сворачивает журнал в новый снимок каталога.
+
+        Если каталог успели изменить другие процессы, перед сжатием
+        он перечитывается, чтобы не потерять их изменения.
+        """
+        with file_lock(self.lock_path):
+            if self._is_stale():
+                self._load_unlocked()
+            self._write_snapshot()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Откладывает сохранение изменений до конца блока.
+
+        Все изменения внутри блока сохраняются одной записью снимка
+        или одной дозаписью в журнал. Блоки можно вкладывать друг
+        в друга, сохранение выполняется при выходе из внешнего.
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._pending:
+                records, self._pending = self._pending, []
+                self._flush(records)
+
+    def _persist(self, record: dict) -> None:
+        """
+        Сохраняет одно изменение каталога.
+
+        Внутри batch() изменение только запоминается до конца блока.
+
+        Args:
+            record (dict): Запись об изменении для журнала.
+        """
+        if self._batch_depth:
+            self._pending.append(record)
+            return
+        self._flush([record])
+
+    def _flush(self, records: list[dict]) -> None:
+        """
+        Записывает накопленные изменения каталога.
+
+        Запись идет под исключительной блокировкой. Если с момента
+        загрузки другой процесс сменил поколение каталога, каталог
+        перечитывается и изменения применяются поверх свежих данных,
+        а не затирают их. Изменения сначала дописываются в ленту
+        изменений, затем в журнал, а при превышении порога размера
+        журнал сворачивается в снимок. Без журнала перезаписывается
+        весь снимок. Так сбой между двумя записями не оставляет
+        сохраненное изменение, которого реплики никогда не получат.
+        Если запись не удалась, каталог в памяти откатывается
+        к сохраненному, и несохраненные изменения не попадут в файл
+        со следующей записью.
+
+        Args:
+            records (list): Записи об изменениях для журнала.
+        """
+        metrics.count("catalog.changes", len(records))
+        with file_lock(self.lock_path):
+            try:
+                if self._is_stale():
+                    self._merge(records)
+                self._publish(records)
+                if self.use_journal:
+                    self._append_journal(records)
+                else:
+                    self._write_snapshot()
+            except BaseException:
+                self._rollback()
+                raise
+
+    def _rollback(self) -> None:
+        """
+        Отбрасывает несохраненные изменения, перечитывая каталог.
+
+        Если перечитать каталог тоже не удалось, каталог в памяти
+        очищается и будет перечитан при следующем обращении.
+        """
+        self._books = {}
+        self._index = None
+        self._loaded = False
+        self._signature = None
+        self.query_cache.bump()
+        try:
+            self._load_unlocked()
+        except (OSError, ValueError):
+            pass
+
+    def _append_journal(self, records: list[dict]) -> None:
+        journal.append_records(self.journal_path, records)
+        self._generation = bump_generation(self.path)
+        journal_signature = file_signature(self.journal_path)
+        if journal_signature[1] > JOURNAL_COMPACT_SIZE:
+            self._write_snapshot()
+            return
+        self._signature = (file_signature(self.path), journal_signature)
+
+    def _publish(self, records: list[dict]) -> None:
+        """
+        Дописывает сохраненные изменения в ленту изменений.
+
+        Args:
+            records (list): Записи об изменениях.
+        """
+        if self.change_feed and records:
+            changefeed.append_changes(self.path, records)
+
+    def _merge(self, records: list[dict]) -> None:
+        """
+        Перечитывает каталог и заново применяет к нему свои изменения.
+
+        Args:
+            records (list): Записи об изменениях этого процесса.
+        """
+        self._load_unlocked()
+        for record in records:
+            journal.apply_record(self._books, record)
+        self._max_id = max(self._books, default=0)
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def __iter__(self) -> Iterator[Book]:
+        return iter(self._books.values())
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Перебирает книги каталога для однократного прохода.
+
+        Если каталог уже загружен и файл не менялся, книги берутся
+        из памяти. Каталоги больше STREAMING_MIN_SIZE без журнала
+        читаются из файла потоково и не загружаются в память целиком.
+        Потоковое чтение идет без блокировки: снимок подменяется
+        атомарно, и читатель дочитывает ту версию файла, которую открыл.
+
+        Returns:
+            Iterator: Итератор по объектам класса Book.
+        """
+        if self._should_stream():
+            return iter_books(self.path)
+        self.refresh()
+        return iter(self._books.values())
+
+    def search(self, field: str, value: str) -> Iterator[Book]:
+        """
+        Ищет книги по названию, автору, году, диапазону лет или статусу.
+
+        Название и автор ищутся по вхождению подстроки без учета
+        регистра, год — по точному совпадению, диапазон лет задается
+        строкой вида '1990-2000', 'fuzzy' — нечеткий поиск по названию
+        и автору. Запросы идут через поисковый индекс, потоково
+        читаемые каталоги проверяются книга за книгой.
+
+        Args:
+            field (str): Поле поиска: 'title', 'author', 'year',
+                'year_range', 'status' или 'fuzzy'.
+            value (str): Значение поиска.
+
+        Returns:
+            Iterator: Итератор по найденным книгам.
+        """
+        if field in ("year", "year_range"):
+            return self.search_year_range(*parse_year_range(value))
+        if field == "status":
+            return self.search_status(value)
+        if field == "fuzzy":
+            return self.search_fuzzy(value)
+        if field not in ("title", "author"):
+            raise ValueError(f"Неизвестное поле поиска: {field}")
+        if self._should_stream():
+            folded_value = value.casefold()
+            return (
+                book for book in iter_books(self.path)
+                if folded_value in getattr(book, field).casefold()
+            )
+        return self._cached_search(
+            query_key(field, value),
+            lambda: self.search_index().find_substring(field, value),
+        )
+
+    def search_year_range(self, start: int, end: int) -> Iterator[Book]:
+        """
+        Ищет книги, изданные с start по end год включительно.
+
+        Args:
+            start (int): Первый год диапазона.
+            end (int): Последний год диапазона.
+
+        Returns:
+            Iterator: Итератор по найденным книгам в порядке года, затем ID.
+        """
+        if self._should_stream():
+            return (
+                book for book in iter_books(self.path)
+                if start <= int(book.year) <= end
+            )
+        return self._cached_search(
+            ("year_range", start, end),
+            lambda: self.search_index().find_year_range(start, end),
+        )
+
+    def search_status(self, status: str) -> Iterator[Book]:
+        """
+        Ищет книги с заданным статусом.
+
+        Args:
+            status (str): Статус книги.
+
+        Returns:
+            Iterator: Итератор по найденным книгам в порядке ID.
+        """
+        if self._should_stream():
+            return (
+                book for book in iter_books(self.path)
+                if book.status == status
+            )
+        return self._cached_search(
+            query_key("status", status),
+            lambda: self.search_index().find_status(status),
+        )
+
+    def search_prefix(self, field: str, prefix: str) -> Iterator[Book]:
+        """
+        Ищет книги, в названии или авторе которых есть слово с префиксом.
+
+        Args:
+            field (str): Поле поиска: 'title' или 'author'.
+            prefix (str): Начало слова.
+
+        Returns:
+            Iterator: Итератор по найденным книгам в порядке ID.
+        """
+        return self._cached_search(
+            query_key(field, prefix, prefix=True),
+            lambda: self.search_index().find_prefix(field, prefix),
+        )
+
+    def search_fuzzy(self, value: str) -> Iterator[Book]:
+        """
+        Нечетко ищет книги по названию и автору с опечатками.
+
+        Слова запроса сравниваются со словами названия и автора
+        по сходству n-грамм без учета регистра и разницы 'ё' и 'е'.
+
+        Args:
+            value (str): Строка запроса.
+
+        Returns:
+            Iterator: Итератор по найденным книгам от самых похожих.
+        """
+        return self._cached_search(
+            query_key("fuzzy", value),
+            lambda: self.search_index().find_fuzzy(value),
+        )
+
+    def search_index(self) -> SearchIndex:
+        """
+        Возвращает поисковый индекс, при необходимости строя его.
+
+        Returns:
+            SearchIndex: Индекс каталога.
+        """
+        self.refresh()
+        if self._index is None:
+            self._index = SearchIndex(self._books)
+        return self._index
+
+    def _cached_search(
+        self, key: tuple, find: Callable[[], Iterable[int]]
+    ) -> Iterator[Book]:
+        """
+        Отдает книги по результату запроса из кэша или из индекса.
+
+        Args:
+            key (tuple): Ключ запроса.
+            find (Callable): Поиск ID книг в индексе при промахе кэша.
+
+        Returns:
+            Iterator: Итератор по найденным книгам.
+        """
+        self.refresh()
+        book_ids = self.query_cache.get(key)
+        if book_ids is None:
+            with metrics.timed("search.query"):
+                book_ids = list(find())
+            self.query_cache.put(key, book_ids)
+        else:
+            metrics.count("search.cache_hits")
+        return self._books_by_ids(book_ids)
+
+    def _books_by_ids(self, book_ids: Iterator[int]) -> Iterator[Book]:
+        books = (self._books.get(book_id) for book_id in book_ids)
+        return (book for book in books if book is not None)
+
+    def _should_stream(self) -> bool:
+        signature = self._current_signature()
+        if self._loaded and signature == self._signature:
+            return False
+        snapshot, journal_signature = signature
+        return (
+            journal_signature is None
+            and snapshot is not None
+            and snapshot[1] >= STREAMING_MIN_SIZE
+        )
+
+    def all(self) -> list[Book]:
+        """
+        Возвращает список всех книг в порядке их хранения.
+
+        Returns:
+            list: Список объектов класса Book.
+        """
+        return list(self._books.values())
+
+    def page(self, offset: int, limit: int) -> list[Book]:
+        """
+        Возвращает страницу книг в порядке их хранения.
+
+        Книги до начала страницы пропускаются без форматирования,
+        потоково читаемые каталоги не загружаются целиком.
+
+        Args:
+            offset (int): Сколько книг пропустить.
+            limit (int): Сколько книг вернуть.
+
+        Returns:
+            list: Книги страницы.
+        """
+        return list(islice(self.iter_books(), offset, offset + limit))
+
+    def position(self, book_id: int) -> Optional[int]:
+        """
+        Находит порядковый номер книги в каталоге.
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            int | None: Номер книги, начиная с нуля, или None,
+                если книги нет.
+        """
+        book_id = int(book_id)
+        if self._should_stream():
+            ids = (int(book.id) for book in iter_books(self.path))
+        else:
+            self.refresh()
+            if book_id not in self._books:
+                return None
+            ids = iter(self._books)
+        for number, current_id in enumerate(ids):
+            if current_id == book_id:
+                return number
+        return None
+
+    def get(self, book_id: int) -> Optional[Book]:
+        """
+        Находит книгу по ID за O(1).
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            Book | None: Найденная книга или None.
+        """
+        return self._books.get(int(book_id))
+
+    def next_id(self) -> int:
+        """
+        Выдает ID для новой книги за O(1).
+
+        Returns:
+            int: Новый уникальный ID.
+        """
+        return self.reserve_ids(1)[0]
+
+    def reserve_ids(self, count: int) -> range:
+        """
+        Резервирует диапазон ID для массового добавления книг.
+
+        ID выдаются из последовательности в файле метаданных и всегда
+        больше любого ID в каталоге.
+
+        Args:
+            count (int): Количество ID.
+
+        Returns:
+            range: Зарезервированные ID.
+        """
+        return self._sequence.reserve(count, floor=self._max_id + 1)
+
+    def add(self, book: Book) -> None:
+        """
+        Добавляет книгу в каталог и сохраняет изменения.
+
+        Args:
+            book (Book): Новая книга.
+        """
+        if self._index is not None:
+            self._index.remove(int(book.id))
+            self._index.add(book)
+        self._books[int(book.id)] = book
+        self._max_id = max(self._max_id, int(book.id))
+        self.query_cache.bump()
+        self._persist({"op": "add", "book": book.to_dict()})
+
+    def delete(self, book_id: int) -> Optional[Book]:
+        """
+        Удаляет книгу из каталога и сохраняет изменения.
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            Book | None: Удаленная книга или None, если ее не было.
+        """
+        book = self._books.pop(int(book_id), None)
+        if book is not None:
+            if self._index is not None:
+                self._index.remove(int(book_id))
+            self.query_cache.bump()
+            self._persist({"op": "delete", "id": int(book_id)})
+        return book
+
+    def set_status(self, book_id: int, status: str) -> Optional[Book]:
+        """
+        Меняет статус книги и сохраняет изменения.
+
+        Args:
+            book_id (int): ID книги.
+            status (str): Новый статус.
+
+        Returns:
+            Book | None: Измененная книга или None, если ее нет.
+        """
+        book = self._books.get(int(book_id))
+        if book is not None:
+            book.status = status
+            if self._index is not None:
+                self._index.update_status(int(book_id), status)
+            self.query_cache.bump()
+            self._persist(
+                {"op": "status", "id": int(book_id), "status": status}
+            )
+        return book
+
+    def delete_many(
+        self, book_ids: Iterable[int]
+    ) -> tuple[list[Book], list[int]]:
+        """
+        Удаляет несколько книг и сохраняет изменения одной записью.
+
+        Args:
+            book_ids (Iterable): ID удаляемых книг.
+
+        Returns:
+            tuple: Удаленные книги и ID, которых нет в каталоге.
+        """
+        deleted = []
+        missing = []
+        with self.batch():
+            for book_id in book_ids:
+                book = self.delete(book_id)
+                if book is None:
+                    missing.append(int(book_id))
+                else:
+                    deleted.append(book)
+        return deleted, missing
+
+    def set_status_many(
+        self, statuses: Mapping[int, str]
+    ) -> tuple[list[Book], list[int]]:
+        """
+        Меняет статусы нескольких книг и сохраняет их одной записью.
+
+        Args:
+            statuses (Mapping): Новые статусы по ID книг.
+
+        Returns:
+            tuple: Измененные книги и ID, которых нет в каталоге.
+        """
+        changed = []
+        missing = []
+        with self.batch():
+            for book_id, status in statuses.items():
+                book = self.set_status(book_id, status)
+                if book is None:
+                    missing.append(int(book_id))
+                else:
+                    changed.append(book)
+        return changed, missing
+
+    def add_many(self, books: Iterable[Book]) -> int:
+        """
+        Добавляет несколько книг и сохраняет их одной записью.
+
+        Args:
+            books (Iterable): Новые книги.
+
+        Returns:
+            int: Количество добавленных книг.
+        """
+        count = 0
+        with self.batch():
+            for book in books:
+                self.add(book)
+                count += 1
+        return count
+
+    def replace(self, books: list[Book]) -> None:
+        """
+        Полностью заменяет содержимое каталога и сохраняет его.
+
+        Args:
+            books (list): Новый список книг.
+        """
+        self._books = {int(book.id): book for book in books}
+        self._max_id = max(self._books, default=0)
+        self._loaded = True
+        self._index = None
+        self.query_cache.bump()
+        with file_lock(self.lock_path):
+            try:
+                self._publish([{
+                    "op": "replace",
+                    "books": [book.to_dict() for book in books],
+                }])
+                self._write_snapshot()
+            except BaseException:
+                self._rollback()
+                raise
+
+
+class BinaryBookRepository(BookRepository):
+    """
+    Хранилище книг в двоичном каталоге, открытом через mmap.
+
+    При открытии читается только заголовок файла. Страницы списка,
+    поиск по ID и смена статуса работают прямо с записями файла,
+    смена статуса перезаписывает один байт на месте. Поиск по полям,
+    добавление и удаление разбирают каталог в память, как
+    BookRepository, и сохраняют его новым двоичным снимком.
+
+    Args:
+        path (str): Путь к двоичному каталогу.
+    """
+
+    def __init__(
+        self, path: str, change_feed: bool = CHANGE_FEED_ENABLED
+    ) -> None:
+        super().__init__(
+            path, use_journal=False, change_feed=change_feed,
+            use_cache=False,
+        )
+        self._catalog: Optional[BinaryCatalog] = None
+        self._materialized: bool = False
+
+    def _load_unlocked(self) -> None:
+        with metrics.timed("catalog.load"):
+            if not os.path.exists(self.path):
+                write_catalog(self.path, [])
+            self._open_catalog()
+        self._books = {}
+        self._materialized = False
+        self._max_id = self._catalog.max_id()
+        self._generation = read_generation(self.path)
+        self._signature = self._current_signature()
+        self._loaded = True
+        self._index = None
+        self.query_cache.bump()
+
+    def _open_catalog(self) -> None:
+        """Открывает файл каталога заново, освобождая прежнее отображение."""
+        if self._catalog is not None:
+            self._catalog.close()
+        self._catalog = BinaryCatalog(self.path, writable=True)
+
+    def _materialize(self) -> None:
+        """Разбирает все книги каталога в память для изменений и поиска."""
+        if not self._loaded:
+            self.load()
+        if not self._materialized:
+            self._books = {int(book.id): book for book in self._catalog}
+            self._materialized = True
+
+    def _write_snapshot(self) -> None:
+        self._materialize()
+        self._generation = bump_generation(self.path)
+        write_catalog(self.path, self._books.values(), self._generation)
+        self._open_catalog()
+        self._signature = self._current_signature()
+
+    def _merge(self, records: list[dict]) -> None:
+        self._load_unlocked()
+        self._materialize()
+        for record in records:
+            journal.apply_record(self._books, record)
+        self._max_id = max(self._books, default=0)
+
+    def _should_stream(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        """Освобождает отображение файла каталога."""
+        if self._catalog is not None:
+            self._catalog.close()
+        self._catalog = None
+        self._loaded = False
+
+    def __len__(self) -> int:
+        if self._materialized or self._catalog is None:
+            return len(self._books)
+        return len(self._catalog)
+
+    def __iter__(self) -> Iterator[Book]:
+        return self.iter_books()
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Перебирает книги каталога в порядке ID.
+
+        Returns:
+            Iterator: Итератор по объектам класса Book.
+        """
+        self.refresh()
+        if self._materialized:
+            return iter(list(self._books.values()))
+        return iter(self._catalog)
+
+    def all(self) -> list[Book]:
+        """
+        Возвращает список всех книг в порядке ID.
+
+        Returns:
+            list: Список объектов класса Book.
+        """
+        return list(self.iter_books())
+
+    def page(self, offset: int, limit: int) -> list[Book]:
+        """
+        Возвращает страницу книг, разбирая только ее записи.
+
+        Args:
+            offset (int): Сколько книг пропустить.
+            limit (int): Сколько книг вернуть.
+
+        Returns:
+            list: Книги страницы.
+        """
+        self.refresh()
+        if self._materialized:
+            return super().page(offset, limit)
+        return self._catalog.books(offset, offset + limit)
+
+    def position(self, book_id: int) -> Optional[int]:
+        """
+        Находит порядковый номер книги двоичным поиском по ID.
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            int | None: Номер книги, начиная с нуля, или None,
+                если книги нет.
+        """
+        self.refresh()
+        if self._materialized:
+            return super().position(book_id)
+        return self._catalog.find(int(book_id))
+
+    def get(self, book_id: int) -> Optional[Book]:
+        """
+        Находит книгу по ID двоичным поиском по записям файла.
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            Book | None: Найденная книга или None.
+        """
+        if self._materialized:
+            return super().get(book_id)
+        if not self._loaded:
+            self.load()
+        return self._catalog.get(book_id)
+
+    def search_index(self) -> SearchIndex:
+        """
+        Возвращает поисковый индекс, разбирая каталог в память.
+
+        Returns:
+            SearchIndex: Индекс каталога.
+        """
+        self.refresh()
+        self._materialize()
+        return super().search_index()
+
+    def add(self, book: Book) -> None:
+        """
+        Добавляет книгу в каталог и сохраняет новый снимок.
+
+        Args:
+            book (Book): Новая книга.
+        """
+        self._materialize()
+        super().add(book)
+
+    def delete(self, book_id: int) -> Optional[Book]:
+        """
+        Удаляет книгу из каталога и сохраняет новый снимок.
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            Book | None: Удаленная книга или None, если ее не было.
+        """
+        self._materialize()
+        return super().delete(book_id)
+
+    def set_status(self, book_id: int, status: str) -> Optional[Book]:
+        """
+        Меняет статус книги байтом в записи файла.
+
+        Если каталог уже разобран в память, идет пакетное изменение
+        или нового статуса нет в таблице статусов файла, каталог
+        сохраняется новым снимком, как в BookRepository.
+
+        Args:
+            book_id (int): ID книги.
+            status (str): Новый статус.
+
+        Returns:
+            Book | None: Измененная книга или None, если ее нет.
+        """
+        if not self._materialized and not self._batch_depth:
+            if not self._loaded:
+                self.load()
+            with file_lock(self.lock_path):
+                if self._is_stale():
+                    self._load_unlocked()
+                flipped = None
+                if self._catalog.find(int(book_id)) is not None:
+                    flipped = status in self._catalog.statuses
+                if flipped:
+                    self._publish([
+                        {"op": "status", "id": int(book_id), "status": status}
+                    ])
+                    self._catalog.set_status(book_id, status)
+                    self._generation = bump_generation(self.path)
+                    self._catalog.set_generation(self._generation)
+                    self._signature = self._current_signature()
+            if flipped is None:
+                return None
+            if flipped:
+                metrics.count("catalog.changes")
+                self.query_cache.bump()
+                return self._catalog.get(book_id)
+        self._materialize()
+        return super().set_status(book_id, status)
+
+    def set_status_many(
+        self, statuses: Mapping[int, str]
+    ) -> tuple[list[Book], list[int]]:
+        """
+        Меняет статусы нескольких книг байтами в записях файла.
+
+        Все статусы меняются под одной блокировкой с одним новым
+        поколением. Если перезапись на месте невозможна, каталог
+        сохраняется новым снимком, как в BookRepository.
+
+        Args:
+            statuses (Mapping): Новые статусы по ID книг.
+
+        Returns:
+            tuple: Измененные книги и ID, которых нет в каталоге.
+        """
+        if not self._loaded:
+            self.load()
+        if (
+            self._materialized or self._batch_depth
+            or not set(statuses.values()) <= set(self._catalog.statuses)
+        ):
+            self._materialize()
+            return super().set_status_many(statuses)
+        changed = []
+        missing = []
+        with file_lock(self.lock_path):
+            if self._is_stale():
+                self._load_unlocked()
+            for book_id in statuses:
+                if self._catalog.find(int(book_id)) is None:
+                    missing.append(int(book_id))
+                else:
+                    changed.append(int(book_id))
+            self._publish([
+                {"op": "status", "id": book_id, "status": statuses[book_id]}
+                for book_id in changed
+            ])
+            for book_id in changed:
+                self._catalog.set_status(book_id, statuses[book_id])
+            self._generation = bump_generation(self.path)
+            self._catalog.set_generation(self._generation)
+            self._signature = self._current_signature()
+        metrics.count("catalog.changes", len(changed))
+        self.query_cache.bump()
+        return [self._catalog.get(book_id) for book_id in changed], missing
+
+    def replace(self, books: list[Book]) -> None:
+        """
+        Полностью заменяет содержимое каталога и сохраняет его.
+
+        Args:
+            books (list): Новый список книг.
+        """
+        self._materialized = True
+        super().replace(books)
+
+
+Repository = BookRepository | BinaryBookRepository | SqliteBookRepository
+
+_repositories: dict[str, Repository] = {}
+
+
+def create_repository(path: str) -> Repository:
+    """
+    Создает репозиторий, подходящий для формата файла базы данных.
+
+    Файлы с расширениями из SQLITE_SUFFIXES открываются как база SQLite,
+    из BINARY_SUFFIXES — как двоичный каталог, все остальные — как JSON.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+
+    Returns:
+        Repository: Новый репозиторий JSON, двоичного каталога или SQLite.
+    """
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        return SqliteBookRepository(path)
+    if path.lower().endswith(BINARY_SUFFIXES):
+        return BinaryBookRepository(path)
+    return BookRepository(path)
+
+
+def get_repository(path: str, refresh: bool = True) -> Repository:
+    """
+    Возвращает общий для процесса репозиторий для файла базы данных.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        refresh (bool): Перечитать файл, если он изменился.
+
+    Returns:
+        Repository: Репозиторий с актуальным содержимым файла.
+    """
+    key = os.path.abspath(path)
+    repository = _repositories.get(key)
+    if repository is None:
+        repository = _repositories[key] = create_repository(path)
+    if refresh:
+        repository.refresh()
+    return repository
@@ -0,0 +1,805 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Callable, Iterable, Iterator, Mapping, Optional
+
+import metrics
+from classes import Book
+from constants import FUZZY_THRESHOLD
+
+NGRAM_SIZE = 3
+TOKEN_PATTERN = re.compile(r"\w+")
+INDEXED_FIELDS = ("title", "author")
+
+
+def normalize(text: str) -> str:
+    """
+    Приводит строку к виду для поиска без учета регистра.
+
+    Args:
+        text (str): Исходная строка.
+
+    Returns:
+        str: Строка после casefold.
+    """
+    return text.casefold()
+
+
+def ngrams(text: str) -> set[str]:
+    """
+    Разбивает строку на множество n-грамм длины NGRAM_SIZE.
+
+    Args:
+        text (str): Нормализованная строка.
+
+    Returns:
+        set: Множество n-грамм.
+    """
+    return {
+        text[index:index + NGRAM_SIZE]
+        for index in range(len(text) - NGRAM_SIZE + 1)
+    }
+
+
+def fuzzy_normalize(text: str) -> str:
+    """
+    Приводит строку к виду для нечеткого поиска.
+
+    Кроме регистра не различаются буквы 'ё' и 'е'.
+
+    Args:
+        text (str): Исходная строка.
+
+    Returns:
+        str: Нормализованная строка.
+    """
+    return normalize(text).replace("ё", "е")
+
+
+def word_grams(word: str) -> set[str]:
+    """
+    Разбивает слово на n-граммы с отступами по краям.
+
+    Отступы дают отдельные n-граммы началу и концу слова, поэтому
+    короткие слова тоже сравниваются.
+
+    Args:
+        word (str): Нормализованное слово.
+
+    Returns:
+        set: Множество n-грамм.
+    """
+    return ngrams(f"  {word} ")
+
+
+class TrigramIndex:
+    """
+    Индекс слов поля по n-граммам для нечеткого поиска.
+
+    Сходство слов считается коэффициентом Жаккара их множеств n-грамм.
+    Кандидаты берутся из списков слов с общими n-граммами, поэтому
+    запрос сравнивается только со словарем похожих слов, а не
+    с каждой книгой каталога.
+    """
+
+    def __init__(self) -> None:
+        self.words: dict[str, set[int]] = {}
+        self.grams: dict[str, set[str]] = {}
+        self.sizes: dict[str, int] = {}
+
+    def add(self, book_id: int, text: str) -> None:
+        """
+        Добавляет слова значения поля книги.
+
+        Args:
+            book_id (int): ID книги.
+            text (str): Значение поля.
+        """
+        for word in set(TOKEN_PATTERN.findall(fuzzy_normalize(text))):
+            ids = self.words.get(word)
+            if ids is None:
+                ids = self.words[word] = set()
+                grams = word_grams(word)
+                self.sizes[word] = len(grams)
+                for gram in grams:
+                    self.grams.setdefault(gram, set()).add(word)
+            ids.add(book_id)
+
+    def remove(self, book_id: int, text: str) -> None:
+        """
+        Удаляет слова значения поля книги.
+
+        Args:
+            book_id (int): ID книги.
+            text (str): Значение поля.
+        """
+        for word in set(TOKEN_PATTERN.findall(fuzzy_normalize(text))):
+            ids = self.words.get(word)
+            if ids is None:
+                continue
+            ids.discard(book_id)
+            if ids:
+                continue
+            del self.words[word]
+            del self.sizes[word]
+            for gram in word_grams(word):
+                words = self.grams.get(gram)
+                if words is not None:
+                    words.discard(word)
+                    if not words:
+                        del self.grams[gram]
+
+    def similar_words(self, word: str, threshold: float) -> dict[str, float]:
+        """
+        Находит слова словаря, похожие на заданное.
+
+        Args:
+            word (str): Нормализованное слово запроса.
+            threshold (float): Минимальное сходство.
+
+        Returns:
+            dict: Похожие слова и их сходство.
+        """
+        grams = word_grams(word)
+        shared: dict[str, int] = {}
+        for gram in grams:
+            for candidate in self.grams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        metrics.count("search.fuzzy_candidates", len(shared))
+        similar = {}
+        for candidate, common in shared.items():
+            score = common / (len(grams) + self.sizes[candidate] - common)
+            if score >= threshold:
+                similar[candidate] = score
+        return similar
+
+    def word_scores(self, word: str, threshold: float) -> dict[int, float]:
+        """
+        Оценивает сходство книг с одним словом запроса.
+
+        Оценка книги — сходство с самым похожим словом ее поля.
+
+        Args:
+            word (str): Нормализованное слово запроса.
+            threshold (float): Минимальное сходство слов.
+
+        Returns:
+            dict: ID книг и их оценки.
+        """
+        scores: dict[int, float] = {}
+        for candidate, score in self.similar_words(word, threshold).items():
+            for book_id in self.words[candidate]:
+                if score > scores.get(book_id, 0.0):
+                    scores[book_id] = score
+        return scores
+
+
+def rank_fuzzy(
+    indexes: Iterable[TrigramIndex], value: str,
+    threshold: float = FUZZY_THRESHOLD,
+) -> list[int]:
+    """
+    Ищет книги нечетко по нескольким полям и ранжирует результаты.
+
+    Каждое слово запроса сравнивается со всеми словами полей книги,
+    оценка книги — среднее по словам запроса лучшее сходство. Поэтому
+    запрос может сочетать слова из названия и автора.
+
+    Args:
+        indexes (Iterable): Индексы полей.
+        value (str): Строка запроса.
+        threshold (float): Минимальное сходство.
+
+    Returns:
+        list: ID книг от самых похожих к менее похожим, при равной
+            оценке — по возрастанию ID.
+    """
+    indexes = list(indexes)
+    query_words = TOKEN_PATTERN.findall(fuzzy_normalize(value))
+    totals: dict[int, float] = {}
+    for word in query_words:
+        best: dict[int, float] = {}
+        for index in indexes:
+            for book_id, score in index.word_scores(word, threshold).items():
+                if score > best.get(book_id, 0.0):
+                    best[book_id] = score
+        for book_id, score in best.items():
+            totals[book_id] = totals.get(book_id, 0.0) + score
+    scores = {
+        book_id: total / len(query_words)
+        for book_id, total in totals.items()
+        if total / len(query_words) >= threshold
+    }
+    return sorted(scores, key=lambda book_id: (-scores[book_id], book_id))
+
+
+class PrefixTrie:
+    """Префиксное дерево слов с ID книг в конечных узлах."""
+
+    def __init__(self) -> None:
+        self.root: dict = {}
+
+    def add(self, token: str, book_id: int) -> None:
+        """
+        Добавляет слово книги в дерево.
+
+        Args:
+            token (str): Нормализованное слово.
+            book_id (int): ID книги.
+        """
+        node = self.root
+        for char in token:
+            node = node.setdefault(char, {})
+        node.setdefault(None, set()).add(book_id)
+
+    def remove(self, token: str, book_id: int) -> None:
+        """
+        Удаляет слово книги из дерева и отсекает опустевшие ветви.
+
+        Args:
+            token (str): Нормализованное слово.
+            book_id (int): ID книги.
+        """
+        path = [self.root]
+        for char in token:
+            node = path[-1].get(char)
+            if node is None:
+                return
+            path.append(node)
+        ids = path[-1].get(None)
+        if ids is None:
+            return
+        ids.discard(book_id)
+        if not ids:
+            del path[-1][None]
+        for char, node in zip(reversed(token), reversed(path[:-1])):
+            if node[char]:
+                break
+            del node[char]
+
+    def find(self, prefix: str) -> set[int]:
+        """
+        Находит ID книг, у которых есть слово с заданным префиксом.
+
+        Args:
+            prefix (str): Нормализованный префикс.
+
+        Returns:
+            set: ID найденных книг.
+        """
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        found: set[int] = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key is None:
+                    found |= child
+                else:
+                    stack.append(child)
+        return found
+
+
+def parse_year_range(value: str) -> tuple[int, int]:
+    """
+    Разбирает диапазон лет вида '1990-2000' или одиночный год.
+
+    Args:
+        value (str): Строка с диапазоном.
+
+    Returns:
+        tuple: Первый и последний год диапазона.
+
+    Raises:
+        ValueError: Если строка не является диапазоном лет.
+    """
+    start, separator, end = value.strip().partition("-")
+    start_year = int(start)
+    end_year = int(end) if separator else start_year
+    if start_year > end_year:
+        raise ValueError(f"Некорректный диапазон лет: {value}")
+    return start_year, end_year
+
+
+class FieldIndex:
+    """
+    Индекс одного текстового поля книги.
+
+    Хранит нормализованные значения поля, списки вхождений n-грамм
+    для поиска подстрок, префиксное дерево слов и индекс слов
+    для нечеткого поиска. Индекс слов строится при первом нечетком
+    поиске, чтобы поиск подстрок и префиксов за него не платил.
+    """
+
+    def __init__(self) -> None:
+        self.keys: dict[int, str] = {}
+        self.postings: dict[str, set[int]] = {}
+        self.trie = PrefixTrie()
+        self._fuzzy: Optional[TrigramIndex] = None
+
+    @property
+    def fuzzy(self) -> TrigramIndex:
+        """Индекс слов для нечеткого поиска, строится при обращении."""
+        if self._fuzzy is None:
+            with metrics.timed("search.fuzzy_index_build"):
+                self._fuzzy = TrigramIndex()
+                for book_id, key in self.keys.items():
+                    self._fuzzy.add(book_id, key)
+        return self._fuzzy
+
+    def build(self, values: Iterable[tuple[int, str]]) -> None:
+        """
+        Строит индекс по значениям поля всего каталога.
+
+        Args:
+            values (Iterable): Пары ID книги и значения поля.
+        """
+        with metrics.timed("search.index_build"):
+            for book_id, text in values:
+                self.add(book_id, text)
+
+    def add(self, book_id: int, text: str) -> None:
+        """
+        Добавляет значение поля книги в индекс.
+
+        Args:
+            book_id (int): ID книги.
+            text (str): Значение поля.
+        """
+        key = normalize(text)
+        self.keys[book_id] = key
+        for gram in ngrams(key):
+            self.postings.setdefault(gram, set()).add(book_id)
+        for token in set(TOKEN_PATTERN.findall(key)):
+            self.trie.add(token, book_id)
+        if self._fuzzy is not None:
+            self._fuzzy.add(book_id, key)
+
+    def remove(self, book_id: int) -> None:
+        """
+        Удаляет значение поля книги из индекса.
+
+        Args:
+            book_id (int): ID книги.
+        """
+        key = self.keys.pop(book_id, None)
+        if key is None:
+            return
+        for gram in ngrams(key):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(book_id)
+                if not ids:
+                    del self.postings[gram]
+        for token in set(TOKEN_PATTERN.findall(key)):
+            self.trie.remove(token, book_id)
+        if self._fuzzy is not None:
+            self._fuzzy.remove(book_id, key)
+
+    def find_substring(self, value: str) -> list[int]:
+        """
+        Находит ID книг, поле которых содержит подстроку.
+
+        Кандидаты берутся из пересечения списков вхождений n-грамм
+        запроса и затем проверяются по нормализованному значению.
+        Запросы короче n-граммы проверяются по всем значениям поля.
+
+        Args:
+            value (str): Подстрока для поиска.
+
+        Returns:
+            list: Отсортированные ID найденных книг.
+        """
+        query = normalize(value)
+        grams = ngrams(query)
+        if grams:
+            postings = sorted(
+                (self.postings.get(gram, set()) for gram in grams), key=len
+            )
+            candidates: Iterable[int] = set.intersection(*postings)
+        else:
+            candidates = self.keys
+        found = sorted(
+            book_id for book_id in candidates
+            if query in self.keys[book_id]
+        )
+        metrics.count("search.candidates", len(candidates))
+        metrics.count("search.matches", len(found))
+        return found
+
+    def find_prefix(self, prefix: str) -> list[int]:
+        """
+        Находит ID книг, в поле которых есть слово с заданным префиксом.
+
+        Args:
+            prefix (str): Префикс слова.
+
+        Returns:
+            list: Отсортированные ID найденных книг.
+        """
+        return sorted(self.trie.find(normalize(prefix)))
+
+
+class YearIndex:
+    """Отсортированный по году индекс для запросов по диапазону лет."""
+
+    def __init__(self) -> None:
+        self.years: dict[int, int] = {}
+        self.entries: list[tuple[int, int]] = []
+
+    def build(self, books: Iterable[Book]) -> None:
+        """
+        Строит индекс по всему каталогу одной сортировкой.
+
+        Args:
+            books (Iterable): Книги каталога.
+        """
+        with metrics.timed("search.index_build"):
+            self.years = {int(book.id): int(book.year) for book in books}
+            self.entries = sorted(
+                (year, book_id) for book_id, year in self.years.items()
+            )
+
+    def add(self, book_id: int, year: int) -> None:
+        """
+        Добавляет год книги в индекс.
+
+        Args:
+            book_id (int): ID книги.
+            year (int): Год издания.
+        """
+        self.years[book_id] = year
+        insort(self.entries, (year, book_id))
+
+    def remove(self, book_id: int) -> None:
+        """
+        Удаляет книгу из индекса.
+
+        Args:
+            book_id (int): ID книги.
+        """
+        year = self.years.pop(book_id, None)
+        if year is None:
+            return
+        position = bisect_left(self.entries, (year, book_id))
+        if self.entries[position:position + 1] == [(year, book_id)]:
+            del self.entries[position]
+
+    def find_range(self, start: int, end: int) -> list[int]:
+        """
+        Находит ID книг, изданных с start по end год включительно.
+
+        Args:
+            start (int): Первый год диапазона.
+            end (int): Последний год диапазона.
+
+        Returns:
+            list: ID книг в порядке года, затем ID.
+        """
+        low = bisect_left(self.entries, (start,))
+        high = bisect_left(self.entries, (end + 1,))
+        return [book_id for _, book_id in self.entries[low:high]]
+
+
+class StatusIndex:
+    """Индекс книг по статусу наличия."""
+
+    def __init__(self) -> None:
+        self.statuses: dict[int, str] = {}
+        self.postings: dict[str, set[int]] = {}
+
+    def build(self, books: Iterable[Book]) -> None:
+        """
+        Строит индекс по всему каталогу.
+
+        Args:
+            books (Iterable): Книги каталога.
+        """
+        with metrics.timed("search.index_build"):
+            self.statuses = {int(book.id): book.status for book in books}
+            self.postings = {}
+            for book_id, status in self.statuses.items():
+                self.postings.setdefault(status, set()).add(book_id)
+
+    def add(self, book_id: int, status: str) -> None:
+        """
+        Добавляет статус книги в индекс.
+
+        Args:
+            book_id (int): ID книги.
+            status (str): Статус книги.
+        """
+        self.remove(book_id)
+        self.statuses[book_id] = status
+        self.postings.setdefault(status, set()).add(book_id)
+
+    def remove(self, book_id: int) -> None:
+        """
+        Удаляет книгу из индекса.
+
+        Args:
+            book_id (int): ID книги.
+        """
+        status = self.statuses.pop(book_id, None)
+        if status is not None:
+            self.postings[status].discard(book_id)
+
+    def find(self, status: str) -> list[int]:
+        """
+        Находит ID книг с заданным статусом.
+
+        Args:
+            status (str): Статус книги.
+
+        Returns:
+            list: Отсортированные ID найденных книг.
+        """
+        return sorted(self.postings.get(status, ()))
+
+
+class SearchIndex:
+    """
+    Поисковый индекс каталога.
+
+    Объединяет текстовые индексы названия и автора, индекс по году
+    издания и индекс по статусу. Каждый из них строится отдельно
+    при первом запросе к нему, поэтому запрос по году или статусу
+    не платит за текстовые индексы. Текстовый индекс поля строится
+    в фоновом потоке по снимку значений при первом поиске по полю,
+    а пока он строится, поиск перебирает книги каталога. Поэтому
+    первый поиск и разовая команда не ждут построения индекса.
+    Если каталог изменился, пока индекс строился, построенный индекс
+    устарел и строится заново.
+
+    Args:
+        books (Mapping): Книги каталога по ID. Индекс только читает
+            их, изменения передаются через add и remove.
+    """
+
+    def __init__(self, books: Mapping[int, Book]) -> None:
+        self.books: Mapping[int, Book] = books
+        self.fields: dict[str, FieldIndex] = {}
+        self._years: Optional[YearIndex] = None
+        self._statuses: Optional[StatusIndex] = None
+        self._version: int = 0
+        self._builds: dict[str, threading.Thread] = {}
+        self._built: dict[str, tuple[int, FieldIndex]] = {}
+
+    @property
+    def years(self) -> YearIndex:
+        """Индекс по году издания, строится при первом обращении."""
+        if self._years is None:
+            self._years = YearIndex()
+            self._years.build(self.books.values())
+        return self._years
+
+    @property
+    def statuses(self) -> StatusIndex:
+        """Индекс по статусу, строится при первом обращении."""
+        if self._statuses is None:
+            self._statuses = StatusIndex()
+            self._statuses.build(self.books.values())
+        return self._statuses
+
+    def field(self, field: str) -> FieldIndex:
+        """
+        Возвращает текстовый индекс поля, если нужно, строя его сразу.
+
+        Args:
+            field (str): Поле: 'title' или 'author'.
+
+        Returns:
+            FieldIndex: Индекс поля.
+        """
+        index = self._ready(field)
+        if index is None:
+            index = self.fields[field] = self._build(field, self.books.items())
+        return index
+
+    def build(self) -> None:
+        """Сразу строит текстовые индексы всех полей."""
+        for field in INDEXED_FIELDS:
+            self.field(field)
+
+    @staticmethod
+    def _build(field: str, books: Iterable[tuple[int, Book]]) -> FieldIndex:
+        index = FieldIndex()
+        index.build((book_id, getattr(book, field)) for book_id, book in books)
+        return index
+
+    def _ready(self, field: str) -> Optional[FieldIndex]:
+        """
+        Возвращает индекс поля, если он уже построен.
+
+        Готовый индекс из фонового потока принимается, только если
+        каталог с начала построения не менялся.
+
+        Args:
+            field (str): Поле: 'title' или 'author'.
+
+        Returns:
+            FieldIndex | None: Индекс поля или None, если его еще нет.
+        """
+        index = self.fields.get(field)
+        if index is not None:
+            return index
+        thread = self._builds.get(field)
+        if thread is not None and thread.is_alive():
+            return None
+        version, index = self._built.pop(field, (None, None))
+        if version != self._version:
+            return None
+        self.fields[field] = index
+        return index
+
+    def _build_later(self, field: str) -> None:
+        """
+        Запускает построение индекса поля в фоновом потоке.
+
+        Построение не запускается, если индекс уже есть или строится.
+
+        Args:
+            field (str): Поле: 'title' или 'author'.
+        """
+        thread = self._builds.get(field)
+        if field in self.fields or thread is not None and thread.is_alive():
+            return
+        books = list(self.books.items())
+        version = self._version
+
+        def build() -> None:
+            self._built[field] = (version, self._build(field, books))
+
+        thread = threading.Thread(
+            target=build, name=f"search-index-{field}", daemon=True
+        )
+        self._builds[field] = thread
+        thread.start()
+
+    def _scan(self, field: str, match: Callable[[str], bool]) -> list[int]:
+        """
+        Находит ID книг перебором и запускает построение индекса поля.
+
+        Args:
+            field (str): Поле: 'title' или 'author'.
+            match (Callable): Проверка нормализованного значения поля.
+
+        Returns:
+            list: Отсортированные ID найденных книг.
+        """
+        found = sorted(
+            book_id for book_id, book in self.books.items()
+            if match(normalize(getattr(book, field)))
+        )
+        metrics.count("search.candidates", len(self.books))
+        metrics.count("search.matches", len(found))
+        self._build_later(field)
+        return found
+
+    def add(self, book: Book) -> None:
+        """
+        Добавляет книгу в индекс.
+
+        Args:
+            book (Book): Книга.
+        """
+        book_id = int(book.id)
+        self._version += 1
+        for field, index in self.fields.items():
+            index.add(book_id, getattr(book, field))
+        if self._years is not None:
+            self._years.add(book_id, int(book.year))
+        if self._statuses is not None:
+            self._statuses.add(book_id, book.status)
+
+    def remove(self, book_id: int) -> None:
+        """
+        Удаляет книгу из индекса.
+
+        Args:
+            book_id (int): ID книги.
+        """
+        book_id = int(book_id)
+        self._version += 1
+        for index in self.fields.values():
+            index.remove(book_id)
+        if self._years is not None:
+            self._years.remove(book_id)
+        if self._statuses is not None:
+            self._statuses.remove(book_id)
+
+    def update_status(self, book_id: int, status: str) -> None:
+        """
+        Обновляет статус книги в индексе.
+
+        Args:
+            book_id (int): ID книги.
+            status (str): Новый статус.
+        """
+        if self._statuses is not None:
+            self._statuses.add(int(book_id), status)
+
+    def find_year_range(self, start: int, end: int) -> Iterator[int]:
+        """
+        Находит ID книг, изданных в диапазоне лет.
+
+        Args:
+            start (int): Первый год диапазона.
+            end (int): Последний год диапазона.
+
+        Returns:
+            Iterator: ID книг в порядке года, затем ID.
+        """
+        return iter(self.years.find_range(start, end))
+
+    def find_status(self, status: str) -> Iterator[int]:
+        """
+        Находит ID книг с заданным статусом.
+
+        Args:
+            status (str): Статус книги.
+
+        Returns:
+            Iterator: ID найденных книг по возрастанию.
+        """
+        return iter(self.statuses.find(status))
+
+    def find_substring(self, field: str, value: str) -> Iterator[int]:
+        """
+        Находит ID книг, поле которых содержит подстроку.
+
+        Args:
+            field (str): Поле поиска: 'title' или 'author'.
+            value (str): Подстрока для поиска.
+
+        Returns:
+            Iterator: ID найденных книг по возрастанию.
+        """
+        index = self._ready(field)
+        if index is None:
+            query = normalize(value)
+            return iter(self._scan(field, lambda key: query in key))
+        return iter(index.find_substring(value))
+
+    def find_prefix(self, field: str, prefix: str) -> Iterator[int]:
+        """
+        Находит ID книг, в поле которых есть слово с заданным префиксом.
+
+        Args:
+            field (str): Поле поиска: 'title' или 'author'.
+            prefix (str): Префикс слова.
+
+        Returns:
+            Iterator: ID найденных книг по возрастанию.
+        """
+        index = self._ready(field)
+        if index is None:
+            prefix = normalize(prefix)
+            return iter(self._scan(field, lambda key: any(
+                token.startswith(prefix)
+                for token in TOKEN_PATTERN.findall(key)
+            )))
+        return iter(index.find_prefix(prefix))
+
+    def find_fuzzy(
+        self, value: str, fields: Iterable[str] = INDEXED_FIELDS,
+        threshold: float = FUZZY_THRESHOLD,
+    ) -> Iterator[int]:
+        """
+        Нечетко ищет книги по названию и автору.
+
+        Args:
+            value (str): Строка запроса.
+            fields (Iterable): Поля поиска.
+            threshold (float): Минимальное сходство.
+
+        Returns:
+            Iterator: ID книг от самых похожих к менее похожим.
+        """
+        return iter(rank_fuzzy(
+            (self.field(field).fuzzy for field in fields), value, threshold
+        ))
@@ -0,0 +1,139 @@
+import json
+from typing import Callable, TypeVar
+
+from constants import LOCK_SUFFIX, META_SUFFIX
+from locking import file_lock
+from storage import atomic_file
+
+T = TypeVar("T")
+
+
+def meta_path(path: str) -> str:
+    """
+    Возвращает путь к файлу метаданных каталога.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+
+    Returns:
+        str: Путь к файлу метаданных рядом с базой данных.
+    """
+    return path + META_SUFFIX
+
+
+def _read(file) -> dict:
+    try:
+        return json.loads(file.read() or "{}")
+    except ValueError:
+        return {}
+
+
+def read_meta(path: str) -> dict:
+    """
+    Читает метаданные каталога.
+
+    Файл метаданных подменяется целиком, поэтому читатель без
+    блокировки видит либо прежнюю, либо новую версию.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+
+    Returns:
+        dict: Метаданные: 'next_id' и 'generation'.
+    """
+    try:
+        with open(meta_path(path), "r", encoding="utf-8") as file:
+            return _read(file)
+    except FileNotFoundError:
+        return {}
+
+
+def update_meta(path: str, update: Callable[[dict], T]) -> T:
+    """
+    Изменяет метаданные каталога под исключительной блокировкой.
+
+    Новые метаданные пишутся во временный файл и подменяют прежний
+    через os.replace, поэтому сбой во время записи не обнуляет
+    счетчики. Блокируется отдельный файл рядом с метаданными.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        update (Callable): Функция, изменяющая словарь метаданных
+            на месте.
+
+    Returns:
+        Значение, которое вернула функция update.
+    """
+    with file_lock(meta_path(path) + LOCK_SUFFIX):
+        meta = read_meta(path)
+        result = update(meta)
+        with atomic_file(meta_path(path), backups=0) as file:
+            json.dump(meta, file)
+    return result
+
+
+def read_generation(path: str) -> int:
+    """
+    Возвращает номер поколения каталога.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+
+    Returns:
+        int: Номер поколения, 0 для каталога без метаданных.
+    """
+    return read_meta(path).get("generation", 0)
+
+
+def bump_generation(path: str) -> int:
+    """
+    Увеличивает номер поколения каталога после записи изменений.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+
+    Returns:
+        int: Новый номер поколения.
+    """
+    def bump(meta: dict) -> int:
+        meta["generation"] = meta.get("generation", 0) + 1
+        return meta["generation"]
+
+    return update_meta(path, bump)
+
+
+class IdSequence:
+    """
+    Монотонная последовательность ID, сохраняемая рядом с каталогом.
+
+    Следующий свободный ID хранится в файле метаданных, поэтому
+    выдача ID не требует чтения каталога. Файл изменяется под
+    исключительной блокировкой, и процессы, работающие с одним
+    каталогом, никогда не получают одинаковые ID.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+
+    def reserve(self, count: int = 1, floor: int = 1) -> range:
+        """
+        Резервирует диапазон подряд идущих ID.
+
+        Args:
+            count (int): Количество ID.
+            floor (int): Минимальный допустимый ID, например максимальный
+                ID каталога плюс один, если каталог изменили вручную.
+
+        Returns:
+            range: Зарезервированные ID.
+        """
+        def advance(meta: dict) -> int:
+            start = max(meta.get("next_id", 1), floor)
+            meta["next_id"] = start + count
+            return start
+
+        start = update_meta(self.path, advance)
+        return range(start, start + count)
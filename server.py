@@ -0,0 +1,365 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from itertools import islice
+from typing import Callable, Optional, TypeVar
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+from changefeed import read_changes
+from cli import add_books, delete_books, page, toggle_statuses
+from constants import DATABASE, SERVER_HOST, SERVER_PAGE_SIZE, SERVER_PORT
+from query import search_books
+from repository import Repository, get_repository
+
+Operation = Callable[[Repository], dict]
+T = TypeVar("T")
+
+
+class HttpError(Exception):
+    """
+    Ошибка обработки запроса с HTTP статусом ответа.
+
+    Args:
+        status (HTTPStatus): Статус ответа.
+        message (str): Описание ошибки.
+    """
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status: HTTPStatus = status
+
+
+class LibraryService:
+    """
+    HTTP сервис библиотеки поверх общего каталога в памяти.
+
+    Изменения передаются через очередь единственной задаче-писателю.
+    Писатель забирает из очереди все накопившиеся изменения, применяет
+    их и сохраняет каталог одной записью. Репозиторий не рассчитан
+    на работу из нескольких потоков, поэтому все обращения к нему
+    (разбор JSON, запись снимка, fsync журнала, блокировки файла)
+    выполняются по очереди в одном отдельном потоке, а цикл событий
+    тем временем принимает и читает другие запросы.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+    """
+
+    def __init__(self, path: str = DATABASE) -> None:
+        self.path: str = path
+        self.queue: Optional[asyncio.Queue] = None
+        self.writer_task: Optional[asyncio.Task] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+    def repository(self) -> Repository:
+        """
+        Возвращает актуальный репозиторий каталога.
+
+        Returns:
+            Repository: Репозиторий, перечитанный при изменении файла.
+        """
+        return get_repository(self.path)
+
+    async def start(
+        self, host: str = SERVER_HOST, port: int = SERVER_PORT
+    ) -> asyncio.AbstractServer:
+        """
+        Загружает каталог, запускает писателя и HTTP сервер.
+
+        Args:
+            host (str): Адрес для прослушивания.
+            port (int): Порт, 0 — выбрать свободный.
+
+        Returns:
+            asyncio.AbstractServer: Запущенный сервер.
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="library-io"
+        )
+        await self.run(self.repository)
+        self.queue = asyncio.Queue()
+        self.writer_task = asyncio.create_task(self.write_loop())
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def stop(self) -> None:
+        """Останавливает задачу-писателя и поток работы с каталогом."""
+        if self.writer_task is not None:
+            self.writer_task.cancel()
+            try:
+                await self.writer_task
+            except asyncio.CancelledError:
+                pass
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    async def run(self, function: Callable[..., T], *args) -> T:
+        """
+        Выполняет обращение к каталогу в потоке работы с каталогом.
+
+        Args:
+            function (Callable): Функция, работающая с репозиторием.
+            *args: Аргументы функции.
+
+        Returns:
+            Результат функции.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, function, *args
+        )
+
+    async def submit(self, operation: Operation) -> dict:
+        """
+        Передает изменение писателю и ждет его сохранения.
+
+        Args:
+            operation (Callable): Функция, изменяющая репозиторий.
+
+        Returns:
+            dict: Результат изменения.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((operation, future))
+        return await future
+
+    async def write_loop(self) -> None:
+        """Применяет изменения из очереди пачками, по одной записи."""
+        while True:
+            operations = [await self.queue.get()]
+            while not self.queue.empty():
+                operations.append(self.queue.get_nowait())
+            results = await self.run(
+                self.apply, [operation for operation, _ in operations]
+            )
+            for (_, future), (result, error) in zip(operations, results):
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+    def apply(self, operations: list[Operation]) -> list[tuple]:
+        """
+        Применяет пачку изменений и сохраняет их одной записью.
+
+        Args:
+            operations (list): Функции, изменяющие репозиторий.
+
+        Returns:
+            list: Пары (результат, ошибка) для каждого изменения.
+        """
+        results = []
+        try:
+            repository = self.repository()
+            with repository.batch():
+                for operation in operations:
+                    try:
+                        results.append((operation(repository), None))
+                    except Exception as e:
+                        results.append((None, e))
+        except Exception as e:
+            results = [(None, e)] * len(operations)
+        return results
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Обрабатывает одно HTTP соединение.
+
+        Args:
+            reader (asyncio.StreamReader): Поток запроса.
+            writer (asyncio.StreamWriter): Поток ответа.
+        """
+        try:
+            method, target, body = await read_request(reader)
+            status, payload = HTTPStatus.OK, await self.dispatch(
+                method, target, body
+            )
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+        except (ValueError, KeyError, TypeError) as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            payload = {"error": str(e)}
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> dict:
+        """
+        Выполняет запрос к каталогу.
+
+        Args:
+            method (str): HTTP метод.
+            target (str): Путь запроса с параметрами.
+            body (bytes): Тело запроса.
+
+        Returns:
+            dict: Ответ в виде словаря для JSON.
+
+        Raises:
+            HttpError: Если ресурс или метод не найден.
+        """
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        query = {
+            name: values[-1] for name, values in parse_qs(url.query).items()
+        }
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", SERVER_PAGE_SIZE))
+        if parts == ["books"] and method == "GET":
+            def list_books() -> dict:
+                repository = self.repository()
+                result = page(repository.iter_books(), offset, limit)
+                result.update(
+                    total=len(repository), offset=offset, limit=limit
+                )
+                return result
+
+            return await self.run(list_books)
+        if parts == ["books"] and method == "POST":
+            records = json.loads(body or b"[]")
+            if isinstance(records, dict):
+                records = [records]
+            return await self.submit(
+                lambda repository: add_books(repository, records)
+            )
+        if parts == ["changes"] and method == "GET":
+            since = int(query.get("since", 0))
+            changes = await self.run(
+                lambda: list(islice(read_changes(self.path, since), limit))
+            )
+            last = changes[-1]["seq"] if changes else since
+            return {"changes": changes, "last": last}
+        if parts == ["metrics"] and method == "GET":
+            return metrics.snapshot()
+        if parts == ["stats"] and method == "GET":
+            def cache_stats() -> dict:
+                cache = getattr(self.repository(), "query_cache", None)
+                return {
+                    "cache": cache.stats() if cache is not None else None
+                }
+
+            return await self.run(cache_stats)
+        if parts == ["search"] and method == "GET":
+            field, value = query["field"], query["value"]
+
+            def find_books() -> dict:
+                books = search_books(
+                    self.repository(), field, value,
+                    order_by=query.get("order_by"), limit=limit,
+                    offset=offset, descending=bool(query.get("desc")),
+                    prefix=bool(query.get("prefix")),
+                )
+                return {"books": [book.to_dict() for book in books]}
+
+            return await self.run(find_books)
+        if len(parts) >= 2 and parts[0] == "books":
+            book_id = int(parts[1])
+            if len(parts) == 2 and method == "GET":
+                book = await self.run(
+                    lambda: self.repository().get(book_id)
+                )
+                if book is None:
+                    raise not_found(book_id)
+                return book.to_dict()
+            if len(parts) == 2 and method == "DELETE":
+                result = await self.submit(
+                    lambda repository: delete_books(repository, [book_id])
+                )
+            elif parts[2:] == ["status"] and method == "POST":
+                result = await self.submit(
+                    lambda repository: toggle_statuses(repository, [book_id])
+                )
+            else:
+                raise HttpError(HTTPStatus.NOT_FOUND, "Неизвестный запрос.")
+            if result["missing"]:
+                raise not_found(book_id)
+            return result
+        raise HttpError(HTTPStatus.NOT_FOUND, "Неизвестный запрос.")
+
+
+def not_found(book_id: int) -> HttpError:
+    """
+    Создает ошибку 404 для отсутствующей книги.
+
+    Args:
+        book_id (int): ID книги.
+
+    Returns:
+        HttpError: Ошибка с сообщением о ненайденной книге.
+    """
+    return HttpError(HTTPStatus.NOT_FOUND, f"Книга с ID {book_id} не найдена.")
+
+
+async def read_request(reader: asyncio.StreamReader) -> tuple[str, str, bytes]:
+    """
+    Читает HTTP запрос из потока.
+
+    Args:
+        reader (asyncio.StreamReader): Поток запроса.
+
+    Returns:
+        tuple: Метод, путь запроса и тело.
+    """
+    request_line = (await reader.readline()).decode("latin-1")
+    method, target, _ = request_line.split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, body
+
+
+async def serve(path: str, host: str, port: int) -> None:
+    """
+    Запускает сервис и обслуживает запросы до остановки.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        host (str): Адрес для прослушивания.
+        port (int): Порт.
+    """
+    service = LibraryService(path)
+    server = await service.start(host, port)
+    print(f"Сервис библиотеки запущен на http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main() -> None:
+    """Запускает HTTP сервис из командной строки."""
+    parser = argparse.ArgumentParser(description="HTTP сервис библиотеки.")
+    parser.add_argument("--database", default=DATABASE)
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.database, args.host, args.port))
+    except KeyboardInterrupt:
+        print("Сервис остановлен.")
+
+
+if __name__ == "__main__":
+    main()
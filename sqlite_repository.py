@@ -0,0 +1,674 @@
+import argparse
+import sqlite3
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterable, Iterator, Mapping, Optional
+
+import changefeed
+from classes import Book
+from constants import CHANGE_FEED_ENABLED
+from search_index import TrigramIndex, parse_year_range, rank_fuzzy
+from storage import iter_books
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    title_key TEXT NOT NULL,
+    author_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS books_year ON books (year);
+CREATE INDEX IF NOT EXISTS books_title ON books (title_key);
+CREATE INDEX IF NOT EXISTS books_author ON books (author_key);
+CREATE INDEX IF NOT EXISTS books_status ON books (status);
+CREATE VIRTUAL TABLE IF NOT EXISTS books_text USING fts5(
+    title_key, author_key, content='books', content_rowid='id',
+    tokenize='trigram case_sensitive 1'
+);
+CREATE TRIGGER IF NOT EXISTS books_text_delete AFTER DELETE ON books BEGIN
+    INSERT INTO books_text (books_text, rowid, title_key, author_key)
+    VALUES ('delete', old.id, old.title_key, old.author_key);
+END;
+CREATE TRIGGER IF NOT EXISTS books_text_update
+AFTER UPDATE OF title_key, author_key ON books BEGIN
+    INSERT INTO books_text (books_text, rowid, title_key, author_key)
+    VALUES ('delete', old.id, old.title_key, old.author_key);
+    INSERT INTO books_text (rowid, title_key, author_key)
+    VALUES (new.id, new.title_key, new.author_key);
+END;
+CREATE TABLE IF NOT EXISTS sequence (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO sequence VALUES ('books', 1);
+INSERT OR IGNORE INTO sequence VALUES ('generation', 0);
+"""
+COLUMNS = "id, title, author, year, status"
+TRIGRAM_SIZE = 3
+
+
+def match_phrase(key: str) -> str:
+    """
+    Превращает строку в фразу запроса MATCH полнотекстового индекса.
+
+    Args:
+        key (str): Нормализованная строка поиска.
+
+    Returns:
+        str: Строка в кавычках, кавычки внутри удвоены.
+    """
+    return '"' + key.replace('"', '""') + '"'
+
+
+def book_to_row(book: Book) -> tuple:
+    """
+    Преобразует книгу в строку таблицы books.
+
+    Args:
+        book (Book): Книга.
+
+    Returns:
+        tuple: Значения столбцов таблицы, включая ключи поиска
+            после casefold.
+    """
+    return (
+        int(book.id), book.title, book.author, int(book.year), book.status,
+        book.title.casefold(), book.author.casefold(),
+    )
+
+
+def row_to_book(row: tuple) -> Book:
+    """
+    Преобразует строку таблицы books в книгу.
+
+    Args:
+        row (tuple): Значения столбцов id, title, author, year, status.
+
+    Returns:
+        Book: Объект книги.
+    """
+    book_id, title, author, year, status = row
+    return Book(book_id, title, author, str(year), status)
+
+
+class SqliteBookRepository:
+    """
+    Хранилище книг в базе SQLite.
+
+    Повторяет интерфейс BookRepository, но не держит каталог в памяти:
+    каждое действие выполняется одним запросом по индексам. Вхождение
+    подстроки в название и автора ищется по полнотекстовому индексу
+    FTS5 с триграммами. Удаления и правки строк переносят в индекс
+    триггеры, а новые строки дописываются в него одним executemany
+    вместе со вставкой: триггер на каждую вставку втрое замедлял
+    перенос большого каталога.
+    С лентой изменений записи об изменениях дописываются в ленту
+    внутри той же транзакции, до ее фиксации: пока транзакция
+    держит блокировку записи базы, номера ленты идут в порядке
+    фиксации изменений.
+
+    Args:
+        path (str): Путь к файлу базы SQLite.
+        change_feed (bool): Дописывать изменения в ленту изменений.
+    """
+
+    def __init__(
+        self, path: str, change_feed: bool = CHANGE_FEED_ENABLED
+    ) -> None:
+        self.path: str = path
+        self.change_feed: bool = change_feed
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA recursive_triggers=ON")
+        has_text_index = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'books_text'"
+        ).fetchone()
+        self.connection.executescript(SCHEMA)
+        if has_text_index is None:
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO books_text (books_text) VALUES ('rebuild')"
+                )
+        self._batch_depth: int = 0
+        self._pending: list[dict] = []
+        self._fuzzy: dict[str, TrigramIndex] = {}
+        self._fuzzy_generation: Optional[int] = None
+
+    @property
+    def generation(self) -> int:
+        """Номер поколения каталога, растет с каждым изменением."""
+        return self.connection.execute(
+            "SELECT value FROM sequence WHERE name = 'generation'"
+        ).fetchone()[0]
+
+    def _bump_generation(self) -> None:
+        self.connection.execute(
+            "UPDATE sequence SET value = value + 1 "
+            "WHERE name = 'generation'"
+        )
+
+    def refresh(self) -> None:
+        """База SQLite всегда актуальна, перечитывать нечего."""
+
+    def load(self) -> None:
+        """База SQLite не загружается в память целиком."""
+
+    def warm_up(self) -> None:
+        """База SQLite не загружается в память, прогревать нечего."""
+
+    def store_cache(self) -> bool:
+        """
+        База SQLite не кэшируется.
+
+        Returns:
+            bool: Всегда False.
+        """
+        return False
+
+    def save(self) -> None:
+        """Каждое изменение сохраняется своей транзакцией."""
+
+    def compact(self) -> None:
+        """Переносит журнал WAL в основной файл базы."""
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Объединяет изменения внутри блока в одну транзакцию.
+
+        При ошибке внутри блока транзакция откатывается. Изменения
+        блока дописываются в ленту одной записью перед фиксацией.
+        """
+        self._batch_depth += 1
+        try:
+            if self._batch_depth == 1:
+                with self.connection:
+                    yield
+                    records, self._pending = self._pending, []
+                    if records:
+                        changefeed.append_changes(self.path, records)
+            else:
+                yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._pending = []
+
+    def _transaction(self) -> ContextManager:
+        if self._batch_depth:
+            return nullcontext()
+        return self.connection
+
+    def _publish(self, records: list[dict]) -> None:
+        """
+        Дописывает изменения в ленту до фиксации транзакции.
+
+        Внутри batch() изменения копятся до конца блока.
+
+        Args:
+            records (list): Записи об изменениях.
+        """
+        if not self.change_feed or not records:
+            return
+        if self._batch_depth:
+            self._pending.extend(records)
+        else:
+            changefeed.append_changes(self.path, records)
+
+    def _index_text(self, rows: list[tuple]) -> None:
+        """
+        Дописывает новые строки books в полнотекстовый индекс.
+
+        Args:
+            rows (list): Строки в порядке столбцов таблицы books.
+        """
+        self.connection.executemany(
+            "INSERT INTO books_text (rowid, title_key, author_key) "
+            "VALUES (?, ?, ?)",
+            ((row[0], row[5], row[6]) for row in rows)
+        )
+
+    def close(self) -> None:
+        """Закрывает соединение с базой."""
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM books"
+        ).fetchone()[0]
+
+    def __iter__(self) -> Iterator[Book]:
+        return self.iter_books()
+
+    def _select(
+        self, where: str = "", params: tuple = (), limit: str = ""
+    ) -> Iterator[Book]:
+        cursor = self.connection.execute(
+            f"SELECT {COLUMNS} FROM books {where} ORDER BY id {limit}", params
+        )
+        return (row_to_book(row) for row in cursor)
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Перебирает книги каталога в порядке ID.
+
+        Returns:
+            Iterator: Итератор по объектам класса Book.
+        """
+        return self._select()
+
+    def all(self) -> list[Book]:
+        """
+        Возвращает список всех книг в порядке ID.
+
+        Returns:
+            list: Список объектов класса Book.
+        """
+        return list(self._select())
+
+    def search(self, field: str, value: str) -> Iterator[Book]:
+        """
+        Ищет книги по названию, автору, году, диапазону лет или статусу.
+
+        Args:
+            field (str): Поле поиска: 'title', 'author', 'year',
+                'year_range', 'status' или 'fuzzy'.
+            value (str): Значение поиска.
+
+        Returns:
+            Iterator: Итератор по найденным книгам.
+        """
+        if field in ("year", "year_range"):
+            return self.search_year_range(*parse_year_range(value))
+        if field == "status":
+            return self.search_status(value)
+        if field == "fuzzy":
+            return self.search_fuzzy(value)
+        if field not in ("title", "author"):
+            raise ValueError(f"Неизвестное поле поиска: {field}")
+        key = value.casefold()
+        if len(key) < TRIGRAM_SIZE:
+            return self._select(f"WHERE instr({field}_key, ?) > 0", (key,))
+        return self._select(
+            "WHERE id IN (SELECT rowid FROM books_text "
+            f"WHERE {field}_key MATCH ?)",
+            (match_phrase(key),)
+        )
+
+    def search_year_range(self, start: int, end: int) -> Iterator[Book]:
+        """
+        Ищет книги, изданные с start по end год включительно.
+
+        Args:
+            start (int): Первый год диапазона.
+            end (int): Последний год диапазона.
+
+        Returns:
+            Iterator: Итератор по найденным книгам в порядке года, затем ID.
+        """
+        cursor = self.connection.execute(
+            f"SELECT {COLUMNS} FROM books WHERE year BETWEEN ? AND ? "
+            "ORDER BY year, id",
+            (start, end)
+        )
+        return (row_to_book(row) for row in cursor)
+
+    def search_status(self, status: str) -> Iterator[Book]:
+        """
+        Ищет книги с заданным статусом.
+
+        Args:
+            status (str): Статус книги.
+
+        Returns:
+            Iterator: Итератор по найденным книгам в порядке ID.
+        """
+        return self._select("WHERE status = ?", (status,))
+
+    def search_prefix(self, field: str, prefix: str) -> Iterator[Book]:
+        """
+        Ищет книги, в названии или авторе которых есть слово с префиксом.
+
+        Начало поля ищется диапазоном по индексу, начала следующих
+        слов — по полнотекстовому индексу как вхождение префикса после
+        пробела. Префикс из одного символа ищется перебором.
+
+        Args:
+            field (str): Поле поиска: 'title' или 'author'.
+            prefix (str): Начало слова.
+
+        Returns:
+            Iterator: Итератор по найденным книгам в порядке ID.
+        """
+        if field not in ("title", "author"):
+            raise ValueError(f"Неизвестное поле поиска: {field}")
+        key = prefix.casefold()
+        if len(" " + key) < TRIGRAM_SIZE:
+            return self._select(
+                f"WHERE ({field}_key >= ? AND {field}_key < ?) "
+                f"OR instr({field}_key, ?) > 0",
+                (key, key + "\U0010ffff", " " + key)
+            )
+        return self._select(
+            f"WHERE ({field}_key >= ? AND {field}_key < ?) "
+            "OR id IN (SELECT rowid FROM books_text "
+            f"WHERE {field}_key MATCH ?)",
+            (key, key + "\U0010ffff", match_phrase(" " + key))
+        )
+
+    def search_fuzzy(self, value: str) -> Iterator[Book]:
+        """
+        Нечетко ищет книги по названию и автору с опечатками.
+
+        Индекс n-грамм слов строится в памяти по ключевым колонкам
+        и перестраивается при смене поколения базы.
+
+        Args:
+            value (str): Строка запроса.
+
+        Returns:
+            Iterator: Итератор по найденным книгам от самых похожих.
+        """
+        generation = self.generation
+        if self._fuzzy_generation != generation:
+            self._fuzzy = {"title": TrigramIndex(), "author": TrigramIndex()}
+            for book_id, title_key, author_key in self.connection.execute(
+                "SELECT id, title_key, author_key FROM books"
+            ):
+                self._fuzzy["title"].add(book_id, title_key)
+                self._fuzzy["author"].add(book_id, author_key)
+            self._fuzzy_generation = generation
+        books = (
+            self.get(book_id)
+            for book_id in rank_fuzzy(self._fuzzy.values(), value)
+        )
+        return (book for book in books if book is not None)
+
+    def page(self, offset: int, limit: int) -> list[Book]:
+        """
+        Возвращает страницу книг в порядке ID.
+
+        Args:
+            offset (int): Сколько книг пропустить.
+            limit (int): Сколько книг вернуть.
+
+        Returns:
+            list: Книги страницы.
+        """
+        return list(self._select("", (limit, offset), "LIMIT ? OFFSET ?"))
+
+    def position(self, book_id: int) -> Optional[int]:
+        """
+        Находит порядковый номер книги в каталоге по индексу ID.
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            int | None: Номер книги, начиная с нуля, или None,
+                если книги нет.
+        """
+        if self.get(book_id) is None:
+            return None
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM books WHERE id < ?", (int(book_id),)
+        ).fetchone()[0]
+
+    def get(self, book_id: int) -> Optional[Book]:
+        """
+        Находит книгу по ID через первичный ключ.
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            Book | None: Найденная книга или None.
+        """
+        return next(self._select("WHERE id = ?", (int(book_id),)), None)
+
+    def next_id(self) -> int:
+        """
+        Выдает ID для новой книги.
+
+        Returns:
+            int: Новый уникальный ID.
+        """
+        return self.reserve_ids(1)[0]
+
+    def reserve_ids(self, count: int) -> range:
+        """
+        Резервирует диапазон ID для массового добавления книг.
+
+        Последовательность хранится в таблице sequence и сдвигается
+        одним UPDATE, который сразу захватывает блокировку записи,
+        поэтому параллельные писатели не получают одинаковые ID.
+
+        Args:
+            count (int): Количество ID.
+
+        Returns:
+            range: Зарезервированные ID.
+        """
+        with self._transaction():
+            self.connection.execute(
+                "UPDATE sequence SET value = MAX(value, "
+                "(SELECT COALESCE(MAX(id), 0) + 1 FROM books)) + ? "
+                "WHERE name = 'books'",
+                (count,)
+            )
+            end = self.connection.execute(
+                "SELECT value FROM sequence WHERE name = 'books'"
+            ).fetchone()[0]
+        return range(end - count, end)
+
+    def add(self, book: Book) -> None:
+        """
+        Добавляет книгу в каталог.
+
+        Args:
+            book (Book): Новая книга.
+        """
+        row = book_to_row(book)
+        with self._transaction():
+            self.connection.execute(
+                "INSERT OR REPLACE INTO books VALUES (?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+            self._index_text([row])
+            self._bump_generation()
+            self._publish([{"op": "add", "book": book.to_dict()}])
+
+    def delete(self, book_id: int) -> Optional[Book]:
+        """
+        Удаляет книгу из каталога.
+
+        Args:
+            book_id (int): ID книги.
+
+        Returns:
+            Book | None: Удаленная книга или None, если ее не было.
+        """
+        book = self.get(book_id)
+        if book is not None:
+            with self._transaction():
+                self.connection.execute(
+                    "DELETE FROM books WHERE id = ?", (int(book_id),)
+                )
+                self._bump_generation()
+                self._publish([{"op": "delete", "id": int(book_id)}])
+        return book
+
+    def set_status(self, book_id: int, status: str) -> Optional[Book]:
+        """
+        Меняет статус книги.
+
+        Args:
+            book_id (int): ID книги.
+            status (str): Новый статус.
+
+        Returns:
+            Book | None: Измененная книга или None, если ее нет.
+        """
+        with self._transaction():
+            cursor = self.connection.execute(
+                "UPDATE books SET status = ? WHERE id = ?",
+                (status, int(book_id))
+            )
+            self._bump_generation()
+            if cursor.rowcount:
+                self._publish([
+                    {"op": "status", "id": int(book_id), "status": status}
+                ])
+        return self.get(book_id)
+
+    def delete_many(
+        self, book_ids: Iterable[int]
+    ) -> tuple[list[Book], list[int]]:
+        """
+        Удаляет несколько книг одной транзакцией.
+
+        Args:
+            book_ids (Iterable): ID удаляемых книг.
+
+        Returns:
+            tuple: Удаленные книги и ID, которых нет в каталоге.
+        """
+        deleted = []
+        missing = []
+        with self._transaction():
+            for book_id in book_ids:
+                book = self.get(book_id)
+                if book is None:
+                    missing.append(int(book_id))
+                else:
+                    deleted.append(book)
+            self.connection.executemany(
+                "DELETE FROM books WHERE id = ?",
+                ((int(book.id),) for book in deleted)
+            )
+            self._bump_generation()
+            self._publish([
+                {"op": "delete", "id": int(book.id)} for book in deleted
+            ])
+        return deleted, missing
+
+    def set_status_many(
+        self, statuses: Mapping[int, str]
+    ) -> tuple[list[Book], list[int]]:
+        """
+        Меняет статусы нескольких книг одной транзакцией.
+
+        Args:
+            statuses (Mapping): Новые статусы по ID книг.
+
+        Returns:
+            tuple: Измененные книги и ID, которых нет в каталоге.
+        """
+        changed = []
+        missing = []
+        with self._transaction():
+            for book_id, status in statuses.items():
+                book = self.get(book_id)
+                if book is None:
+                    missing.append(int(book_id))
+                    continue
+                book.status = status
+                changed.append(book)
+            self.connection.executemany(
+                "UPDATE books SET status = ? WHERE id = ?",
+                ((book.status, int(book.id)) for book in changed)
+            )
+            self._bump_generation()
+            self._publish([
+                {"op": "status", "id": int(book.id), "status": book.status}
+                for book in changed
+            ])
+        return changed, missing
+
+    def add_many(self, books: Iterable[Book]) -> int:
+        """
+        Добавляет несколько книг одной транзакцией.
+
+        Args:
+            books (Iterable): Новые книги.
+
+        Returns:
+            int: Количество добавленных книг.
+        """
+        if self.change_feed:
+            books = list(books)
+        rows = [book_to_row(book) for book in books]
+        with self._transaction():
+            cursor = self.connection.executemany(
+                "INSERT OR REPLACE INTO books VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._index_text(rows)
+            self._bump_generation()
+            if self.change_feed:
+                self._publish([
+                    {"op": "add", "book": book.to_dict()} for book in books
+                ])
+        return cursor.rowcount
+
+    def replace(self, books: list[Book]) -> None:
+        """
+        Полностью заменяет содержимое каталога.
+
+        Args:
+            books (list): Новый список книг.
+        """
+        rows = [book_to_row(book) for book in books]
+        with self._transaction():
+            self.connection.execute("DELETE FROM books")
+            self.connection.executemany(
+                "INSERT INTO books VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._index_text(rows)
+            self._bump_generation()
+            if self.change_feed:
+                self._publish([{
+                    "op": "replace",
+                    "books": [book.to_dict() for book in books],
+                }])
+
+
+def migrate_json_to_sqlite(json_path: str, sqlite_path: str) -> int:
+    """
+    Переносит каталог из JSON файла в базу SQLite.
+
+    JSON читается потоково и записывается одной транзакцией,
+    существующие книги с теми же ID перезаписываются.
+
+    Args:
+        json_path (str): Путь к JSON файлу базы данных.
+        sqlite_path (str): Путь к файлу базы SQLite.
+
+    Returns:
+        int: Количество перенесенных книг.
+    """
+    repository = SqliteBookRepository(sqlite_path)
+    try:
+        return repository.add_many(iter_books(json_path))
+    finally:
+        repository.close()
+
+
+def main() -> None:
+    """Переносит book.json в базу SQLite из командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Перенос каталога из JSON в SQLite."
+    )
+    parser.add_argument("source", help="JSON файл каталога")
+    parser.add_argument("target", help="файл базы SQLite")
+    args = parser.parse_args()
+    count = migrate_json_to_sqlite(args.source, args.target)
+    print(f"Перенесено книг: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+import metrics
+from classes import Book
+from constants import SNAPSHOT_BACKUPS, STREAM_CHUNK_SIZE
+
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def read_books(path: str) -> list[Book]:
+    """
+    Читает JSON файл базы данных и возвращает список книг.
+
+    Если файл отсутствует, создается пустой файл JSON.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+
+    Returns:
+        list: Список объектов класса Book.
+    """
+    if not os.path.exists(path):
+        write_books(path, [])
+    with metrics.timed("storage.parse"):
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+    with metrics.timed("storage.build_books"):
+        books = [Book.from_dict(book) for book in data]
+    metrics.count("storage.books_read", len(books))
+    return books
+
+
+def iter_books(
+    path: str, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[Book]:
+    """
+    Потоково читает JSON файл базы данных и возвращает книги по одной.
+
+    Файл читается блоками, из буфера разбираются отдельные элементы
+    верхнеуровневого массива, поэтому в памяти одновременно находится
+    только текущий блок и одна книга.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        chunk_size (int): Размер читаемого блока в символах.
+
+    Yields:
+        Book: Очередная книга каталога.
+
+    Raises:
+        json.JSONDecodeError: Если файл не является массивом объектов.
+    """
+    if not os.path.exists(path):
+        write_books(path, [])
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as file:
+        buffer = ""
+        position = 0
+        started = False
+        need_value = True
+        count = 0
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position >= len(buffer):
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise json.JSONDecodeError(
+                        "Неожиданный конец файла", buffer, position
+                    )
+                buffer, position = chunk, 0
+                continue
+            char = buffer[position]
+            if not started:
+                if char != "[":
+                    raise json.JSONDecodeError(
+                        "Ожидался массив книг", buffer, position
+                    )
+                started = True
+                position += 1
+                continue
+            if char == "]" and (not need_value or count == 0):
+                return
+            if not need_value:
+                if char != ",":
+                    raise json.JSONDecodeError(
+                        "Ожидалась запятая", buffer, position
+                    )
+                need_value = True
+                position += 1
+                continue
+            try:
+                data, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer, position = buffer[position:] + chunk, 0
+                continue
+            need_value = False
+            count += 1
+            yield Book.from_dict(data)
+
+
+def write_books(
+    path: str, books: list[Book], backups: int = SNAPSHOT_BACKUPS
+) -> None:
+    """
+    Атомарно сохраняет список книг в JSON файл базы данных.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        books (list): Список объектов класса Book.
+        backups (int): Сколько предыдущих снимков хранить в файлах .bak.
+    """
+    with metrics.timed("storage.write"):
+        with atomic_file(path, backups=backups) as file:
+            json.dump(
+                [book.to_dict() for book in books],
+                file, indent=4,
+                ensure_ascii=False
+            )
+
+
+@contextmanager
+def atomic_file(
+    path: str, binary: bool = False, backups: int = SNAPSHOT_BACKUPS
+) -> Iterator[IO]:
+    """
+    Открывает временный файл, который при успехе подменяет path.
+
+    Снимок пишется во временный файл в той же директории, сбрасывается
+    на диск и подменяет базу через os.replace. Прерванная запись
+    не портит старый файл, а читатели до подмены видят прежний снимок.
+    Новый файл получает права по umask, как при обычном open(),
+    а замененный сохраняет права прежнего.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        binary (bool): Открыть файл в двоичном режиме.
+        backups (int): Сколько предыдущих снимков хранить в файлах .bak.
+
+    Yields:
+        IO: Временный файл для записи.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temp_path = tempfile.mkstemp(
+        prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        if binary:
+            file = os.fdopen(descriptor, "wb")
+        else:
+            file = os.fdopen(descriptor, "w", encoding="utf-8")
+        with file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+            metrics.count(
+                "storage.bytes_written", os.fstat(file.fileno()).st_size
+            )
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        else:
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+        if backups > 0 and os.path.exists(path):
+            rotate_backups(path, backups)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    fsync_directory(directory)
+
+
+def backup_path(path: str, number: int) -> str:
+    """
+    Возвращает путь к резервной копии снимка с указанным номером.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        number (int): Номер копии, 1 — самая свежая.
+
+    Returns:
+        str: Путь к резервной копии.
+    """
+    return f"{path}.bak" if number == 1 else f"{path}.bak.{number}"
+
+
+def rotate_backups(path: str, backups: int) -> None:
+    """
+    Сдвигает резервные копии и сохраняет текущий снимок как самую свежую.
+
+    Текущий снимок связывается жесткой ссылкой, поэтому копирование
+    выполняется только там, где ссылки не поддерживаются.
+
+    Args:
+        path (str): Путь к файлу базы данных.
+        backups (int): Сколько копий хранить.
+    """
+    for number in range(backups - 1, 0, -1):
+        if os.path.exists(backup_path(path, number)):
+            os.replace(
+                backup_path(path, number), backup_path(path, number + 1)
+            )
+    newest = backup_path(path, 1)
+    if os.path.exists(newest):
+        os.remove(newest)
+    try:
+        os.link(path, newest)
+    except OSError:
+        shutil.copy2(path, newest)
+
+
+def fsync_directory(directory: str) -> None:
+    """
+    Сбрасывает на диск запись каталога после переименования файла.
+
+    Args:
+        directory (str): Путь к директории.
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def file_signature(path: str) -> tuple[int, int, int] | None:
+    """
+    Возвращает отпечаток файла: время изменения, размер и inode.
+
+    Inode меняется при атомарной подмене снимка, поэтому замена файла
+    замечается даже при совпадении времени изменения и размера.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        tuple | None: Тройка (mtime в наносекундах, размер, inode)
+            или None, если файла не существует.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
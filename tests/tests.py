@@ -1,11 +1,47 @@
+import asyncio
+import http.client
+import io
 import json
 import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
 from unittest.mock import patch
 
-from classes import Book
-from engine_logic import (add_book, change_status, data_to_json, delete_book,
-                          json_to_data, search)
+import cli
+import metrics
+import repository as repository_module
+from binary_catalog import binary_to_json, json_to_binary
+from bulk import export_catalog, import_catalog
+from catalog_cache import HEADER, cache_path, load_cache
+from changefeed import apply_changes, read_changes, replicate
+from classes import STATUSES, Book, BookTable
+from engine_logic import (add_book, all_books, change_status, data_to_json,
+                          delete_book, format_ids, json_to_data, parse_ids,
+                          search, warm_up_catalog)
+from query import QueryCache, query_books, search_books
+from repository import (BinaryBookRepository, BookRepository,
+                        get_repository)
+from server import LibraryService
+from sqlite_repository import SqliteBookRepository, migrate_json_to_sqlite
+from storage import iter_books, write_books
+
+
+def remove_catalog_files(path):
+    """Удаляет файл каталога вместе с файлами рядом с ним."""
+    for suffix in ("", ".journal", ".meta", ".meta.lock", ".lock",
+                   ".changes", ".cache"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def read_json_file(path):
+    """Читает JSON файл напрямую, минуя репозиторий."""
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
 
 
 class TestEngineLogic(unittest.TestCase):
@@ -30,8 +66,7 @@ class TestEngineLogic(unittest.TestCase):
 
     def tearDown(self):
         """Удаляем тестовый файл после каждого теста."""
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        remove_catalog_files(self.test_file)
 
     @patch("engine_logic.DATABASE", "test_book.json")
     def test_a_json_to_data(self):
@@ -107,3 +142,1456 @@ class TestEngineLogic(unittest.TestCase):
         books = json_to_data()
         self.assertEqual(len(books), 2)
         self.assertEqual(books[1].year, "2010")
+
+
+class TestBookRepository(unittest.TestCase):
+    """Тестирование репозитория книг в памяти."""
+
+    def setUp(self):
+        """Создаем временный файл базы данных с тремя книгами."""
+        self.test_file = "test_repository.json"
+        data_to_file = [
+            Book(1, "Книга 1", "Автор 1", "2000", "В наличии").to_dict(),
+            Book(4, "Книга 4", "Автор 4", "2004", "Выдана").to_dict(),
+            Book(6, "Книга 6", "Автор 6", "2006", "В наличии").to_dict(),
+        ]
+        with open(self.test_file, "w", encoding="utf-8") as file:
+            json.dump(data_to_file, file, indent=4)
+
+    def tearDown(self):
+        """Удаляем тестовый файл после каждого теста."""
+        remove_catalog_files(self.test_file)
+
+    def test_get_by_id(self):
+        """Тест поиска книги по ID через индекс."""
+        repository = BookRepository(self.test_file)
+        repository.load()
+        self.assertEqual(repository.get(4).title, "Книга 4")
+        self.assertIsNone(repository.get(5))
+        self.assertEqual(repository.next_id(), 7)
+
+    def test_reload_only_on_change(self):
+        """Тест повторной загрузки каталога только при изменении файла."""
+        repository = get_repository(self.test_file)
+        self.assertIs(get_repository(self.test_file).get(1),
+                      repository.get(1))
+        with open(self.test_file, "w", encoding="utf-8") as file:
+            json.dump([], file)
+        self.assertEqual(len(get_repository(self.test_file)), 0)
+
+    def test_failed_write_rolled_back(self):
+        """Тест отката изменения, которое не удалось сохранить."""
+        repository = BookRepository(self.test_file, use_journal=False)
+        repository.load()
+        with patch("repository.write_books",
+                   side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                repository.add(Book(7, "Книга 7", "Автор 7", "2007",
+                                    "В наличии"))
+            with self.assertRaises(OSError):
+                repository.set_status(1, "Выдана")
+        self.assertIsNone(repository.get(7))
+        self.assertEqual(repository.get(1).status, "В наличии")
+        repository.set_status(4, "В наличии")
+        self.assertEqual(
+            [book["id"] for book in read_json_file(self.test_file)],
+            [1, 4, 6]
+        )
+        self.assertEqual(read_json_file(self.test_file)[0]["status"],
+                         "В наличии")
+
+
+class TestJournal(unittest.TestCase):
+    """Тестирование журнала изменений."""
+
+    def setUp(self):
+        """Создаем временный файл базы данных с двумя книгами."""
+        self.test_file = "test_journal.json"
+        self.journal_file = self.test_file + ".journal"
+        with open(self.test_file, "w", encoding="utf-8") as file:
+            json.dump(
+                [
+                    Book(1, "Книга 1", "Автор 1", "2000", "В наличии")
+                    .to_dict(),
+                    Book(2, "Книга 2", "Автор 2", "2010", "Выдана").to_dict(),
+                ],
+                file, indent=4
+            )
+        with open(self.test_file, "rb") as file:
+            self.snapshot = file.read()
+
+    def tearDown(self):
+        """Удаляем тестовые файлы после каждого теста."""
+        remove_catalog_files(self.test_file)
+
+    def test_mutations_replayed_from_journal(self):
+        """Тест записи изменений в журнал без перезаписи снимка."""
+        repository = BookRepository(self.test_file, use_journal=True)
+        repository.load()
+        repository.add(Book(3, "Книга 3", "Автор 3", "2020", "В наличии"))
+        repository.delete(1)
+        repository.set_status(2, "В наличии")
+        with open(self.test_file, "rb") as file:
+            self.assertEqual(file.read(), self.snapshot)
+        restored = BookRepository(self.test_file, use_journal=True)
+        restored.load()
+        self.assertEqual([book.id for book in restored], [2, 3])
+        self.assertEqual(restored.get(2).status, "В наличии")
+
+    def test_truncated_record_ignored(self):
+        """Тест пропуска недописанной записи в конце журнала."""
+        with open(self.journal_file, "w", encoding="utf-8") as file:
+            file.write('{"op":"delete","id":1}\n{"op":"delete","id"')
+        repository = BookRepository(self.test_file, use_journal=True)
+        repository.load()
+        self.assertEqual([book.id for book in repository], [2])
+
+    @patch("repository.JOURNAL_COMPACT_SIZE", 0)
+    def test_compaction(self):
+        """Тест сворачивания журнала в снимок при превышении порога."""
+        repository = BookRepository(self.test_file, use_journal=True)
+        repository.load()
+        repository.delete(1)
+        self.assertFalse(os.path.exists(self.journal_file))
+        self.assertEqual(len(read_json_file(self.test_file)), 1)
+
+
+class TestAtomicSnapshot(unittest.TestCase):
+    """Тестирование атомарной записи снимка каталога."""
+
+    def setUp(self):
+        """Создаем временный файл базы данных с одной книгой."""
+        self.test_file = "test_atomic.json"
+        write_books(
+            self.test_file,
+            [Book(1, "Книга 1", "Автор 1", "2000", "В наличии")]
+        )
+
+    def tearDown(self):
+        """Удаляем снимок и резервные копии."""
+        remove_catalog_files(self.test_file)
+        for path in (self.test_file + ".bak", self.test_file + ".bak.2"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_failed_write_keeps_snapshot(self):
+        """Тест сохранности снимка при сбое во время записи."""
+        broken = Book(2, object(), "Автор 2", "2000", "В наличии")
+        with self.assertRaises(TypeError):
+            write_books(self.test_file, [broken])
+        self.assertEqual(read_json_file(self.test_file)[0]["title"],
+                         "Книга 1")
+        leftovers = [
+            name for name in os.listdir(".")
+            if name.startswith(self.test_file + ".")
+        ]
+        self.assertEqual(leftovers, [])
+
+    def test_file_mode(self):
+        """Тест прав нового файла по umask и сохранения прав при замене."""
+        umask = os.umask(0o022)
+        os.umask(umask)
+        self.assertEqual(os.stat(self.test_file).st_mode & 0o777,
+                         0o666 & ~umask)
+        os.chmod(self.test_file, 0o640)
+        write_books(self.test_file, [])
+        self.assertEqual(os.stat(self.test_file).st_mode & 0o777, 0o640)
+
+    def test_backup_rotation(self):
+        """Тест ротации резервных копий снимка."""
+        for number in (2, 3, 4):
+            write_books(
+                self.test_file,
+                [Book(number, f"Книга {number}", "Автор", "2000",
+                      "В наличии")],
+                backups=2
+            )
+        self.assertEqual(read_json_file(self.test_file)[0]["id"], 4)
+        self.assertEqual(read_json_file(self.test_file + ".bak")[0]["id"], 3)
+        self.assertEqual(
+            read_json_file(self.test_file + ".bak.2")[0]["id"], 2
+        )
+
+
+class TestStreamingReader(unittest.TestCase):
+    """Тестирование потокового чтения каталога."""
+
+    def setUp(self):
+        """Создаем временный файл базы данных с тремя книгами."""
+        self.test_file = "test_stream.json"
+        self.books = [
+            Book(1, "Книга [1]", "Автор, 1", "2000", "В наличии"),
+            Book(2, "Книга {2}", "Автор \"2\"", "2010", "Выдана"),
+            Book(3, "Книга 3", "Автор 3", "2020", "В наличии"),
+        ]
+        write_books(self.test_file, self.books)
+
+    def tearDown(self):
+        """Удаляем тестовый файл после каждого теста."""
+        remove_catalog_files(self.test_file)
+
+    def test_small_chunks(self):
+        """Тест разбора элементов, разрезанных границами блоков."""
+        expected = [book.to_dict() for book in self.books]
+        for chunk_size in (1, 5, 64):
+            streamed = [
+                book.to_dict()
+                for book in iter_books(self.test_file, chunk_size)
+            ]
+            self.assertEqual(streamed, expected)
+
+    def test_empty_and_broken_files(self):
+        """Тест пустого массива и поврежденного файла."""
+        with open(self.test_file, "w", encoding="utf-8") as file:
+            file.write(" [ ] ")
+        self.assertEqual(list(iter_books(self.test_file)), [])
+        with open(self.test_file, "w", encoding="utf-8") as file:
+            file.write('[{"id": 1, "title": "Кни')
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_books(self.test_file))
+
+    @patch("repository.STREAMING_MIN_SIZE", 0)
+    def test_repository_streams_large_catalog(self):
+        """Тест потокового перебора без загрузки каталога в память."""
+        repository = BookRepository(self.test_file)
+        titles = [book.title for book in repository.iter_books()]
+        self.assertEqual(len(titles), 3)
+        self.assertFalse(repository._loaded)
+
+
+class TestSqliteRepository(unittest.TestCase):
+    """Тестирование хранилища книг в SQLite."""
+
+    def setUp(self):
+        """Переносим временный JSON каталог в базу SQLite."""
+        self.json_file = "test_sqlite.json"
+        self.test_file = "test_sqlite.sqlite3"
+        write_books(self.json_file, [
+            Book(1, "Книга 1", "Автор Первый", "2000", "В наличии"),
+            Book(4, "Книга 4", "Автор Второй", "2010", "Выдана"),
+        ])
+        self.count = migrate_json_to_sqlite(self.json_file, self.test_file)
+
+    def tearDown(self):
+        """Закрываем базу и удаляем тестовые файлы."""
+        repository = repository_module._repositories.pop(
+            os.path.abspath(self.test_file), None
+        )
+        if repository is not None:
+            repository.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.test_file + suffix):
+                os.remove(self.test_file + suffix)
+        remove_catalog_files(self.json_file)
+
+    def test_migration_and_search(self):
+        """Тест переноса каталога и поиска по индексам."""
+        repository = get_repository(self.test_file)
+        self.assertIsInstance(repository, SqliteBookRepository)
+        self.assertEqual(self.count, 2)
+        self.assertEqual(repository.next_id(), 5)
+        self.assertEqual(
+            [book.id for book in repository.search("author", "второй")], [4]
+        )
+        self.assertEqual(
+            [book.title for book in repository.search("year", "2000")],
+            ["Книга 1"]
+        )
+        self.assertEqual(
+            [book.id for book in repository.search("fuzzy", "втарой")], [4]
+        )
+        repository.delete(4)
+        self.assertEqual(list(repository.search_fuzzy("втарой")), [])
+
+    def test_substring_search_uses_text_index(self):
+        """Тест поиска подстроки по полнотекстовому индексу."""
+        repository = get_repository(self.test_file)
+        repository.add(Book(4, "Книга 4", "Автор Третий", "2010", "Выдана"))
+        repository.add(Book(5, "Ещё книга", "Автор \"Пятый\"", "2020",
+                            "В наличии"))
+        self.assertEqual(
+            [book.id for book in repository.search("author", "ТРЕТ")], [4]
+        )
+        self.assertEqual(
+            [book.id for book in repository.search("author", "второй")], []
+        )
+        self.assertEqual(
+            [book.id for book in repository.search("title", "а")], [1, 4, 5]
+        )
+        self.assertEqual(
+            [book.id for book in repository.search("author", '"пят')], [5]
+        )
+        self.assertEqual(
+            [book.id for book in repository.search_prefix("title", "кн")],
+            [1, 4, 5]
+        )
+        plan = " ".join(
+            row[-1] for row in repository.connection.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM books WHERE id IN "
+                "(SELECT rowid FROM books_text WHERE author_key MATCH ?)",
+                ('"трет"',)
+            )
+        )
+        self.assertIn("books_text VIRTUAL TABLE INDEX", plan)
+        self.assertNotIn("SCAN books ", plan + " ")
+
+    def test_text_index_follows_changes(self):
+        """Тест обновления индекса подстрок при замене и удалении."""
+        repository = get_repository(self.test_file)
+        repository.add(Book(4, "Книга 4", "Автор Третий", "2010", "Выдана"))
+        repository.add(Book(4, "Книга 4", "Автор Пятый", "2010", "Выдана"))
+        self.assertEqual(list(repository.search("author", "трет")), [])
+        self.assertEqual(
+            [book.id for book in repository.search("author", "пят")], [4]
+        )
+        repository.add_many([
+            Book(4, "Книга 4", "Автор Шестой", "2010", "Выдана"),
+            Book(5, "Книга 5", "Автор Седьмой", "2011", "Выдана"),
+        ])
+        self.assertEqual(list(repository.search("author", "пят")), [])
+        self.assertEqual(
+            [book.id for book in repository.search("author", "дьм")], [5]
+        )
+        repository.delete(5)
+        self.assertEqual(list(repository.search("author", "дьм")), [])
+        repository.replace([Book(1, "Новая", "Автор", "2001", "Выдана")])
+        self.assertEqual(list(repository.search("author", "шест")), [])
+        self.assertEqual(
+            [book.id for book in repository.search("title", "нов")], [1]
+        )
+
+    def test_text_index_built_for_old_database(self):
+        """Тест построения индекса подстрок для базы без него."""
+        repository = SqliteBookRepository(self.test_file)
+        repository.connection.executescript(
+            "DROP TRIGGER books_text_delete; DROP TRIGGER books_text_update;"
+            "DROP TABLE books_text;"
+        )
+        repository.close()
+        repository = SqliteBookRepository(self.test_file)
+        try:
+            self.assertEqual(
+                [book.id for book in repository.search("author", "рой")],
+                [4]
+            )
+        finally:
+            repository.close()
+
+    @patch("builtins.input", side_effect=["4"])
+    def test_change_status_and_delete(self, mock_input):
+        """Тест изменения статуса и удаления через основную логику."""
+        with patch("engine_logic.DATABASE", self.test_file):
+            change_status()
+            repository = get_repository(self.test_file)
+            self.assertEqual(repository.get(4).status, "В наличии")
+            self.assertEqual(repository.delete(1).title, "Книга 1")
+            self.assertEqual(len(repository), 1)
+
+
+class TestBinaryCatalog(unittest.TestCase):
+    """Тестирование двоичного каталога с доступом через mmap."""
+
+    def setUp(self):
+        """Переводим временный JSON каталог в двоичный формат."""
+        self.json_file = "test_binary.json"
+        self.test_file = "test_binary.bbk"
+        self.books = [
+            Book(1, "Книга 1", "Автор Первый", "2000", "В наличии"),
+            Book(4, "Книга 4", "Автор Второй", "2010", "Выдана"),
+            Book(7, "Книга 7", "Автор Третий", "2020", "В наличии"),
+        ]
+        write_books(self.json_file, self.books)
+        self.count = json_to_binary(self.json_file, self.test_file)
+
+    def tearDown(self):
+        """Удаляем тестовые файлы."""
+        repository = repository_module._repositories.pop(
+            os.path.abspath(self.test_file), None
+        )
+        if repository is not None:
+            repository.close()
+        remove_catalog_files(self.test_file)
+        remove_catalog_files(self.json_file)
+
+    def test_reload_closes_old_map(self):
+        """Тест освобождения прежнего отображения при перечитывании."""
+        repository = BinaryBookRepository(self.test_file)
+        repository.load()
+        catalog = repository._catalog
+        repository.add(Book(8, "Книга 8", "Автор", "2021", "В наличии"))
+        self.assertTrue(catalog.map.closed)
+        catalog = repository._catalog
+        repository.close()
+        self.assertTrue(catalog.map.closed)
+
+    def test_conversion_round_trip(self):
+        """Тест перевода каталога в двоичный формат и обратно."""
+        self.assertEqual(self.count, 3)
+        self.assertLess(os.path.getsize(self.test_file),
+                        os.path.getsize(self.json_file))
+        binary_to_json(self.test_file, self.json_file)
+        self.assertEqual(
+            read_json_file(self.json_file),
+            [book.to_dict() for book in self.books]
+        )
+
+    def test_random_access_without_parsing(self):
+        """Тест страниц и поиска по ID без разбора всего каталога."""
+        repository = get_repository(self.test_file)
+        self.assertIsInstance(repository, BinaryBookRepository)
+        self.assertEqual(len(repository), 3)
+        self.assertEqual([book.id for book in repository.page(1, 5)], [4, 7])
+        self.assertEqual(repository.get(7).author, "Автор Третий")
+        self.assertIsNone(repository.get(5))
+        self.assertEqual(repository.position(7), 2)
+        self.assertFalse(repository._materialized)
+
+    def test_status_flip_in_place(self):
+        """Тест смены статуса одним байтом в файле."""
+        size = os.path.getsize(self.test_file)
+        repository = BinaryBookRepository(self.test_file)
+        self.assertEqual(repository.set_status(1, "Выдана").status, "Выдана")
+        self.assertFalse(repository._materialized)
+        self.assertEqual(os.path.getsize(self.test_file), size)
+        other = BinaryBookRepository(self.test_file)
+        self.assertEqual(other.get(1).status, "Выдана")
+        self.assertEqual(
+            [book.id for book in other.search_status("Выдана")], [1, 4]
+        )
+        self.assertEqual(repository.set_status(1, "Нет в наличии").status,
+                         "Нет в наличии")
+        self.assertEqual(
+            BinaryBookRepository(self.test_file).get(1).status,
+            "Нет в наличии"
+        )
+        size = os.path.getsize(self.test_file)
+        changed, missing = repository.set_status_many(
+            {4: "В наличии", 7: "Выдана", 9: "Выдана"}
+        )
+        self.assertEqual([book.status for book in changed],
+                         ["В наличии", "Выдана"])
+        self.assertEqual(missing, [9])
+        self.assertEqual(os.path.getsize(self.test_file), size)
+
+    def test_add_delete_and_search(self):
+        """Тест добавления, удаления и поиска с новым снимком."""
+        repository = BinaryBookRepository(self.test_file)
+        repository.load()
+        repository.add(Book(repository.next_id(), "Ёжик в тумане",
+                            "Сергей Козлов", "1989", "В наличии"))
+        repository.delete(4)
+        other = BinaryBookRepository(self.test_file)
+        self.assertEqual([book.id for book in other.all()], [1, 7, 8])
+        self.assertEqual(
+            [book.id for book in other.search("fuzzy", "ежик")], [8]
+        )
+        self.assertEqual(other.generation, repository.generation)
+
+    @patch("builtins.input", side_effect=["4"])
+    def test_change_status_menu(self, mock_input):
+        """Тест изменения статуса через основную логику."""
+        with patch("engine_logic.DATABASE", self.test_file), \
+                patch("sys.stdout", new_callable=io.StringIO):
+            change_status()
+        self.assertEqual(
+            BinaryBookRepository(self.test_file).get(4).status, "В наличии"
+        )
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Тестирование поискового индекса по названию и автору."""
+
+    def setUp(self):
+        """Создаем временный каталог и репозиторий с индексом."""
+        self.test_file = "test_index.json"
+        write_books(self.test_file, [
+            Book(1, "Тайна Келлс", "Томм Мур", "2009", "В наличии"),
+            Book(2, "Песнь моря", "Томм Мур", "2014", "В наличии"),
+            Book(3, "1984", "Джордж Оруэлл", "1996", "Выдана"),
+        ])
+        self.repository = BookRepository(self.test_file)
+        self.repository.load()
+
+    def tearDown(self):
+        """Удаляем тестовый файл после каждого теста."""
+        remove_catalog_files(self.test_file)
+
+    def ids(self, books):
+        """Возвращает список ID найденных книг."""
+        return [book.id for book in books]
+
+    def test_substring_search(self):
+        """Тест поиска подстроки без учета регистра."""
+        self.assertEqual(self.ids(self.repository.search("author", "МУР")),
+                         [1, 2])
+        self.assertEqual(self.ids(self.repository.search("title", "ь")), [2])
+        self.assertEqual(self.ids(self.repository.search("title", "Кел")),
+                         [1])
+        self.assertEqual(self.ids(self.repository.search("title", "кле")),
+                         [])
+
+    def test_prefix_search(self):
+        """Тест поиска по началу слова."""
+        self.assertEqual(
+            self.ids(self.repository.search_prefix("author", "ору")), [3]
+        )
+        self.assertEqual(
+            self.ids(self.repository.search_prefix("title", "мор")), [2]
+        )
+
+    def test_scan_until_index_built(self):
+        """Тест перебора книг, пока индекс строится в фоне."""
+        self.assertEqual(self.ids(self.repository.search("author", "мур")),
+                         [1, 2])
+        index = self.repository.search_index()
+        self.assertNotIn("author", index.fields)
+        index._builds["author"].join()
+        self.assertEqual(
+            self.ids(self.repository.search_prefix("author", "том")), [1, 2]
+        )
+        self.assertIn("author", index.fields)
+
+    def test_index_built_before_change_dropped(self):
+        """Тест: индекс, построенный до изменения каталога, не берется."""
+        self.repository.search("title", "тайна")
+        index = self.repository.search_index()
+        index._builds["title"].join()
+        self.repository.delete(1)
+        self.assertEqual(self.ids(self.repository.search("title", "тайна")),
+                         [])
+        self.assertNotIn("title", index.fields)
+        index._builds["title"].join()
+        self.assertEqual(self.ids(self.repository.search("title", "песнь")),
+                         [2])
+        self.assertNotIn(1, index.fields["title"].keys)
+
+    def test_incremental_update(self):
+        """Тест обновления индекса при добавлении и удалении книг."""
+        self.repository.search_index().build()
+        self.repository.add(
+            Book(4, "Скотный двор", "Джордж Оруэлл", "1945", "В наличии")
+        )
+        self.repository.delete(3)
+        self.assertEqual(
+            self.ids(self.repository.search("author", "оруэлл")), [4]
+        )
+        self.assertEqual(
+            self.ids(self.repository.search_prefix("title", "198")), []
+        )
+        title_index = self.repository.search_index().field("title")
+        self.assertNotIn("1", title_index.trie.root)
+
+    def test_year_range_and_status(self):
+        """Тест запросов по диапазону лет и по статусу."""
+        self.assertEqual(
+            self.ids(self.repository.search_year_range(1990, 2010)), [3, 1]
+        )
+        self.assertEqual(self.ids(self.repository.search("year", "2014")),
+                         [2])
+        self.repository.set_status(1, "Выдана")
+        self.repository.delete(2)
+        self.assertEqual(
+            self.ids(self.repository.search_status("Выдана")), [1, 3]
+        )
+        self.assertEqual(
+            self.ids(self.repository.search("year_range", "2000-2020")), [1]
+        )
+
+    def test_indexes_built_separately(self):
+        """Тест: запросы по году и статусу не строят текстовый индекс."""
+        self.repository.search_status("Выдана")
+        index = self.repository.search_index()
+        self.assertIsNotNone(index._statuses)
+        self.assertIsNone(index._years)
+        self.repository.search_year_range(2000, 2010)
+        self.assertIsNotNone(index._years)
+        self.assertEqual(index.fields, {})
+        self.assertEqual(index._builds, {})
+
+    @patch("builtins.input", side_effect=["5", "2"])
+    def test_search_menu_by_status(self, mock_input):
+        """Тест поиска выданных книг через меню."""
+        with patch("engine_logic.DATABASE", self.test_file), \
+                patch("sys.stdout", new_callable=io.StringIO) as output:
+            search()
+        self.assertIn("1984", output.getvalue())
+        self.assertNotIn("Келлс", output.getvalue())
+
+    def test_fuzzy_search(self):
+        """Тест нечеткого поиска с опечатками и ранжированием."""
+        self.repository.search("title", "19")
+        title_index = self.repository.search_index().field("title")
+        self.assertIsNone(title_index._fuzzy)
+        self.assertEqual(self.ids(self.repository.search("fuzzy", "Оруел")),
+                         [3])
+        self.assertEqual(
+            self.ids(self.repository.search_fuzzy("тома мура песня")), [2, 1]
+        )
+        self.repository.add(
+            Book(4, "Ёжик в тумане", "Сергей Козлов", "1989", "В наличии")
+        )
+        self.assertEqual(self.ids(self.repository.search_fuzzy("ежик")), [4])
+        self.repository.delete(4)
+        self.assertEqual(self.ids(self.repository.search_fuzzy("ежик")), [])
+        fuzzy = self.repository.search_index().field("title").fuzzy
+        self.assertNotIn("ежик", fuzzy.words)
+
+    @patch("builtins.input", side_effect=["6", "оруел"])
+    def test_search_menu_fuzzy(self, mock_input):
+        """Тест нечеткого поиска через меню."""
+        with patch("engine_logic.DATABASE", self.test_file), \
+                patch("sys.stdout", new_callable=io.StringIO) as output:
+            search()
+        self.assertIn("1984", output.getvalue())
+
+
+class TestCompactBook(unittest.TestCase):
+    """Тестирование компактного представления книг."""
+
+    def test_book_slots(self):
+        """Тест хранения полей книги без __dict__."""
+        book = Book.from_dict({"id": 1, "title": "Книга 1",
+                               "author": "Автор 1", "year": "2000",
+                               "status": "Выдана"})
+        self.assertFalse(hasattr(book, "__dict__"))
+        self.assertEqual(book.year, "2000")
+        self.assertIs(book.status, STATUSES[1])
+        self.assertEqual(book.to_dict()["year"], "2000")
+
+    def test_book_table_round_trip(self):
+        """Тест преобразования колоночной таблицы в словари и обратно."""
+        data = [
+            Book(1, "Книга 1", "Автор", "1999", "В наличии").to_dict(),
+            Book(7, "Книга 7", "Автор", "2020", "Выдана").to_dict(),
+        ]
+        table = BookTable.from_dicts(data)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.to_dicts(), data)
+        self.assertEqual(list(table.statuses), [0, 1])
+        self.assertIs(table.authors[0], table.authors[1])
+
+
+class TestBulkImportExport(unittest.TestCase):
+    """Тестирование массового импорта и экспорта каталога."""
+
+    def setUp(self):
+        """Создаем временный каталог и файл для импорта."""
+        self.test_file = "test_bulk.json"
+        self.csv_file = "test_bulk.csv"
+        self.jsonl_file = "test_bulk.jsonl"
+        write_books(self.test_file, [
+            Book(5, "Книга 5", "Автор 5", "2000", "В наличии"),
+        ])
+        with open(self.csv_file, "w", encoding="utf-8") as file:
+            file.write(
+                "title,author,year\n"
+                "Книга А,Автор А,1999\n"
+                "Б,Автор Б,1999\n"
+                "Книга В,Автор В,999\n"
+                "Книга Г,Автор Г,2001\n"
+            )
+
+    def tearDown(self):
+        """Удаляем тестовые файлы."""
+        remove_catalog_files(self.test_file)
+        for path in (self.csv_file, self.jsonl_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_import_csv(self):
+        """Тест импорта с проверкой строк и сохранением пачками."""
+        repository = BookRepository(self.test_file)
+        repository.load()
+        with patch("repository.write_books", wraps=write_books) as writer:
+            report = import_catalog(self.csv_file, repository, batch_size=2)
+        self.assertEqual(writer.call_count, 2)
+        self.assertEqual(report.processed, 2)
+        self.assertEqual([number for number, _ in report.rejected], [3, 4])
+        self.assertEqual(
+            [(book.id, book.title) for book in repository],
+            [(5, "Книга 5"), (6, "Книга А"), (7, "Книга Г")]
+        )
+
+    def test_import_jsonl_rejects_bad_rows(self):
+        """Тест отклонения испорченных строк JSONL и чужих статусов."""
+        with open(self.jsonl_file, "w", encoding="utf-8") as file:
+            file.write(
+                '{"title": "Книга А", "author": "Автор А", "year": 1999}\n'
+                '{"title": "Книга Б", "author": \n'
+                '{"title": "Книга В", "author": "Автор В", "year": 1999,'
+                ' "status": "потеряна"}\n'
+                '{"title": "Книга Г", "author": "Автор Г", "year": 2001,'
+                ' "status": "Выдана"}\n'
+            )
+        repository = BookRepository(self.test_file)
+        repository.load()
+        report = import_catalog(self.jsonl_file, repository)
+        self.assertEqual(report.processed, 2)
+        self.assertEqual([number for number, _ in report.rejected], [2, 3])
+        self.assertIn("потеряна", report.rejected[1][1])
+        self.assertNotIn("потеряна", STATUSES)
+        self.assertEqual(repository.get(7).status, "Выдана")
+
+    def test_export_jsonl(self):
+        """Тест потоковой выгрузки каталога в JSONL."""
+        repository = BookRepository(self.test_file)
+        report = export_catalog(self.jsonl_file, repository.iter_books())
+        self.assertEqual(report.processed, 1)
+        with open(self.jsonl_file, "r", encoding="utf-8") as file:
+            self.assertEqual(json.loads(file.readline())["title"], "Книга 5")
+
+
+class TestSearchQuery(unittest.TestCase):
+    """Тестирование сортировки и постраничной выдачи результатов поиска."""
+
+    def setUp(self):
+        """Готовим книги в произвольном порядке."""
+        self.books = [
+            Book(3, "Война и мир", "Лев Толстой", "1869", "В наличии"),
+            Book(1, "Анна Каренина", "Лев Толстой", "1877", "Выдана"),
+            Book(2, "Бесы", "Фёдор Достоевский", "1872", "В наличии"),
+            Book(4, "Идиот", "Фёдор Достоевский", "1869", "В наличии"),
+        ]
+
+    def ids(self, books):
+        """Возвращает список ID книг."""
+        return [int(book.id) for book in books]
+
+    def test_unsorted_is_lazy(self):
+        """Тест: без сортировки поиск останавливается после limit книг."""
+        consumed = []
+
+        def produce():
+            for book in self.books:
+                consumed.append(book.id)
+                yield book
+
+        result = query_books(produce(), limit=2, offset=1)
+        self.assertEqual(consumed, [])
+        self.assertEqual(self.ids(result), [1, 2])
+        self.assertEqual(len(consumed), 3)
+
+    def test_sorted_top_k(self):
+        """Тест сортировки по году, названию и ID со смещением."""
+        self.assertEqual(
+            self.ids(query_books(self.books, order_by="year", limit=3)),
+            [3, 4, 2]
+        )
+        self.assertEqual(
+            self.ids(query_books(self.books, order_by="title", offset=1)),
+            [2, 3, 4]
+        )
+        self.assertEqual(
+            self.ids(query_books(
+                self.books, order_by="id", limit=2, descending=True
+            )),
+            [4, 3]
+        )
+        with self.assertRaises(ValueError):
+            list(query_books(self.books, order_by="status"))
+
+    def test_search_books(self):
+        """Тест поиска в репозитории с сортировкой результатов."""
+        test_file = "test_query.json"
+        write_books(test_file, self.books)
+        try:
+            books = search_books(
+                BookRepository(test_file), "author", "толстой",
+                order_by="year", limit=1,
+            )
+            self.assertEqual(self.ids(books), [3])
+        finally:
+            remove_catalog_files(test_file)
+
+
+class TestQueryCache(unittest.TestCase):
+    """Тестирование кэша результатов поиска."""
+
+    def setUp(self):
+        """Создаем каталог с двумя книгами."""
+        self.test_file = "test_query_cache.json"
+        write_books(self.test_file, [
+            Book(1, "Книга 1", "Лев Толстой", "1869", "В наличии"),
+            Book(2, "Книга 2", "Фёдор Достоевский", "1872", "Выдана"),
+        ])
+        self.repository = BookRepository(self.test_file)
+
+    def tearDown(self):
+        """Удаляем тестовый файл после каждого теста."""
+        remove_catalog_files(self.test_file)
+
+    def ids(self, field, value):
+        """Возвращает ID найденных книг."""
+        return [int(book.id) for book in self.repository.search(field, value)]
+
+    def test_repeated_query_hits(self):
+        """Тест: одинаковые после нормализации запросы попадают в кэш."""
+        self.assertEqual(self.ids("author", "ТОЛСТОЙ"), [1])
+        self.assertEqual(self.ids("author", "толстой"), [1])
+        self.assertEqual(self.ids("year", "1869"), [1])
+        self.assertEqual(self.ids("year_range", "1869-1869"), [1])
+        cache = self.repository.query_cache
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_mutations_invalidate(self):
+        """Тест: изменения каталога сбрасывают кэш."""
+        self.assertEqual(self.ids("status", "В наличии"), [1])
+        self.repository.set_status(2, "В наличии")
+        self.assertEqual(self.ids("status", "В наличии"), [1, 2])
+        self.repository.delete(1)
+        self.assertEqual(self.ids("status", "В наличии"), [2])
+        self.repository.add(Book(3, "Книга 3", "Лев Толстой", "1880",
+                                 "В наличии"))
+        self.assertEqual(self.ids("author", "толстой"), [3])
+        self.assertEqual(self.repository.query_cache.hits, 0)
+
+    def test_lru_eviction(self):
+        """Тест вытеснения самого давнего запроса."""
+        cache = QueryCache(maxsize=2)
+        cache.put(("a",), [1])
+        cache.put(("b",), [2])
+        cache.get(("a",))
+        cache.put(("c",), [3])
+        self.assertIsNone(cache.get(("b",)))
+        self.assertEqual(cache.get(("a",)), [1])
+        self.assertEqual(len(cache), 2)
+
+
+class TestMetrics(unittest.TestCase):
+    """Тестирование замеров горячих путей."""
+
+    def setUp(self):
+        """Включаем замеры и создаем каталог."""
+        self.test_file = "test_metrics.json"
+        write_books(self.test_file, [
+            Book(1, "Мастер и Маргарита", "Михаил Булгаков", "1967",
+                 "В наличии"),
+            Book(2, "Мастера", "Автор", "2000", "Выдана"),
+        ])
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        """Выключаем замеры и удаляем тестовый файл."""
+        metrics.disable()
+        metrics.reset()
+        remove_catalog_files(self.test_file)
+
+    def test_counters_and_latency(self):
+        """Тест счетчиков чтения, записи и поиска."""
+        repository = BookRepository(self.test_file)
+        self.assertEqual(len(list(repository.search("title", "маргарит"))), 1)
+        repository.set_status(1, "Выдана")
+        report = metrics.snapshot()
+        counters = report["counters"]
+        self.assertEqual(counters["storage.books_read"], 2)
+        self.assertEqual(
+            counters["storage.bytes_written"],
+            os.path.getsize(self.test_file)
+            + os.path.getsize(self.test_file + ".meta")
+        )
+        self.assertEqual(counters["search.matches"], 1)
+        self.assertGreaterEqual(counters["search.candidates"], 1)
+        latency = report["latency"]["storage.parse"]
+        self.assertEqual(latency["count"], 1)
+        self.assertEqual(sum(latency["buckets"]), 1)
+        output = io.StringIO()
+        metrics.dump(output)
+        dumped = json.loads(output.getvalue())
+        self.assertIn("search.matches", dumped["counters"])
+
+    @unittest.skipUnless(hasattr(signal, "SIGUSR1"), "нет SIGUSR1")
+    def test_signal_handler_with_warm_up(self):
+        """Тест обработчика SIGUSR1 в меню с фоновой загрузкой."""
+        script = (
+            "import signal, bible_book\n"
+            "bible_book.start_warm_up()\n"
+            "bible_book.load_engine()\n"
+            "print(signal.getsignal(signal.SIGUSR1) is not signal.SIG_DFL)"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with tempfile.TemporaryDirectory() as directory:
+            output = subprocess.run(
+                [sys.executable, "-c", script], cwd=directory,
+                env=dict(os.environ, PYTHONPATH=root, BIBLE_METRICS="1"),
+                capture_output=True, text=True, check=True,
+            ).stdout
+        self.assertEqual(output.strip(), "True")
+
+    def test_disabled_records_nothing(self):
+        """Тест: выключенные замеры ничего не записывают."""
+        metrics.disable()
+        list(BookRepository(self.test_file).search("title", "мастер"))
+        self.assertEqual(metrics.snapshot()["counters"], {})
+        self.assertEqual(metrics.snapshot()["latency"], {})
+
+
+class TestCommandLine(unittest.TestCase):
+    """Тестирование неинтерактивных подкоманд."""
+
+    def setUp(self):
+        """Создаем временный каталог с двумя книгами."""
+        self.test_file = "test_cli.json"
+        write_books(self.test_file, [
+            Book(1, "Книга 1", "Автор 1", "2000", "В наличии"),
+            Book(2, "Книга 2", "Автор 2", "2010", "Выдана"),
+        ])
+
+    def tearDown(self):
+        """Удаляем тестовый файл после каждого теста."""
+        remove_catalog_files(self.test_file)
+
+    def run_cli(self, *args):
+        """Запускает подкоманду и возвращает разобранный JSON вывод."""
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            code = cli.main(["--database", self.test_file, *args])
+        self.assertEqual(code, 0)
+        return json.loads(output.getvalue())
+
+    def test_add_and_search(self):
+        """Тест добавления нескольких книг и поиска одной командой."""
+        result = self.run_cli(
+            "add",
+            '{"title": "Книга 3", "author": "Автор 3", "year": 2020}',
+            '{"title": "Книга 4", "author": "Автор 4", "year": 3000}',
+        )
+        self.assertEqual([book["id"] for book in result["added"]], [3])
+        self.assertEqual(result["rejected"][0]["record"], 2)
+        result = self.run_cli("search", "year_range", "2005-2030")
+        self.assertEqual([book["id"] for book in result["books"]], [2, 3])
+        result = self.run_cli(
+            "search", "year_range", "1990-2030", "--order-by", "year",
+            "--desc", "--limit", "2",
+        )
+        self.assertEqual([book["id"] for book in result["books"]], [3, 2])
+
+    def test_toggle_and_delete_many(self):
+        """Тест изменения статуса и удаления нескольких книг."""
+        result = self.run_cli("toggle-status", "1", "2", "9")
+        self.assertEqual(result["missing"], [9])
+        self.assertEqual(
+            [book["status"] for book in result["changed"]],
+            ["Выдана", "В наличии"]
+        )
+        result = self.run_cli("delete", "1,8-9")
+        self.assertEqual(result, {"deleted": [1], "missing": [8, 9]})
+        result = self.run_cli("list")
+        self.assertEqual(result["books"][0]["status"], "В наличии")
+
+
+class TestIdSequence(unittest.TestCase):
+    """Тестирование последовательности ID."""
+
+    def setUp(self):
+        """Создаем каталог с разрывами в ID и неупорядоченными книгами."""
+        self.test_file = "test_sequence.json"
+        write_books(self.test_file, [
+            Book(9, "Книга 9", "Автор", "2000", "В наличии"),
+            Book(4, "Книга 4", "Автор", "2000", "В наличии"),
+        ])
+
+    def tearDown(self):
+        """Удаляем каталог и файл метаданных."""
+        remove_catalog_files(self.test_file)
+
+    def test_ids_above_maximum(self):
+        """Тест выдачи ID больше максимального, а не последнего."""
+        repository = BookRepository(self.test_file)
+        repository.load()
+        self.assertEqual(repository.next_id(), 10)
+        self.assertEqual(repository.next_id(), 11)
+
+    def test_writers_never_collide(self):
+        """Тест выдачи непересекающихся ID двум независимым писателям."""
+        first = BookRepository(self.test_file)
+        second = BookRepository(self.test_file)
+        first.load()
+        second.load()
+        reserved = list(first.reserve_ids(3)) + list(second.reserve_ids(3))
+        reserved.append(first.next_id())
+        self.assertEqual(reserved, list(range(10, 17)))
+        self.assertEqual(read_json_file(self.test_file + ".meta"),
+                         {"next_id": 17})
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    """Тестирование совместной работы нескольких писателей."""
+
+    def setUp(self):
+        """Создаем каталог с двумя книгами."""
+        self.test_file = "test_concurrent.json"
+        write_books(self.test_file, [
+            Book(1, "Книга 1", "Автор 1", "2000", "В наличии"),
+            Book(2, "Книга 2", "Автор 2", "2010", "В наличии"),
+        ])
+
+    def tearDown(self):
+        """Удаляем каталог и файлы рядом с ним."""
+        remove_catalog_files(self.test_file)
+
+    def check_merge(self, use_journal):
+        """Проверяет, что устаревший писатель не затирает чужие изменения."""
+        first = BookRepository(self.test_file, use_journal=use_journal)
+        second = BookRepository(self.test_file, use_journal=use_journal)
+        first.load()
+        second.load()
+        first.add(Book(first.next_id(), "Книга 3", "Автор 3", "2020",
+                       "В наличии"))
+        second.set_status(2, "Выдана")
+        second.delete(1)
+        self.assertEqual(second.generation, 3)
+        restored = BookRepository(self.test_file, use_journal=use_journal)
+        restored.load()
+        self.assertEqual([book.id for book in restored], [2, 3])
+        self.assertEqual(restored.get(2).status, "Выдана")
+
+    def test_stale_snapshot_writer_merges(self):
+        """Тест слияния изменений при записи полного снимка."""
+        self.check_merge(use_journal=False)
+
+    def test_stale_journal_writer_merges(self):
+        """Тест слияния изменений при записи в журнал."""
+        self.check_merge(use_journal=True)
+
+
+class TestHttpService(unittest.TestCase):
+    """Тестирование HTTP сервиса библиотеки."""
+
+    def setUp(self):
+        """Запускаем сервис на свободном порту в отдельном потоке."""
+        self.test_file = "test_service.json"
+        write_books(self.test_file, [
+            Book(1, "Книга 1", "Автор 1", "2000", "В наличии"),
+            Book(2, "Книга 2", "Автор 2", "2010", "Выдана"),
+        ])
+        self.loop = asyncio.new_event_loop()
+        self.service = LibraryService(self.test_file)
+        self.server = self.loop.run_until_complete(
+            self.service.start("127.0.0.1", 0)
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        """Останавливаем сервис и удаляем тестовые файлы."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.run_until_complete(self.service.stop())
+        self.loop.close()
+        remove_catalog_files(self.test_file)
+
+    def request(self, method, path, body=None):
+        """Отправляет запрос и возвращает статус и разобранный JSON."""
+        connection = http.client.HTTPConnection("127.0.0.1", self.port)
+        payload = None if body is None else json.dumps(body)
+        connection.request(method, path, body=payload)
+        response = connection.getresponse()
+        data = json.loads(response.read())
+        connection.close()
+        return response.status, data
+
+    def test_read_endpoints(self):
+        """Тест списка с пагинацией, поиска и получения книги."""
+        status, data = self.request("GET", "/books?offset=1&limit=1")
+        self.assertEqual(status, 200)
+        self.assertEqual(data["total"], 2)
+        self.assertEqual([book["id"] for book in data["books"]], [2])
+        _, data = self.request(
+            "GET", "/search?field=author&value=%D0%B0%D0%B2%D1%82%D0%BE%D1%80"
+        )
+        self.assertEqual(len(data["books"]), 2)
+        status, _ = self.request("GET", "/books/9")
+        self.assertEqual(status, 404)
+
+    def test_write_endpoints(self):
+        """Тест добавления, смены статуса и удаления через писателя."""
+        status, data = self.request(
+            "POST", "/books",
+            [{"title": "Книга 3", "author": "Автор 3", "year": 2020}]
+        )
+        self.assertEqual(status, 200)
+        book_id = data["added"][0]["id"]
+        _, data = self.request("POST", f"/books/{book_id}/status")
+        self.assertEqual(data["changed"][0]["status"], "Выдана")
+        status, _ = self.request("DELETE", "/books/1")
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            [book["id"] for book in read_json_file(self.test_file)],
+            [2, book_id]
+        )
+        status, _ = self.request("DELETE", "/books/1")
+        self.assertEqual(status, 404)
+
+    def test_writes_batched(self):
+        """Тест сохранения одновременных изменений одной записью."""
+        async def toggle_all():
+            return await asyncio.gather(*(
+                self.service.submit(
+                    lambda repository: cli.toggle_statuses(repository, [1])
+                )
+                for _ in range(5)
+            ))
+
+        with patch("repository.write_books", wraps=write_books) as writer:
+            results = asyncio.run_coroutine_threadsafe(
+                toggle_all(), self.loop
+            ).result(timeout=5)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(writer.call_count, 1)
+        self.assertEqual(read_json_file(self.test_file)[0]["status"],
+                         "Выдана")
+
+    def test_failed_batch_rolled_back(self):
+        """Тест ошибки пачки изменений без следа в памяти сервиса."""
+        with patch("repository.write_books",
+                   side_effect=OSError("disk full")):
+            status, data = self.request("DELETE", "/books/1")
+        self.assertEqual(status, 500)
+        self.assertEqual(data["error"], "disk full")
+        status, _ = self.request("GET", "/books/1")
+        self.assertEqual(status, 200)
+
+
+class TestBatchChanges(unittest.TestCase):
+    """Тестирование удаления и смены статуса нескольких книг."""
+
+    def setUp(self):
+        """Создаем каталог из десяти книг."""
+        self.test_file = "test_batch.json"
+        write_books(self.test_file, [
+            Book(number, f"Книга {number}", "Автор", "2000", "В наличии")
+            for number in range(1, 11)
+        ])
+
+    def tearDown(self):
+        """Удаляем тестовый файл после каждого теста."""
+        remove_catalog_files(self.test_file)
+
+    def test_parse_and_format_ids(self):
+        """Тест разбора и краткой записи списка ID."""
+        self.assertEqual(parse_ids("4, 6,10-12,4"), [4, 6, 10, 11, 12])
+        self.assertEqual(format_ids([12, 4, 10, 11, 6]), "4, 6, 10-12")
+        for text in ("", "0", "5-3", "a,2", "1-100000000",
+                     "1-6000,7001-13000"):
+            with self.assertRaises(ValueError):
+                parse_ids(text)
+
+    def test_repository_batches_persist_once(self):
+        """Тест: пакетные изменения сохраняются одной записью."""
+        repository = BookRepository(self.test_file)
+        repository.load()
+        with patch("repository.write_books",
+                   wraps=repository_module.write_books) as write:
+            deleted, missing = repository.delete_many([2, 3, 42])
+            changed, _ = repository.set_status_many(
+                {4: "Выдана", 5: "Выдана"}
+            )
+        self.assertEqual(write.call_count, 2)
+        self.assertEqual([book.id for book in deleted], [2, 3])
+        self.assertEqual(missing, [42])
+        self.assertEqual([book.id for book in changed], [4, 5])
+        self.assertEqual(
+            [book["id"] for book in read_json_file(self.test_file)
+             if book["status"] == "Выдана"],
+            [4, 5]
+        )
+
+    @patch("builtins.input", side_effect=["4,6,9-12", "y"])
+    def test_delete_menu_ranges(self, mock_input):
+        """Тест удаления списка и диапазона ID через меню."""
+        with patch("engine_logic.DATABASE", self.test_file), \
+                patch("sys.stdout", new_callable=io.StringIO) as output:
+            delete_book()
+        self.assertIn("11-12", output.getvalue())
+        self.assertEqual(
+            [book["id"] for book in read_json_file(self.test_file)],
+            [1, 2, 3, 5, 7, 8]
+        )
+
+    @patch("builtins.input", side_effect=["0", "1-3,20"])
+    def test_change_status_menu_ranges(self, mock_input):
+        """Тест смены статуса нескольких книг через меню."""
+        with patch("engine_logic.DATABASE", self.test_file), \
+                patch("sys.stdout", new_callable=io.StringIO) as output:
+            change_status()
+        self.assertIn("20", output.getvalue())
+        self.assertEqual(
+            [book["status"] for book in read_json_file(self.test_file)][:4],
+            ["Выдана", "Выдана", "Выдана", "В наличии"]
+        )
+
+
+class TestChangeFeed(unittest.TestCase):
+    """Тестирование ленты изменений и переноса изменений в реплику."""
+
+    def setUp(self):
+        """Создаем каталог с лентой изменений и пустую реплику."""
+        self.test_file = "test_feed.json"
+        self.replica_file = "test_feed_replica.json"
+        write_books(self.test_file, [
+            Book(1, "Книга 1", "Автор 1", "2000", "В наличии"),
+            Book(2, "Книга 2", "Автор 2", "2010", "В наличии"),
+        ])
+        self.repository = BookRepository(self.test_file, change_feed=True)
+        self.repository.load()
+
+    def tearDown(self):
+        """Удаляем тестовые файлы."""
+        repository_module._repositories.clear()
+        remove_catalog_files(self.test_file)
+        remove_catalog_files(self.replica_file)
+
+    def test_sequence_numbers(self):
+        """Тест нумерации изменений и чтения после номера."""
+        self.repository.add(Book(3, "Книга 3", "Автор 3", "2020",
+                                 "В наличии"))
+        self.repository.set_status_many({1: "Выдана", 3: "Выдана"})
+        self.repository.delete(2)
+        changes = list(read_changes(self.test_file))
+        self.assertEqual([change["seq"] for change in changes],
+                         [1, 2, 3, 4])
+        self.assertEqual(
+            [change["op"] for change in read_changes(self.test_file, 2)],
+            ["status", "delete"]
+        )
+
+    def test_replicate_delta(self):
+        """Тест переноса в реплику только новых изменений."""
+        self.repository.replace(self.repository.all())
+        self.repository.add(Book(3, "Книга 3", "Автор 3", "2020",
+                                 "В наличии"))
+        replica = BookRepository(self.replica_file)
+        self.assertEqual(replicate(self.test_file, replica), (2, 2))
+        self.assertEqual(replicate(self.test_file, replica), (0, 2))
+        self.repository.set_status(3, "Выдана")
+        self.repository.delete(1)
+        self.assertEqual(replicate(self.test_file, replica), (2, 4))
+        self.assertEqual(read_json_file(self.replica_file),
+                         read_json_file(self.test_file))
+
+    def test_sqlite_publishes_changes(self):
+        """Тест ленты изменений базы SQLite и переноса в реплику."""
+        path = "test_feed.sqlite3"
+        source = SqliteBookRepository(path, change_feed=True)
+        try:
+            source.add(Book(1, "Книга 1", "Автор 1", "2000", "В наличии"))
+            with source.batch():
+                source.set_status_many({1: "Выдана", 5: "Выдана"})
+                source.add(Book(2, "Книга 2", "Автор 2", "2010",
+                                "В наличии"))
+            with self.assertRaises(RuntimeError):
+                with source.batch():
+                    source.delete(1)
+                    raise RuntimeError
+            self.assertEqual(
+                [(change["seq"], change["op"])
+                 for change in read_changes(path)],
+                [(1, "add"), (2, "status"), (3, "add")]
+            )
+            replica = BookRepository(self.replica_file)
+            self.assertEqual(replicate(path, replica), (3, 3))
+            self.assertEqual(
+                [book.to_dict() for book in replica.all()],
+                [book.to_dict() for book in source.all()]
+            )
+        finally:
+            source.close()
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            remove_catalog_files(path)
+
+    def test_meta_survives_failed_write(self):
+        """Тест: сбой записи метаданных не сбрасывает номера ленты."""
+        self.repository.delete(1)
+        with patch("sequence.json.dump", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.repository.delete(2)
+        self.repository.set_status(2, "Выдана")
+        self.assertEqual(
+            [change["seq"] for change in read_changes(self.test_file)],
+            [1, 2]
+        )
+
+    def test_gap_rejected(self):
+        """Тест отказа применять ленту с пропущенным изменением."""
+        self.repository.delete(1)
+        self.repository.delete(2)
+        changes = list(read_changes(self.test_file))
+        replica = BookRepository(self.replica_file)
+        with self.assertRaises(ValueError):
+            apply_changes(replica, changes[1:])
+        self.assertFalse(os.path.exists(self.replica_file))
+        self.assertEqual(apply_changes(replica, changes), (2, 2))
+
+    def test_published_before_write(self):
+        """Тест записи в ленту до сохранения изменения в каталоге."""
+        with patch.object(self.repository, "_write_snapshot",
+                          side_effect=OSError), \
+                patch.object(self.repository, "_append_journal",
+                             side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.repository.delete(1)
+        self.assertEqual(
+            [change["op"] for change in read_changes(self.test_file)],
+            ["delete"]
+        )
+
+    def test_command_line(self):
+        """Тест команд changes и replicate."""
+        self.repository.replace(self.repository.all())
+        self.repository.delete(2)
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            cli.main(["--database", self.test_file, "changes", "--since",
+                      "1"])
+        result = json.loads(output.getvalue())
+        self.assertEqual(result["last"], 2)
+        self.assertEqual(result["changes"][0]["id"], 2)
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            cli.main(["--database", self.test_file, "replicate",
+                      self.replica_file])
+        self.assertEqual(json.loads(output.getvalue()),
+                         {"applied": 2, "last": 2})
+        self.assertEqual(
+            [book["id"] for book in read_json_file(self.replica_file)], [1]
+        )
+
+
+class TestCatalogCache(unittest.TestCase):
+    """Тестирование кэша разобранного каталога."""
+
+    def setUp(self):
+        """Создаем каталог и сохраняем его в кэш."""
+        self.test_file = "test_cache.json"
+        self.books = [
+            Book(1, "Война и мир", "Лев Толстой", "1869", "В наличии"),
+            Book(2, "Идиот", "Фёдор Достоевский", "1869", "Выдана"),
+        ]
+        write_books(self.test_file, self.books)
+        self.repository = BookRepository(self.test_file, use_cache=True)
+        self.repository.warm_up()
+        self.repository.store_cache()
+
+    def tearDown(self):
+        """Удаляем тестовые файлы."""
+        repository_module._repositories.clear()
+        remove_catalog_files(self.test_file)
+
+    def test_load_from_cache(self):
+        """Тест загрузки книг из кэша."""
+        self.assertTrue(os.path.exists(cache_path(self.test_file)))
+        self.assertFalse(self.repository.store_cache())
+        repository = BookRepository(self.test_file, use_cache=True)
+        repository.load()
+        self.assertIsNotNone(repository._cached_signature)
+        self.assertEqual([book.to_dict() for book in repository.all()],
+                         [book.to_dict() for book in self.books])
+        self.assertIs(repository.get(2).status, STATUSES[1])
+        self.assertEqual(
+            [book.id for book in repository.search("author", "толст")], [1]
+        )
+
+    def test_cache_is_opt_in(self):
+        """Тест загрузки из JSON, если кэш не включен."""
+        repository = BookRepository(self.test_file)
+        repository.load()
+        self.assertIsNone(repository._cached_signature)
+        self.assertFalse(repository.store_cache())
+
+    def test_invalidated_by_changes(self):
+        """Тест устаревания кэша после изменения каталога."""
+        self.repository.set_status(2, "В наличии")
+        self.assertIsNone(load_cache(self.test_file))
+        repository = BookRepository(self.test_file, use_cache=True)
+        repository.load()
+        self.assertEqual(repository.get(2).status, "В наличии")
+        self.assertTrue(repository.store_cache())
+        self.assertEqual(load_cache(self.test_file)[2].status, "В наличии")
+
+    def test_validated_by_hash(self):
+        """Тест проверки содержимого при смене времени изменения."""
+        size = os.path.getsize(self.test_file)
+        os.utime(self.test_file, ns=(0, 0))
+        self.assertIsNotNone(load_cache(self.test_file))
+        write_books(self.test_file, [
+            Book(1, "Война и мор", "Лев Толстой", "1869", "В наличии"),
+            self.books[1],
+        ])
+        self.assertEqual(os.path.getsize(self.test_file), size)
+        self.assertIsNone(load_cache(self.test_file))
+
+    def test_not_stored_with_journal(self):
+        """Тест отказа от кэша, пока журнал не свернут в снимок."""
+        repository = BookRepository(
+            self.test_file, use_journal=True, use_cache=True
+        )
+        repository.load()
+        repository.delete(1)
+        self.assertFalse(repository.store_cache())
+        reloaded = BookRepository(self.test_file, use_cache=True)
+        reloaded.load()
+        self.assertEqual([book.id for book in reloaded.all()], [2])
+
+    def test_corrupted_cache(self):
+        """Тест загрузки из JSON при поврежденном кэше."""
+        with open(cache_path(self.test_file), "r+b") as file:
+            file.seek(HEADER.size)
+            file.truncate()
+            file.write(b"not marshal")
+        repository = BookRepository(self.test_file, use_cache=True)
+        repository.load()
+        self.assertEqual(len(repository), 2)
+        self.assertIsNone(repository._cached_signature)
+
+    def test_warm_up_skips_sqlite(self):
+        """Тест фоновой загрузки: база SQLite не открывается в потоке."""
+        with patch("engine_logic.DATABASE", "test_warm_up.sqlite3"):
+            warm_up_catalog()
+        self.assertFalse(os.path.exists("test_warm_up.sqlite3"))
+
+
+class TestAllBooksPager(unittest.TestCase):
+    """Тестирование постраничного вывода всех книг."""
+
+    def setUp(self):
+        """Создаем каталог из 25 книг."""
+        self.test_file = "test_pager.json"
+        write_books(self.test_file, [
+            Book(number, f"Книга {number}", "Автор", "2000", "В наличии")
+            for number in range(1, 26)
+        ])
+
+    def tearDown(self):
+        """Удаляем тестовый каталог."""
+        remove_catalog_files(self.test_file)
+
+    def show(self, commands):
+        """Запускает вывод всех книг и возвращает напечатанный текст."""
+        with patch("engine_logic.DATABASE", self.test_file), \
+                patch("builtins.input", side_effect=commands), \
+                patch("sys.stdout", new_callable=io.StringIO) as output:
+            all_books()
+        return output.getvalue()
+
+    def test_pages_navigation(self):
+        """Тест перехода по страницам и к книге по ID."""
+        output = self.show(["n", "23", "n", "p", "q"])
+        pages = output.split("Страница ")
+        self.assertIn("ID: 10\x1b", pages[0])
+        self.assertNotIn("ID: 11\x1b", pages[0])
+        self.assertIn("ID: 11\x1b", pages[1])
+        self.assertIn("ID: 21\x1b", pages[2])
+        self.assertIn("Это последняя страница", pages[3])
+        self.assertIn("ID: 11\x1b", pages[4])
+
+    @patch("engine_logic.PAGE_SIZE", 30)
+    def test_single_page_without_prompt(self):
+        """Тест вывода небольшого каталога одной записью без вопросов."""
+        with patch("sys.stdout.write") as write:
+            with patch("engine_logic.DATABASE", self.test_file):
+                all_books()
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(write.call_args[0][0].count("Название:"), 25)
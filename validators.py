@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Optional
+
+from constants import (AUTHOR_MAX_LENGTH, MIN_YEAR, STATUS_AVAILABLE,
+                       STATUS_ISSUED, TITLE_MAX_LENGTH, TITLE_MIN_LENGTH)
+
+
+def is_valid_title(title: str) -> bool:
+    """
+    Проверяет длину названия книги.
+
+    Args:
+        title (str): Название книги.
+
+    Returns:
+        bool: True, если длина названия допустима.
+    """
+    return TITLE_MIN_LENGTH <= len(title) <= TITLE_MAX_LENGTH
+
+
+def is_valid_author(author: str) -> bool:
+    """
+    Проверяет длину имени автора.
+
+    Args:
+        author (str): Имя автора.
+
+    Returns:
+        bool: True, если длина имени допустима.
+    """
+    return len(author) <= AUTHOR_MAX_LENGTH
+
+
+def is_valid_year(year: int) -> bool:
+    """
+    Проверяет, что год издания не меньше MIN_YEAR и не больше текущего.
+
+    Args:
+        year (int): Год издания.
+
+    Returns:
+        bool: True, если год допустим.
+    """
+    return MIN_YEAR <= year <= datetime.now().year
+
+
+def is_valid_status(status: str) -> bool:
+    """
+    Проверяет, что статус книги — один из известных статусов.
+
+    Args:
+        status (str): Статус книги.
+
+    Returns:
+        bool: True, если книга в наличии или выдана.
+    """
+    return status in (STATUS_AVAILABLE, STATUS_ISSUED)
+
+
+def book_errors(title: str, author: str, year: str) -> Optional[str]:
+    """
+    Проверяет поля книги по тем же правилам, что и при ручном добавлении.
+
+    Args:
+        title (str): Название книги.
+        author (str): Имя автора.
+        year (str): Год издания.
+
+    Returns:
+        str | None: Описание первой найденной ошибки или None,
+            если данные корректны.
+    """
+    if not is_valid_title(title):
+        return (
+            f"Название книги должно быть от {TITLE_MIN_LENGTH} "
+            f"до {TITLE_MAX_LENGTH} символов."
+        )
+    if not is_valid_author(author):
+        return f"Имя не может превышать {AUTHOR_MAX_LENGTH} символов."
+    try:
+        if not is_valid_year(int(year)):
+            return (
+                f"Год не может быть больше текущего или меньше {MIN_YEAR}."
+            )
+    except (TypeError, ValueError):
+        return f"Некорректный год: {year}."
+    return None